@@ -0,0 +1,68 @@
+"""Benchmark: records per second written as RECORD messages or batch files.
+
+``records`` formats a Singer RECORD message per record, as the tap writes to
+stdout. ``batch`` writes the same records to gzipped JSON Lines batch files,
+with orjson when installed and with the standard library encoder.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_batch_output
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from unittest import mock
+
+from singer_sdk._singerlib import RecordMessage
+from singer_sdk.helpers._batch import BatchConfig
+from singer_sdk.io_base import SingerWriter
+
+from benchmarks.fake_stripe import make_record
+from tap_stripe.batch import BatchWriter
+from tap_stripe.tap import TapStripe
+
+RECORDS = 100_000
+DISTINCT = 1_000
+
+
+def records_output(records: list[dict]) -> float:
+    writer = SingerWriter()
+    start = time.perf_counter()
+    for i in range(RECORDS):
+        writer.format_message(
+            RecordMessage(stream="invoices", record=records[i % DISTINCT])
+        )
+    return RECORDS / (time.perf_counter() - start)
+
+
+def batch_output(records: list[dict], root: str) -> float:
+    config = BatchConfig.from_dict(
+        {
+            "encoding": {"format": "jsonl", "compression": "gzip"},
+            "storage": {"root": f"file://{root}"},
+            "batch_size": 10_000,
+        }
+    )
+    writer = BatchWriter(config, tap_name="tap-stripe", stream_name="invoices")
+    start = time.perf_counter()
+    for i in range(RECORDS):
+        writer.write(records[i % DISTINCT])
+    writer.close()
+    return RECORDS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    tap = TapStripe(
+        config={"api_key": "sk_test_123", "account_id": "acct_123"},
+        parse_env_config=False,
+    )
+    schema = tap.streams["invoices"].schema
+    records = [make_record(schema, i) for i in range(DISTINCT)]
+    with tempfile.TemporaryDirectory() as root:
+        print(f"RECORD messages:         {records_output(records):>10,.0f} rec/s")
+        print(f"batch files (orjson):    {batch_output(records, root):>10,.0f} rec/s")
+        with mock.patch("tap_stripe.batch.orjson", None):
+            fallback = batch_output(records, root)
+        print(f"batch files (json):      {fallback:>10,.0f} rec/s")
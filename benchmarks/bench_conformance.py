@@ -0,0 +1,64 @@
+"""Benchmark: records per second through schema conformance.
+
+Compares the SDK's ``conform_record_data_types``, which walks the stream
+schema for every record, against the conformer compiled from the schema.
+100k synthetic records per stream are conformed, built from the stream
+schemas (cycling through 1,000 distinct records to bound memory).
+
+Run with::
+
+    poetry run python -m benchmarks.bench_conformance
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from singer_sdk.helpers._typing import TypeConformanceLevel, conform_record_data_types
+
+from benchmarks.fake_stripe import make_record
+from tap_stripe.conformance import SchemaConformer
+from tap_stripe.tap import TapStripe
+
+RECORDS = 100_000
+DISTINCT = 1_000
+STREAMS = ("customers", "invoices", "subscriptions")
+
+
+def sdk(stream, records: list[dict]) -> float:  # noqa: ANN001
+    start = time.perf_counter()
+    for i in range(RECORDS):
+        conform_record_data_types(
+            stream.name,
+            records[i % DISTINCT],
+            stream.schema,
+            TypeConformanceLevel.RECURSIVE,
+            stream.logger,
+        )
+    return RECORDS / (time.perf_counter() - start)
+
+
+def compiled(stream, records: list[dict]) -> float:  # noqa: ANN001
+    start = time.perf_counter()
+    conformer = SchemaConformer(
+        stream.schema, stream_name=stream.name, logger=stream.logger
+    )
+    for i in range(RECORDS):
+        conformer(records[i % DISTINCT])
+    return RECORDS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    tap = TapStripe(
+        config={"api_key": "sk_test_123", "account_id": "acct_123"},
+        parse_env_config=False,
+    )
+    print(f"{'stream':<16}{'SDK rec/s':>14}{'compiled rec/s':>18}{'speedup':>10}")
+    for name in STREAMS:
+        stream = tap.streams[name]
+        records = [make_record(stream.schema, i) for i in range(DISTINCT)]
+        before = sdk(stream, records)
+        after = compiled(stream, records)
+        print(f"{name:<16}{before:>14,.0f}{after:>18,.0f}{after / before:>9.1f}x")
@@ -0,0 +1,67 @@
+"""Micro-benchmark: CPU time per record with a narrow catalog selection.
+
+Records of the wide ``invoices`` stream go through ``post_process`` and the
+SDK's selection and schema conformance, as when they are written out. With
+every field selected, all of them are conformed; with a dozen selected, the
+unselected fields are dropped in ``post_process`` first.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_field_pruning
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from benchmarks.fake_stripe import make_record
+from tap_stripe.tap import TapStripe
+
+RECORDS = 5_000
+SELECTED = (
+    "amount_due",
+    "amount_paid",
+    "currency",
+    "customer",
+    "due_date",
+    "number",
+    "paid",
+    "status",
+    "subscription",
+    "total",
+)
+
+def _tap(selected: tuple[str, ...] | None) -> TapStripe:
+    config = {"api_key": "sk_test_123", "account_id": "acct_123"}
+    catalog = TapStripe(config=config, parse_env_config=False).catalog_dict
+    if selected is not None:
+        for entry in catalog["streams"]:
+            if entry["tap_stream_id"] != "invoices":
+                continue
+            for metadata in entry["metadata"]:
+                if metadata["breadcrumb"]:
+                    metadata["metadata"]["selected"] = (
+                        metadata["breadcrumb"][1] in selected
+                    )
+    return TapStripe(config=config, catalog=catalog, parse_env_config=False)
+
+
+def measure(selected: tuple[str, ...] | None) -> float:
+    stream = _tap(selected).streams["invoices"]
+    records = [make_record(stream.schema, i) for i in range(RECORDS)]
+    start = time.process_time()
+    for row in records:
+        record = stream.conformer(stream.post_process(row, None))
+        for _ in stream._generate_record_messages(record):  # noqa: SLF001
+            pass
+    return (time.process_time() - start) / RECORDS
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    wide = measure(None)
+    narrow = measure(SELECTED)
+    print(f"all fields:        {wide * 1e6:8.1f} us/record")
+    print(f"{len(SELECTED)} fields:         {narrow * 1e6:8.1f} us/record")
+    print(f"speedup:           {wide / narrow:8.2f}x")
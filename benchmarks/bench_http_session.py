@@ -0,0 +1,78 @@
+"""Benchmark: requests/second against a local fake Stripe server over HTTPS.
+
+``before`` reproduces the previous transport: a default ``requests.Session``
+(10 pooled connections) and a new authenticator built for every request.
+``after`` uses the tap's shared session, whose pool is sized to the configured
+concurrency, and the stream's cached authenticator.
+
+Run with::
+
+    poetry run python benchmarks/bench_http_session.py
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import urllib3
+from singer_sdk.authenticators import BearerTokenAuthenticator
+
+from benchmarks.fake_stripe import FakeStripeProcess, make_objects
+from tap_stripe.tap import TapStripe
+
+THREADS = 32
+REQUESTS = 3000
+
+
+def run(send) -> float:  # noqa: ANN001
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        for response in executor.map(lambda _: send(), range(REQUESTS)):
+            response.raise_for_status()
+    return REQUESTS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    urllib3.disable_warnings()
+    objects = {"/v1/customers": make_objects("cus", 100)}
+    with FakeStripeProcess(objects, tls=True) as server:
+        tap = TapStripe(
+            config={
+                "api_key": "sk_test_bench",
+                "account_id": "acct_bench",
+                "api_url": server.url,
+                "max_requests_per_second": 1_000_000,
+                "max_concurrent_streams": 1,
+                "backfill_window_days": 30,
+                "backfill_max_workers": THREADS,
+            },
+            parse_env_config=False,
+        )
+        stream = tap.streams["customers"]
+        url = stream.get_url(None)
+        default_session = requests.Session()
+        # The fake server's certificate is self-signed.
+        default_session.verify = stream.requests_session.verify = False
+
+        def before() -> requests.Response:
+            auth = BearerTokenAuthenticator.create_for_stream(stream, token="sk_test")
+            request = requests.Request("GET", url, params={"limit": 10}, auth=auth)
+            return default_session.send(default_session.prepare_request(request))
+
+        def after() -> requests.Response:
+            request = stream.build_prepared_request(
+                method="GET", url=url, params={"limit": 10}
+            )
+            return stream.requests_session.send(request)
+
+        run(after)  # warm up the server threads
+        before_rps = run(before)
+        after_rps = run(after)
+
+    print(f"threads:  {THREADS}, requests: {REQUESTS}")
+    print(f"before:   {before_rps:8.0f} req/s")
+    print(f"after:    {after_rps:8.0f} req/s")
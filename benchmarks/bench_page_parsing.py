@@ -0,0 +1,95 @@
+"""Micro-benchmark: CPU time spent decoding and parsing one Stripe list page.
+
+Compares the previous behaviour (``has_more``, ``get_next`` and
+``parse_response`` each decoding the body, records extracted via JSONPath)
+against the shared decoded page used by ``StripePaginator``/``StripeStream``.
+
+Run with::
+
+    poetry run python benchmarks/bench_page_parsing.py
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+import requests
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+
+from tap_stripe.client import StripePaginator, get_page
+
+PAGE_SIZE = 100
+ROUNDS = 50
+
+
+def _invoice(idx: int) -> dict:
+    return {
+        "id": f"in_{idx:08d}",
+        "object": "invoice",
+        "customer": {
+            "id": f"cus_{idx:08d}",
+            "object": "customer",
+            "email": f"user{idx}@example.com",
+            "metadata": {f"key_{k}": "x" * 32 for k in range(10)},
+        },
+        "lines": {
+            "object": "list",
+            "data": [
+                {"id": f"il_{idx}_{n}", "amount": n * 100, "description": "y" * 64}
+                for n in range(10)
+            ],
+            "has_more": False,
+            "total_count": 10,
+        },
+        "status_transitions": {"finalized_at": 1700000000, "paid_at": 1700000100},
+        "total": idx * 100,
+        "created": 1700000000 - idx,
+    }
+
+
+def _response() -> requests.Response:
+    body = {
+        "object": "list",
+        "data": [_invoice(i) for i in range(PAGE_SIZE)],
+        "has_more": True,
+        "url": "/v1/invoices",
+    }
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(body).encode()  # noqa: SLF001
+    response.encoding = "utf-8"
+    return response
+
+
+def legacy(response: requests.Response) -> int:
+    response.json()["has_more"]
+    response.json()["data"][-1]["id"]
+    return sum(1 for _ in extract_jsonpath("$.data[*]", input=response.json()))
+
+
+def shared(response: requests.Response) -> int:
+    paginator = StripePaginator(start_value=0, page_size=PAGE_SIZE)
+    paginator.has_more(response)
+    paginator.get_next(response)
+    return sum(1 for _ in get_page(response)["data"])
+
+
+def measure(fn) -> float:  # noqa: ANN001
+    total = 0.0
+    for _ in range(ROUNDS):
+        response = _response()
+        start = time.process_time()
+        fn(response)
+        total += time.process_time() - start
+    return total / ROUNDS
+
+
+if __name__ == "__main__":
+    size_kb = len(_response().content) / 1024
+    before = measure(legacy)
+    after = measure(shared)
+    print(f"page size:        {size_kb:8.1f} KiB ({PAGE_SIZE} records)")
+    print(f"legacy CPU/page:  {before * 1000:8.2f} ms")
+    print(f"shared CPU/page:  {after * 1000:8.2f} ms")
+    print(f"speedup:          {before / after:8.2f}x")
@@ -0,0 +1,173 @@
+"""Benchmark: start-up latency of the tap.
+
+Each measure runs a fresh interpreter, so module caches do not carry over from
+one run to the next, and reports the median over ``--runs``:
+
+- import: seconds to import ``tap_stripe.tap``;
+- discover: seconds to build the catalog, once imported;
+- first record: wall-clock seconds from starting ``python -m tap_stripe`` with a
+  catalog selecting ``--streams`` to its first RECORD message, against a fake
+  Stripe server running in a child process.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_startup
+    poetry run python -m benchmarks.bench_startup --streams invoice_line_items
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+from benchmarks.fake_stripe import FakeStripeProcess, make_dataset
+
+_COUNTS = {
+    "customers": 100,
+    "subscriptions": 100,
+    "products": 100,
+    "invoices": 100,
+    "events": 100,
+    "balance_transactions": 100,
+}
+
+_IMPORT_AND_DISCOVER = """
+import json, sys, time
+start = time.perf_counter()
+from tap_stripe.tap import TapStripe
+imported = time.perf_counter()
+TapStripe(config=json.loads(sys.argv[1]), parse_env_config=False).catalog_dict
+print(json.dumps([imported - start, time.perf_counter() - imported]))
+"""
+
+
+def import_and_discover(config: dict) -> tuple[float, float]:
+    """Import the tap and discover its catalog in a new interpreter.
+
+    Args:
+        config: The tap config.
+
+    Returns:
+        Seconds spent importing and discovering.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_AND_DISCOVER, json.dumps(config)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    imported, discovered = json.loads(output.splitlines()[-1])
+    return imported, discovered
+
+
+def select(catalog: dict, stream_names: t.Collection[str]) -> dict:
+    """Return a catalog selecting only some streams.
+
+    Args:
+        catalog: A discovered catalog.
+        stream_names: The streams to select.
+
+    Returns:
+        The catalog, with the root metadata of every stream updated.
+    """
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] in (
+                    stream_names
+                )
+    return catalog
+
+
+def first_record(config_path: Path, catalog_path: Path) -> float:
+    """Run the tap until its first RECORD message.
+
+    Args:
+        config_path: The tap config file.
+        catalog_path: The catalog file.
+
+    Returns:
+        Seconds from starting the process to reading the message.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "tap_stripe",
+            "--config",
+            str(config_path),
+            "--catalog",
+            str(catalog_path),
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        for line in process.stdout:
+            if line.startswith('{"type":"RECORD"'):
+                return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+        process.stdout.close()
+    msg = "The tap exited without writing a record"
+    raise RuntimeError(msg)
+
+
+def main(argv: t.Sequence[str] | None = None) -> None:
+    """Run the suite."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--streams",
+        nargs="+",
+        default=["customers"],
+        help="The streams selected in the catalog",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Number of runs of each measure"
+    )
+    args = parser.parse_args(argv)
+
+    config = {
+        "api_key": "sk_test_bench",
+        "start_date": "2020-01-01T00:00:00Z",
+        "max_requests_per_second": 1_000_000,
+    }
+    timings = [import_and_discover(config) for _ in range(args.runs)]
+
+    with FakeStripeProcess(make_dataset(_COUNTS)) as server, (
+        tempfile.TemporaryDirectory()
+    ) as directory:
+        config["api_url"] = server.url
+        config_path = Path(directory, "config.json")
+        config_path.write_text(json.dumps(config))
+        catalog = subprocess.run(
+            [sys.executable, "-m", "tap_stripe", "--config", config_path, "--discover"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        catalog_path = Path(directory, "catalog.json")
+        catalog_path.write_text(json.dumps(select(json.loads(catalog), args.streams)))
+        firsts = [first_record(config_path, catalog_path) for _ in range(args.runs)]
+
+    print(f"{'measure':<16}{'median s':>10}{'min s':>10}")
+    for name, values in (
+        ("import", [imported for imported, _ in timings]),
+        ("discover", [discovered for _, discovered in timings]),
+        ("first record", firsts),
+    ):
+        print(f"{name:<16}{statistics.median(values):>10.3f}{min(values):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark: peak memory of parsing one large, expanded Stripe list page.
+
+``buffered`` decodes the whole body with ``response.json()`` before yielding
+records. ``streamed`` parses records with ijson while the (gzipped) body is
+read, keeping one record at a time. Records are consumed one by one and
+dropped, as the tap does when it writes them out.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_streaming_parse
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import statistics
+import time
+import tracemalloc
+
+import requests
+from urllib3 import HTTPResponse
+
+from tap_stripe.client import get_page
+from tap_stripe.streaming import iter_page_records
+
+PAGE_SIZE = 100
+RUNS = 9
+
+
+def _text(seed: int, size: int) -> str:
+    # Varied text, so the gzipped page is about as large as a real one.
+    digests = (
+        hashlib.sha256(f"{seed}:{n}".encode()).hexdigest() for n in range(size // 64)
+    )
+    return "".join(digests)
+
+
+def _invoice(idx: int) -> dict:
+    return {
+        "id": f"in_{idx:08d}",
+        "object": "invoice",
+        "customer": {
+            "id": f"cus_{idx:08d}",
+            "object": "customer",
+            "metadata": {f"key_{k}": _text(idx * 50 + k, 64) for k in range(50)},
+        },
+        "lines": {
+            "object": "list",
+            "data": [
+                {"id": f"il_{idx}_{n}", "amount": n * 100, "description": _text(idx * 100 + n, 256)}
+                for n in range(100)
+            ],
+            "has_more": False,
+        },
+        "created": 1700000000 - idx,
+    }
+
+
+BODY = gzip.compress(
+    json.dumps(
+        {
+            "object": "list",
+            "data": [_invoice(i) for i in range(PAGE_SIZE)],
+            "has_more": True,
+            "url": "/v1/invoices",
+        }
+    ).encode(),
+    compresslevel=1,
+)
+
+
+def _response() -> requests.Response:
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(headers)
+    response.raw = HTTPResponse(
+        body=io.BytesIO(BODY),
+        headers=headers,
+        status=200,
+        preload_content=False,
+        decode_content=False,
+    )
+    return response
+
+
+def buffered(response: requests.Response) -> int:
+    return sum(1 for _ in get_page(response)["data"])
+
+
+def streamed(response: requests.Response) -> int:
+    return sum(1 for _ in iter_page_records(response))
+
+
+def measure(fn) -> tuple[float, float]:  # noqa: ANN001
+    # Time and memory are measured in separate runs: tracing allocations
+    # slows the parsers down unevenly. Times are the median of RUNS runs.
+    elapsed = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        count = fn(_response())
+        elapsed.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(_response())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert count == PAGE_SIZE  # noqa: S101
+    return peak / 2**20, statistics.median(elapsed)
+
+
+if __name__ == "__main__":
+    size = len(gzip.decompress(BODY)) / 2**20
+    before_peak, before_time = measure(buffered)
+    after_peak, after_time = measure(streamed)
+    print(f"page size:  {size:8.1f} MiB ({PAGE_SIZE} records, gzipped on the wire)")
+    print(f"buffered:   {before_peak:8.1f} MiB peak, {before_time * 1000:8.1f} ms")
+    print(f"streamed:   {after_peak:8.1f} MiB peak, {after_time * 1000:8.1f} ms")
@@ -0,0 +1,187 @@
+"""Benchmark: sync throughput and cost of each main stream.
+
+Every stream is synced in full, with its child streams, against a fake Stripe
+server running in a child process, or from a recorded cassette. Singer
+messages are serialized and discarded. For each stream, the suite reports:
+
+- pages/s and records/s, over the wall-clock time of the sync;
+- CPU time of the tap process per record;
+- peak memory traced while syncing, measured in a second run because tracing
+  allocations slows the sync down.
+
+Run with::
+
+    poetry run python -m benchmarks.bench_streams
+    poetry run python -m benchmarks.bench_streams --latency 0.05 --rate-limit-every 50
+    poetry run python -m benchmarks.bench_streams --cassette run.jsonl --replay
+    poetry run python -m benchmarks.bench_streams --streams balance_transactions \
+        --tap-config '{"report_streams": ["balance_transactions"]}'
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import time
+import tracemalloc
+import typing as t
+
+from benchmarks.fake_stripe import DEFAULT_COUNTS, FakeStripeProcess, make_dataset
+from tap_stripe.tap import TapStripe
+
+STREAMS = (
+    "customers",
+    "subscriptions",
+    "products",
+    "events",
+    "invoices",
+    "balance_transactions",
+)
+
+
+class _Sink:
+    """Stand-in for stdout that counts RECORD messages."""
+
+    def __init__(self) -> None:
+        self.records = 0
+
+    def write(self, text: str) -> int:
+        self.records += text.startswith('{"type":"RECORD"')
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def _select_all(config: dict) -> dict:
+    """Return the catalog with every stream selected, child streams included."""
+    catalog = TapStripe(config=config, parse_env_config=False).catalog_dict
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = True
+    return catalog
+
+
+def sync(stream_name: str, config: dict) -> dict[str, float]:
+    """Sync one stream with a new tap, and measure it.
+
+    Args:
+        stream_name: The stream to sync.
+        config: The tap config.
+
+    Returns:
+        Pages, records, wall-clock and CPU seconds of the sync.
+    """
+    tap = TapStripe(config=config, catalog=_select_all(config), parse_env_config=False)
+    stream = tap.streams[stream_name]
+    sink = _Sink()
+    wall, cpu = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(sink):
+        stream.sync()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    stats = tap.request_scheduler.stats
+    tap.requests_session.close()
+    return {
+        "pages": stats["requests"] - stats["throttled_responses"],
+        "records": sink.records,
+        "wall": wall,
+        "cpu": cpu,
+    }
+
+
+def measure(stream_name: str, config: dict) -> dict[str, float]:
+    """Sync a stream twice, timing the first run and tracing the second.
+
+    Args:
+        stream_name: The stream to sync.
+        config: The tap config.
+
+    Returns:
+        The measures of :func:`sync`, and the ``peak`` traced memory in bytes.
+    """
+    result = sync(stream_name, config)
+    tracemalloc.start()
+    sync(stream_name, config)
+    _, result["peak"] = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result
+
+
+def report(results: dict[str, dict[str, float]]) -> None:
+    """Print one line of measures per stream."""
+    print(
+        f"{'stream':<22}{'pages':>7}{'records':>9}{'pages/s':>10}"
+        f"{'records/s':>11}{'CPU us/rec':>12}{'peak MiB':>10}"
+    )
+    for name, result in results.items():
+        records = max(result["records"], 1)
+        print(
+            f"{name:<22}{result['pages']:>7.0f}{result['records']:>9.0f}"
+            f"{result['pages'] / result['wall']:>10.1f}"
+            f"{result['records'] / result['wall']:>11.0f}"
+            f"{result['cpu'] / records * 1e6:>12.1f}"
+            f"{result['peak'] / 2**20:>10.1f}"
+        )
+
+
+def main(argv: t.Sequence[str] | None = None) -> None:
+    """Run the suite."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--streams", nargs="+", choices=STREAMS, default=STREAMS)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiplier of the number of objects generated per stream",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to each response"
+    )
+    parser.add_argument(
+        "--rate-limit-every",
+        type=int,
+        help="Answer every n-th request with a 429 rate_limit error",
+    )
+    parser.add_argument("--cassette", help="Cassette file to record or replay")
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Replay --cassette instead of starting the fake server",
+    )
+    parser.add_argument(
+        "--tap-config",
+        default="{}",
+        help="JSON object of extra tap settings, e.g. '{\"streaming_parse\": true}'",
+    )
+    args = parser.parse_args(argv)
+
+    config = {
+        "api_key": "sk_test_bench",
+        "start_date": "2020-01-01T00:00:00Z",
+        "max_requests_per_second": 1_000_000,
+        **json.loads(args.tap_config),
+    }
+    if args.cassette:
+        config["cassette_path"] = args.cassette
+        config["cassette_mode"] = "replay" if args.replay else "record"
+
+    if args.replay:
+        results = {name: measure(name, config) for name in args.streams}
+    else:
+        counts = {
+            name: int(count * args.scale) for name, count in DEFAULT_COUNTS.items()
+        }
+        with FakeStripeProcess(
+            make_dataset(counts),
+            latency=args.latency,
+            rate_limit_every=args.rate_limit_every,
+        ) as server:
+            config["api_url"] = server.url
+            results = {name: measure(name, config) for name in args.streams}
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,634 @@
+"""A local stand-in for Stripe list endpoints, used by the benchmarks.
+
+:func:`make_dataset` builds deterministic customers, subscriptions, products,
+invoices, balance transactions and events from the stream schemas, and
+:class:`FakeStripeServer` serves them with Stripe's pagination, optionally
+slowed down or throttled. Balance transactions can also be read from report
+runs and their CSV files.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import gzip
+import io
+import json
+import ssl
+import tempfile
+import threading
+import time
+import typing as t
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tap_stripe import streams
+from tap_stripe.reporting import currency_exponent
+
+#: Objects generated per stream by :func:`make_dataset`.
+DEFAULT_COUNTS = {
+    "customers": 1000,
+    "subscriptions": 1000,
+    "products": 200,
+    "invoices": 1000,
+    "balance_transactions": 1000,
+    "events": 2000,
+}
+
+# Stream, object name and id prefix of the objects of each API path.
+_DATASET_OBJECTS = {
+    "customers": (streams.CustomersStream, "customer", "cus"),
+    "subscriptions": (streams.SubscriptionsStream, "subscription", "sub"),
+    "products": (streams.ProductsStream, "product", "prod"),
+    "invoices": (streams.InvoicesStream, "invoice", "in"),
+    "balance_transactions": (
+        streams.BalanceTransactionsStream,
+        "balance_transaction",
+        "txn",
+    ),
+}
+
+# Balance transactions are an hour apart, so that they span the weeks worth
+# reading from a report run; other objects a minute apart.
+_CREATED_STEP = {"balance_transactions": 3600}
+
+# Report type listing balance transactions, and the value of each of its
+# columns for a balance transaction.
+_BALANCE_REPORT_TYPE = streams.BalanceTransactionsStream.report_type
+_BALANCE_REPORT_COLUMNS: dict[str, t.Callable[[dict], str]] = {
+    "balance_transaction_id": lambda txn: txn["id"],
+    "created_utc": lambda txn: _report_time(txn["created"]),
+    "available_on_utc": lambda txn: _report_time(txn["available_on"]),
+    "currency": lambda txn: txn["currency"],
+    "gross": lambda txn: _report_amount(txn["amount"], txn["currency"]),
+    "fee": lambda txn: _report_amount(txn["fee"], txn["currency"]),
+    "net": lambda txn: _report_amount(txn["net"], txn["currency"]),
+    "reporting_category": lambda txn: txn["reporting_category"],
+    "source_id": lambda txn: txn["source"] or "",
+    "description": lambda txn: txn["description"] or "",
+}
+
+_RATE_LIMIT_ERROR = {
+    "error": {
+        "code": "rate_limit",
+        "message": "Too many requests hit the API too quickly.",
+        "type": "invalid_request_error",
+    }
+}
+
+_PERMISSION_ERROR = {
+    "error": {
+        "message": "The provided key does not have access to the Reporting API.",
+        "type": "invalid_request_error",
+    }
+}
+
+_MISSING_ERROR = {
+    "error": {
+        "code": "resource_missing",
+        "message": "No such object.",
+        "type": "invalid_request_error",
+    }
+}
+
+
+def make_objects(prefix: str, count: int, start: int = 1_600_000_000) -> list[dict]:
+    """Return ``count`` synthetic objects with ids and ``created`` timestamps.
+
+    Args:
+        prefix: Object id prefix, e.g. ``cus``.
+        count: Number of objects.
+        start: ``created`` timestamp of the oldest object.
+
+    Returns:
+        The objects, newest first.
+    """
+    return [
+        {
+            "id": f"{prefix}_{i:010d}",
+            "object": prefix,
+            "created": start + i * 60,
+            "livemode": False,
+            "metadata": {"index": str(i)},
+            "description": "x" * 200,
+        }
+        for i in range(count - 1, -1, -1)
+    ]
+
+
+def make_record(schema: dict, idx: int, *, list_size: int = 3) -> t.Any:  # noqa: ANN401
+    """Return a synthetic value of every property declared in ``schema``.
+
+    Args:
+        schema: A JSON schema, e.g. a stream schema.
+        idx: Varies the generated values between records.
+        list_size: Number of items of generated arrays.
+
+    Returns:
+        A value matching the schema, as Stripe would send it.
+    """
+    if "anyOf" in schema:
+        return make_record(schema["anyOf"][0], idx, list_size=list_size)
+    types = schema.get("type", "string")
+    kind = next(
+        (k for k in ([types] if isinstance(types, str) else types) if k != "null"),
+        "string",
+    )
+    if kind == "object":
+        return {
+            name: make_record(sub, idx, list_size=list_size)
+            for name, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        items = schema.get("items", {})
+        return [
+            make_record(items, idx + n, list_size=list_size) for n in range(list_size)
+        ]
+    if kind == "integer":
+        return 1_600_000_000 + idx
+    if kind == "number":
+        return idx / 4
+    if kind == "boolean":
+        return idx % 2 == 0
+    return f"value_{idx}"
+
+
+def make_dataset(
+    counts: dict[str, int] | None = None,
+    *,
+    start: int = 1_600_000_000,
+) -> dict[str, list[dict]]:
+    """Return synthetic objects for the list endpoints of the main streams.
+
+    Objects have every property of their stream schema. Subscriptions embed
+    their items and invoices their lines, as complete lists. Events report an
+    update of the other objects, in turn.
+
+    Args:
+        counts: Number of objects per stream, see :data:`DEFAULT_COUNTS`.
+        start: ``created`` timestamp of the oldest object of each stream.
+
+    Returns:
+        Objects per API path, newest first, for :class:`FakeStripeServer`.
+    """
+    counts = {**DEFAULT_COUNTS, **(counts or {})}
+    dataset = {}
+    for name, (stream_class, object_name, prefix) in _DATASET_OBJECTS.items():
+        objects = []
+        for idx in range(counts[name] - 1, -1, -1):
+            obj = make_record(stream_class.schema, idx)
+            obj.update(id=f"{prefix}_{idx:010d}", object=object_name)
+            obj["created"] = start + idx * _CREATED_STEP.get(name, 60)
+            if name == "subscriptions":
+                obj["items"] = _make_sublist(streams.SubscriptionItemsStream, obj)
+            elif name == "invoices":
+                obj["lines"] = _make_sublist(streams.InvoiceLineItemsStream, obj)
+            elif name == "balance_transactions":
+                fee = 30 + idx % 50
+                obj.update(
+                    amount=1000 + idx,
+                    available_on=obj["created"] + 2 * 24 * 3600,
+                    currency="usd",
+                    fee=fee,
+                    net=1000 + idx - fee,
+                    reporting_category="charge",
+                    source=f"ch_{idx:010d}",
+                )
+            objects.append(obj)
+        dataset[f"/v1/{name}"] = objects
+
+    changed = [
+        dataset[f"/v1/{name}"][::-1]
+        for name, (stream_class, _, _) in _DATASET_OBJECTS.items()
+        if stream_class.event_types and dataset[f"/v1/{name}"]
+    ]
+    events = []
+    for idx in range(counts["events"] - 1, -1, -1) if changed else ():
+        objects = changed[idx % len(changed)]
+        obj = objects[idx // len(changed) % len(objects)]
+        stream_class = _DATASET_OBJECTS[obj["object"] + "s"][0]
+        events.append(
+            {
+                "id": f"evt_{idx:010d}",
+                "object": "event",
+                "type": stream_class.event_types[1],
+                "created": start + idx * 60,
+                "data": {"object": obj},
+            }
+        )
+    dataset["/v1/events"] = events
+    return dataset
+
+
+def _report_time(timestamp: int) -> str:
+    moment = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _report_amount(amount: int, currency: str) -> str:
+    return str(Decimal(amount).scaleb(-currency_exponent(currency)))
+
+
+def _make_sublist(stream_class: type, parent: dict, size: int = 3) -> dict:
+    idx = int(parent["id"].rsplit("_", 1)[1])
+    items = []
+    for n in range(size):
+        item = make_record(stream_class.schema, idx * size + n)
+        item["id"] = f"{parent['id']}_{n}"
+        if stream_class.parent_key in stream_class.schema["properties"]:
+            item[stream_class.parent_key] = parent["id"]
+        items.append(item)
+    return {"object": "list", "data": items, "has_more": False}
+
+
+class FakeStripeServer:
+    """Serve list pages with Stripe's ``created``/``starting_after`` semantics.
+
+    Report runs of balance transactions are created with ``POST
+    /v1/reporting/report_runs``, stay pending for ``report_pending_polls``
+    retrievals, then link to a CSV file of the transactions created in their
+    interval, oldest first.
+    """
+
+    def __init__(
+        self,
+        objects: dict[str, list[dict]],
+        *,
+        tls: bool = False,
+        latency: float = 0.0,
+        rate_limit_every: int | None = None,
+        reporting: bool = True,
+        report_data_end: int | None = None,
+        report_pending_polls: int = 1,
+    ) -> None:
+        """Create a server.
+
+        Args:
+            objects: Objects per API path (e.g. ``/v1/customers``), newest first.
+            tls: Serve HTTPS with a throwaway self-signed certificate, so that
+                connection setup costs what it does against the real API.
+            latency: Seconds every response is delayed by.
+            rate_limit_every: Reject every n-th request with a 429
+                ``rate_limit`` error, as Stripe does under load.
+            reporting: Serve the Reporting API; when False, its endpoints
+                answer 403, as for restricted API keys.
+            report_data_end: End of the data available to report runs; by
+                default, after the newest balance transaction.
+            report_pending_polls: Retrievals of a report run before it succeeds.
+        """
+        self.objects = objects
+        self.tls = tls
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.reporting = reporting
+        self.report_data_end = report_data_end
+        self.report_pending_polls = report_pending_polls
+        self.report_runs: dict[str, dict] = {}
+        self.requests = 0
+        self.throttled = 0
+        self._polls: dict[str, int] = {}
+        self._files: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        if tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*_self_signed_certificate())
+            self._server.socket = context.wrap_socket(
+                self._server.socket,
+                server_side=True,
+            )
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as the tap's ``api_url``."""
+        host, port = self._server.server_address[:2]
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://{host}:{port}/v1"
+
+    def __enter__(self) -> FakeStripeServer:  # noqa: D105
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve requests on the calling thread until the process exits."""
+        self._server.serve_forever()
+
+    def __exit__(self, *exc: object) -> None:  # noqa: D105
+        self._server.shutdown()
+        self._server.server_close()
+
+    def list_page(
+        self,
+        path: str,
+        params: dict[str, str],
+        *,
+        types: list[str] | None = None,
+    ) -> dict:
+        """Return the list object Stripe would for ``path`` and ``params``.
+
+        Args:
+            path: The request path.
+            params: Query parameters.
+            types: Event types to list, for ``/events``; all when empty.
+
+        Returns:
+            A Stripe list object.
+        """
+        matches = [
+            o
+            for o in self.objects.get(path, [])
+            if o["created"] >= int(params.get("created[gte]", 0))
+            and o["created"] < int(params.get("created[lt]", 2**63))
+            and (not types or o.get("type") in types)
+        ]
+        if "starting_after" in params:
+            ids = [o["id"] for o in matches]
+            matches = matches[ids.index(params["starting_after"]) + 1 :]
+        limit = int(params.get("limit", 10))
+        return {
+            "object": "list",
+            "data": matches[:limit],
+            "has_more": len(matches) > limit,
+            "url": path,
+        }
+
+    def report_type(self, report_type: str) -> dict | None:
+        """Return a report type, with the range of data it covers.
+
+        Args:
+            report_type: The report type id.
+
+        Returns:
+            A ``reporting.report_type`` object, or ``None`` if unknown.
+        """
+        if report_type != _BALANCE_REPORT_TYPE:
+            return None
+        created = [
+            txn["created"] for txn in self.objects.get("/v1/balance_transactions", [])
+        ]
+        start = min(created, default=0)
+        end = max(created, default=0) + 1
+        return {
+            "id": report_type,
+            "object": "reporting.report_type",
+            "data_available_start": start,
+            "data_available_end": self.report_data_end or end,
+        }
+
+    def create_report_run(self, params: dict[str, list[str]]) -> dict | None:
+        """Create a pending report run.
+
+        Args:
+            params: The form-encoded parameters of the request.
+
+        Returns:
+            A ``reporting.report_run`` object, or ``None`` for an unknown type.
+        """
+        report_type = params.get("report_type", [""])[0]
+        if self.report_type(report_type) is None:
+            return None
+        with self._lock:
+            run_id = f"frr_{len(self.report_runs) + 1:06d}"
+            run = {
+                "id": run_id,
+                "object": "reporting.report_run",
+                "created": int(time.time()),
+                "error": None,
+                "livemode": False,
+                "parameters": {
+                    "columns": params.get("parameters[columns][]")
+                    or list(_BALANCE_REPORT_COLUMNS),
+                    "interval_start": int(params["parameters[interval_start]"][0]),
+                    "interval_end": int(params["parameters[interval_end]"][0]),
+                },
+                "report_type": report_type,
+                "result": None,
+                "status": "pending",
+                "succeeded_at": None,
+            }
+            self.report_runs[run_id] = run
+            self._polls[run_id] = 0
+        return run
+
+    def retrieve_report_run(self, run_id: str) -> dict | None:
+        """Return a report run, completing it once it was polled enough.
+
+        Args:
+            run_id: The report run id.
+
+        Returns:
+            The ``reporting.report_run`` object, or ``None`` if unknown.
+        """
+        with self._lock:
+            run = self.report_runs.get(run_id)
+            if run is None or run["status"] != "pending":
+                return run
+            self._polls[run_id] += 1
+            if self._polls[run_id] < self.report_pending_polls:
+                return run
+            file_id = f"file_{run_id[4:]}"
+            self._files[file_id] = self._report_csv(run["parameters"])
+            run.update(
+                status="succeeded",
+                succeeded_at=int(time.time()),
+                result={
+                    "id": file_id,
+                    "object": "file",
+                    "purpose": "finance_report_run",
+                    "size": len(self._files[file_id]),
+                    "type": "csv",
+                    "url": f"{self.url}/files/{file_id}/contents",
+                },
+            )
+            return run
+
+    def report_file(self, file_id: str) -> bytes | None:
+        """Return the contents of a report run's file.
+
+        Args:
+            file_id: The file id.
+
+        Returns:
+            The CSV file, or ``None`` if unknown.
+        """
+        with self._lock:
+            return self._files.get(file_id)
+
+    def _report_csv(self, parameters: dict) -> bytes:
+        start, end = parameters["interval_start"], parameters["interval_end"]
+        transactions = sorted(
+            (
+                txn
+                for txn in self.objects.get("/v1/balance_transactions", [])
+                if start <= txn["created"] < end
+            ),
+            key=lambda txn: (txn["created"], txn["id"]),
+        )
+        text = io.StringIO()
+        writer = csv.writer(text)
+        columns = [_BALANCE_REPORT_COLUMNS[name] for name in parameters["columns"]]
+        writer.writerow(parameters["columns"])
+        for txn in transactions:
+            writer.writerow([column(txn) for column in columns])
+        return text.getvalue().encode()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                if not self._admit():
+                    return
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path.startswith(("/v1/reporting/", "/v1/files/")):
+                    self._send_report(url.path)
+                    return
+                params = {k: v[0] for k, v in query.items()}
+                types = query.get("types[]") or [
+                    kind for kind in query.get("type", []) if kind != "*"
+                ]
+                self._send(200, server.list_page(url.path, params, types=types))
+
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("Content-Length", 0))
+                params = parse_qs(self.rfile.read(length).decode())
+                if not self._admit():
+                    return
+                if not server.reporting:
+                    self._send(403, _PERMISSION_ERROR)
+                    return
+                run = None
+                if urlparse(self.path).path == "/v1/reporting/report_runs":
+                    run = server.create_report_run(params)
+                self._send(*((200, run) if run else (404, _MISSING_ERROR)))
+
+            def _admit(self) -> bool:
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._throttle():
+                    self._send(429, _RATE_LIMIT_ERROR)
+                    return False
+                return True
+
+            def _send_report(self, path: str) -> None:
+                if not server.reporting:
+                    self._send(403, _PERMISSION_ERROR)
+                    return
+                if path.startswith("/v1/files/") and path.endswith("/contents"):
+                    contents = server.report_file(path.split("/")[3])
+                    if contents is not None:
+                        self._send_body(200, contents, "text/csv")
+                        return
+                kind, _, name = path.rpartition("/")
+                retrieve = {
+                    "/v1/reporting/report_types": server.report_type,
+                    "/v1/reporting/report_runs": server.retrieve_report_run,
+                }.get(kind)
+                found = retrieve(name) if retrieve else None
+                self._send(*((200, found) if found else (404, _MISSING_ERROR)))
+
+            def _send(self, status: int, page: dict) -> None:
+                self._send_body(status, json.dumps(page).encode(), "application/json")
+
+            def _send_body(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=1)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: t.Any) -> None:  # noqa: ARG002
+                return
+
+        return Handler
+
+    def _throttle(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            throttled = bool(
+                self.rate_limit_every and self.requests % self.rate_limit_every == 0
+            )
+            self.throttled += throttled
+        return throttled
+
+
+def _self_signed_certificate() -> tuple[str, str]:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    directory = tempfile.mkdtemp(prefix="fake-stripe-")
+    cert_path, key_path = f"{directory}/cert.pem", f"{directory}/key.pem"
+    with open(cert_path, "wb") as cert_file:  # noqa: PTH123
+        cert_file.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as key_file:  # noqa: PTH123
+        key_file.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+def _serve(objects: dict[str, list[dict]], options: dict, conn: t.Any) -> None:  # noqa: ANN401
+    server = FakeStripeServer(objects, **options)
+    conn.send(server.url)
+    server.serve_forever()
+
+
+class FakeStripeProcess:
+    """Run a :class:`FakeStripeServer` in a child process.
+
+    Keeps the server's CPU time out of the process being measured.
+    """
+
+    def __init__(self, objects: dict[str, list[dict]], **options: t.Any) -> None:
+        """Create a server process.
+
+        Args:
+            objects: Objects per API path, newest first.
+            **options: Options of :class:`FakeStripeServer`, such as ``tls``.
+        """
+        import multiprocessing
+
+        self._parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(objects, options, child),
+            daemon=True,
+        )
+        self.url = ""
+
+    def __enter__(self) -> FakeStripeProcess:  # noqa: D105
+        self._process.start()
+        self.url = self._parent.recv()
+        return self
+
+    def __exit__(self, *exc: object) -> None:  # noqa: D105
+        self._process.terminate()
+        self._process.join()
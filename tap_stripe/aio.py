@@ -0,0 +1,345 @@
+"""Asyncio/HTTP2 fetch engine, an alternative to blocking ``requests`` calls.
+
+Requires the ``async`` extra (``httpx[http2]``). Pages fetched here are turned
+back into :class:`requests.Response` objects, so they go through the same
+``validate_response``/``parse_response``/``post_process`` path as pages fetched
+with ``requests``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import threading
+import time
+import typing as t
+
+import requests
+
+if t.TYPE_CHECKING:
+    import httpx
+
+    from tap_stripe.backfill import TimeWindow
+    from tap_stripe.client import StripeStream
+
+T = t.TypeVar("T")
+
+_DONE = object()
+
+# Connection-specific headers are not allowed over HTTP/2.
+_HOP_BY_HOP_HEADERS = frozenset({"connection", "keep-alive", "transfer-encoding"})
+
+
+class AsyncEngine:
+    """Run many Stripe requests concurrently from a single event loop thread.
+
+    Requests are multiplexed over at most ``max_connections`` HTTP/2
+    connections, with at most ``max_concurrency`` requests in flight. They take
+    tokens from the tap's shared request scheduler like every other request.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 100,
+        max_connections: int = 10,
+        timeout: float = 300,
+        verify: bool = True,
+    ) -> None:
+        """Create an engine. The event loop starts on first use.
+
+        Args:
+            max_concurrency: Maximum number of requests in flight.
+            max_connections: Maximum number of HTTP connections.
+            timeout: Request timeout, in seconds.
+            verify: Whether to verify TLS certificates.
+
+        Raises:
+            ImportError: If the ``async`` extra is not installed.
+        """
+        try:
+            import httpx  # noqa: F401
+        except ImportError as ex:
+            msg = (
+                "The async engine requires httpx. Install tap-stripe with the "
+                "`async` extra: pip install 'keragon-tap-stripe[async]'"
+            )
+            raise ImportError(msg) from ex
+
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.verify = verify
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+
+    # Event loop management
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The engine's event loop, running on a daemon thread."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="stripe-async",
+                    daemon=True,
+                )
+                self._thread.start()
+                self._run(self._start()).result()
+            return self._loop
+
+    def _run(self, coro: t.Coroutine[t.Any, t.Any, T]) -> t.Any:  # noqa: ANN401
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _start(self) -> None:
+        import httpx
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=self.timeout,
+            verify=self.verify,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    def close(self) -> None:
+        """Close connections and stop the event loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+
+    # Requests
+
+    async def send(
+        self,
+        stream: StripeStream,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,  # noqa: ARG002
+    ) -> requests.Response:
+        """Send one request, respecting the shared request budget.
+
+        Args:
+            stream: The stream the request belongs to.
+            prepared_request: The request, as built by ``prepare_request``.
+            context: The stream context.
+
+        Returns:
+            The validated response.
+        """
+        import httpx
+
+        headers = {
+            key: value
+            for key, value in prepared_request.headers.items()
+            if key.lower() not in _HOP_BY_HOP_HEADERS
+        }
+        async with self._semaphore:
+            await stream.scheduler.acquire_async()
+            started = time.perf_counter()
+            try:
+                response = await self._client.request(
+                    prepared_request.method,
+                    prepared_request.url,
+                    headers=headers,
+                    content=prepared_request.body,
+                )
+            except httpx.TransportError as ex:
+                # Surface as the error the stream's backoff already retries.
+                raise requests.exceptions.ConnectionError(str(ex)) from ex
+            elapsed = time.perf_counter() - started
+        result = to_requests_response(response, prepared_request)
+        stream.scheduler.record_response(result, elapsed)
+        if stream.telemetry is not None:
+            stream.telemetry.observe_request(result, elapsed)
+        stream.validate_response(result)
+        return result
+
+    async def paginate(
+        self,
+        stream: StripeStream,
+        context: dict | None,
+        window: TimeWindow,
+    ) -> t.AsyncIterator[requests.Response]:
+        """Fetch every page of one time window.
+
+        Args:
+            stream: The stream to fetch.
+            context: The stream context.
+            window: The ``created`` window.
+
+        Yields:
+            Each page's response, decoded.
+        """
+        from tap_stripe.client import get_page
+
+        send = stream.request_decorator(self.send)
+        paginator = stream.get_new_paginator(window)
+        while not paginator.finished:
+            prepared_request = stream.prepare_request(
+                context,
+                next_page_token=paginator.current_value,
+            )
+            response = await send(stream, prepared_request, context)
+            get_page(response)
+            yield response
+            paginator.advance(response)
+
+    def fetch_ordered(
+        self,
+        windows: t.Iterable[TimeWindow],
+        fetch: t.Callable[[TimeWindow], t.AsyncIterator[T]],
+        *,
+        max_in_flight: int | None = None,
+        buffer_size: int = 2,
+    ) -> t.Iterator[tuple[TimeWindow, t.Iterator[T]]]:
+        """Fetch windows concurrently on the event loop, yielding them in order.
+
+        This is the asyncio counterpart of
+        :func:`tap_stripe.backfill.fetch_ordered`: windows are tasks rather
+        than threads, so hundreds can be in flight at once.
+
+        Args:
+            windows: Windows to fetch, in the order their items are yielded.
+            fetch: Returns an async iterator over the items of one window.
+            max_in_flight: Maximum number of windows fetched concurrently,
+                defaults to ``max_concurrency``.
+            buffer_size: Maximum number of buffered items per window.
+
+        Yields:
+            ``(window, items)`` pairs. ``items`` must be exhausted before the next
+            pair is requested.
+        """
+        fetcher: _TaskFetcher[T] = _TaskFetcher(
+            self, fetch, max_in_flight or self.max_concurrency, buffer_size
+        )
+        window_iter = iter(windows)
+        try:
+            fetcher.submit(window_iter)
+            while fetcher.pending:
+                window, buffer, _ = fetcher.pending.popleft()
+                yield window, fetcher.drain(buffer)
+                fetcher.submit(window_iter)
+        finally:
+            fetcher.cancel()
+
+    def get_many(
+        self,
+        stream: StripeStream,
+        prepared_requests: t.Sequence[requests.PreparedRequest],
+        context: dict | None = None,
+    ) -> list[requests.Response]:
+        """Send independent requests (e.g. object detail lookups) concurrently.
+
+        Args:
+            stream: The stream the requests belong to.
+            prepared_requests: The requests to send.
+            context: The stream context.
+
+        Returns:
+            The responses, in the order of ``prepared_requests``.
+        """
+        self.loop  # noqa: B018
+        send = stream.request_decorator(self.send)
+
+        async def _gather() -> list[requests.Response]:
+            return await asyncio.gather(
+                *(send(stream, request, context) for request in prepared_requests)
+            )
+
+        return self._run(_gather()).result()
+
+
+class _TaskFetcher(t.Generic[T]):
+    """The windows in flight of :meth:`AsyncEngine.fetch_ordered`, oldest first."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        fetch: t.Callable[[TimeWindow], t.AsyncIterator[T]],
+        max_in_flight: int,
+        buffer_size: int,
+    ) -> None:
+        self.pending: collections.deque[tuple[TimeWindow, asyncio.Queue, t.Any]] = (
+            collections.deque()
+        )
+        self._loop = engine.loop
+        self._run_coroutine = engine._run  # noqa: SLF001
+        self._fetch = fetch
+        self._max_in_flight = max_in_flight
+        self._buffer_size = buffer_size
+
+    def submit(self, windows: t.Iterator[TimeWindow]) -> None:
+        """Start tasks fetching windows until ``max_in_flight`` are running."""
+        while len(self.pending) < self._max_in_flight:
+            window = next(windows, None)
+            if window is None:
+                return
+            buffer, task = self._run_coroutine(self._start(window)).result()
+            self.pending.append((window, buffer, task))
+
+    def drain(self, buffer: asyncio.Queue) -> t.Iterator[T]:
+        """Yield the items of a window, re-raising the error of its fetch."""
+        while True:
+            item = self._run_coroutine(buffer.get()).result()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def cancel(self) -> None:
+        """Cancel the tasks of the windows not consumed."""
+        for _, _, task in self.pending:
+            self._loop.call_soon_threadsafe(task.cancel)
+
+    async def _start(self, window: TimeWindow) -> tuple[asyncio.Queue, asyncio.Task]:
+        buffer: asyncio.Queue = asyncio.Queue(maxsize=self._buffer_size)
+        return buffer, self._loop.create_task(self._run(window, buffer))
+
+    async def _run(self, window: TimeWindow, buffer: asyncio.Queue) -> None:
+        try:
+            async for item in self._fetch(window):
+                await buffer.put(item)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as ex:  # noqa: BLE001
+            await buffer.put(ex)
+            return
+        await buffer.put(_DONE)
+
+
+def to_requests_response(
+    response: httpx.Response,
+    prepared_request: requests.PreparedRequest,
+) -> requests.Response:
+    """Convert an ``httpx`` response into a :class:`requests.Response`.
+
+    Args:
+        response: The ``httpx`` response, already read.
+        prepared_request: The request it answers.
+
+    Returns:
+        An equivalent ``requests`` response.
+    """
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.headers.update(response.headers)
+    result._content = response.content  # noqa: SLF001
+    result.encoding = response.encoding
+    result.reason = response.reason_phrase
+    result.url = str(response.url)
+    result.request = prepared_request
+    return result
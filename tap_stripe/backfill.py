@@ -0,0 +1,307 @@
+"""Time-sliced backfills over Stripe's ``created`` timestamp."""
+
+from __future__ import annotations
+
+import collections
+import queue
+import threading
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+T = t.TypeVar("T")
+
+MIN_WINDOW_SECONDS = 60 * 60
+MAX_WINDOW_SECONDS = 366 * 24 * 60 * 60
+
+_DONE = object()
+
+
+class TimeWindow(t.NamedTuple):
+    """A half-open ``[start, end)`` range of ``created`` Unix timestamps."""
+
+    start: int
+    end: int
+
+
+class PageCursor(t.NamedTuple):
+    """Pagination token for a page within a time window."""
+
+    window: TimeWindow
+    starting_after: str | None = None
+
+
+class PageCheckpoint:
+    """Progress through a ``created`` range listed newest first.
+
+    Every object of ``[start, end)`` created after ``last_created`` has been
+    emitted, and so have the objects created at ``last_created`` whose ids are
+    in ``last_ids``. The rest of the range, ``[start, last_created]`` less
+    those objects, is what a resumed sync still has to read.
+    """
+
+    def __init__(
+        self,
+        start: int,
+        end: int | None = None,
+        *,
+        max_created: int | None = None,
+    ) -> None:
+        """Create a checkpoint before the first object of the range.
+
+        Args:
+            start: Inclusive lower bound of the range, as a Unix timestamp.
+            end: Exclusive upper bound of the range, or ``None`` when unbounded.
+            max_created: Highest ``created`` timestamp emitted in the sync.
+        """
+        self.start = start
+        self.end = end
+        #: ``created`` timestamp of the last object emitted.
+        self.last_created: int | None = None
+        #: Ids of the objects emitted that were created at ``last_created``.
+        self.last_ids: list[str] = []
+        self.max_created = max_created
+        #: Number of pages emitted in the range.
+        self.pages = 0
+
+    @classmethod
+    def from_dict(cls, value: dict) -> PageCheckpoint:
+        """Load a checkpoint saved in state.
+
+        Args:
+            value: The output of :meth:`to_dict`.
+
+        Returns:
+            The checkpoint.
+        """
+        checkpoint = cls(
+            value["created_gte"],
+            value.get("created_lt"),
+            max_created=value.get("max_created"),
+        )
+        checkpoint.last_created = value.get("last_created")
+        checkpoint.last_ids = list(value.get("last_ids", ()))
+        checkpoint.pages = value.get("pages", 0)
+        return checkpoint
+
+    def to_dict(self) -> dict:
+        """Return the checkpoint as it is saved in state."""
+        return {
+            "created_gte": self.start,
+            "created_lt": self.end,
+            "last_created": self.last_created,
+            "last_ids": list(self.last_ids),
+            "max_created": self.max_created,
+            "pages": self.pages,
+        }
+
+    def observe(self, created: int, object_id: str) -> None:
+        """Record an emitted object.
+
+        Args:
+            created: The object's ``created`` timestamp.
+            object_id: The object's id.
+        """
+        if created != self.last_created:
+            self.last_created = created
+            self.last_ids = []
+        self.last_ids.append(object_id)
+        if self.max_created is None or created > self.max_created:
+            self.max_created = created
+
+    @property
+    def remaining(self) -> TimeWindow | None:
+        """The part of the range still to be read, if any object was emitted."""
+        if self.last_created is None:
+            return None
+        return TimeWindow(self.start, self.last_created + 1)
+
+    def skip_emitted(self, records: t.Iterable[T]) -> t.Iterator[T]:
+        """Drop the objects of ``records`` emitted before the checkpoint.
+
+        Args:
+            records: Records of :attr:`remaining`, and possibly page markers.
+
+        Returns:
+            An iterator over the records not emitted yet.
+        """
+        last_created, emitted = self.last_created, frozenset(self.last_ids)
+        return (
+            record
+            for record in records
+            if not (
+                isinstance(record, dict)
+                and record.get("created") == last_created
+                and record.get("id") in emitted
+            )
+        )
+
+
+class WindowPlanner:
+    """Split ``[start, end)`` into consecutive windows sized by record density.
+
+    Windows start at ``window_seconds`` wide. Each completed window reported
+    through :meth:`observe` re-sizes the windows that have not been handed out
+    yet so that they hold roughly ``target_records`` objects: sparse periods of
+    an account's history are covered by a few wide windows, busy periods by
+    many narrow ones.
+    """
+
+    def __init__(
+        self,
+        start: int,
+        end: int,
+        *,
+        window_seconds: int,
+        target_records: int | None = None,
+    ) -> None:
+        """Create a new planner.
+
+        Args:
+            start: Inclusive lower bound, as a Unix timestamp.
+            end: Exclusive upper bound, as a Unix timestamp.
+            window_seconds: Width of the first window.
+            target_records: Desired number of records per window, or ``None``
+                to keep every window ``window_seconds`` wide.
+        """
+        self.start = start
+        self.end = end
+        self.window_seconds = max(1, window_seconds)
+        self.target_records = target_records
+        self._next_start = start
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> t.Iterator[TimeWindow]:
+        """Yield windows until the range is exhausted.
+
+        Yields:
+            Consecutive, non-overlapping windows in ascending order.
+        """
+        while True:
+            with self._lock:
+                if self._next_start >= self.end:
+                    return
+                window = TimeWindow(
+                    self._next_start,
+                    min(self._next_start + self.window_seconds, self.end),
+                )
+                self._next_start = window.end
+            yield window
+
+    def observe(self, window: TimeWindow, record_count: int) -> None:
+        """Re-size upcoming windows from the density of a completed one.
+
+        Args:
+            window: The completed window.
+            record_count: Number of records it contained.
+        """
+        if not self.target_records:
+            return
+        width = window.end - window.start
+        if record_count:
+            size = int(width * self.target_records / record_count)
+        else:
+            size = width * 2
+        with self._lock:
+            self.window_seconds = min(
+                max(size, MIN_WINDOW_SECONDS),
+                MAX_WINDOW_SECONDS,
+            )
+
+
+def fetch_ordered(
+    windows: t.Iterable[TimeWindow],
+    fetch: t.Callable[[TimeWindow], t.Iterable[T]],
+    *,
+    max_workers: int,
+    buffer_size: int = 2,
+) -> t.Iterator[tuple[TimeWindow, t.Iterator[T]]]:
+    """Fetch windows concurrently and yield their items in window order.
+
+    At most ``max_workers`` windows are in flight at once. Each keeps up to
+    ``buffer_size`` items buffered, so a worker that runs ahead of the
+    consumer blocks instead of holding a whole window in memory. A new window
+    is only taken from ``windows`` once the oldest one has been fully
+    consumed, which lets a :class:`WindowPlanner` adapt to what it has seen.
+
+    Args:
+        windows: Windows to fetch, in the order their items should be yielded.
+        fetch: Callable returning the items of one window. Called on a worker
+            thread.
+        max_workers: Maximum number of windows fetched concurrently.
+        buffer_size: Maximum number of buffered items per window.
+
+    Yields:
+        ``(window, items)`` pairs. ``items`` must be exhausted before the next
+        pair is requested.
+    """
+    fetcher: _WindowFetcher[T] = _WindowFetcher(windows, fetch, buffer_size)
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="stripe-window",
+    )
+    try:
+        fetcher.submit(executor, max_workers)
+        while fetcher.pending:
+            window, buffer = fetcher.pending.popleft()
+            yield window, fetcher.drain(buffer)
+            fetcher.submit(executor, max_workers)
+    finally:
+        fetcher.stop.set()
+        executor.shutdown(wait=True)
+
+
+class _WindowFetcher(t.Generic[T]):
+    """The windows in flight of :func:`fetch_ordered`, oldest first."""
+
+    def __init__(
+        self,
+        windows: t.Iterable[TimeWindow],
+        fetch: t.Callable[[TimeWindow], t.Iterable[T]],
+        buffer_size: int,
+    ) -> None:
+        self.stop = threading.Event()
+        self.pending: collections.deque[tuple[TimeWindow, queue.Queue]] = (
+            collections.deque()
+        )
+        self._windows = iter(windows)
+        self._fetch = fetch
+        self._buffer_size = buffer_size
+
+    def submit(self, executor: ThreadPoolExecutor, max_workers: int) -> None:
+        """Start fetching windows until ``max_workers`` are in flight."""
+        while len(self.pending) < max_workers:
+            window = next(self._windows, None)
+            if window is None:
+                return
+            buffer: queue.Queue = queue.Queue(maxsize=self._buffer_size)
+            executor.submit(self._run, window, buffer)
+            self.pending.append((window, buffer))
+
+    def drain(self, buffer: queue.Queue) -> t.Iterator[T]:
+        """Yield the items of a window, re-raising the error of its fetch."""
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def _put(self, buffer: queue.Queue, item: object) -> bool:
+        while not self.stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _run(self, window: TimeWindow, buffer: queue.Queue) -> None:
+        try:
+            for item in self._fetch(window):
+                if not self._put(buffer, item):
+                    return
+        except BaseException as ex:  # noqa: BLE001
+            self._put(buffer, ex)
+            return
+        self._put(buffer, _DONE)
@@ -0,0 +1,197 @@
+"""BATCH output: records written to gzipped JSON Lines or Parquet files.
+
+Parquet requires the ``parquet`` extra (``pyarrow``), S3 storage the ``s3``
+extra (``fs-s3fs``). Records are encoded with ``orjson`` when it is installed
+(the ``fast-json`` extra).
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import typing as t
+from urllib.parse import urlparse
+from uuid import uuid4
+
+from fs import open_fs
+
+if t.TYPE_CHECKING:
+    from fs.base import FS
+    from singer_sdk.helpers._batch import BatchConfig
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Lines are handed to the compressor in blocks of about this size.
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Batch files are transient; the fastest level writes several times faster
+# than gzip's default of 9, for files about a quarter larger.
+_GZIP_LEVEL = 1
+
+
+def encode_record(record: dict) -> bytes:
+    """Encode a record as compact JSON.
+
+    Args:
+        record: A conformed record.
+
+    Returns:
+        The UTF-8 encoded JSON, without a trailing newline.
+    """
+    if orjson is not None:
+        return orjson.dumps(record, default=str)
+    return json.dumps(record, default=str, separators=(",", ":")).encode()
+
+
+def require_batch_dependencies(batch_config: BatchConfig) -> None:
+    """Check that the extras needed by ``batch_config`` are installed.
+
+    Args:
+        batch_config: The ``batch_config`` setting.
+
+    Raises:
+        ImportError: If the format or the storage requires a missing extra.
+    """
+    if batch_config.encoding.format == "parquet":
+        try:
+            import pyarrow as pa  # noqa: F401
+        except ImportError as ex:
+            msg = (
+                "Parquet batch files require pyarrow. Install tap-stripe with the "
+                "`parquet` extra: pip install 'keragon-tap-stripe[parquet]'"
+            )
+            raise ImportError(msg) from ex
+    if urlparse(batch_config.storage.root).scheme == "s3":
+        try:
+            import fs_s3fs  # noqa: F401
+        except ImportError as ex:
+            msg = (
+                "Batch files on S3 require fs-s3fs. Install tap-stripe with the "
+                "`s3` extra: pip install 'keragon-tap-stripe[s3]'"
+            )
+            raise ImportError(msg) from ex
+
+
+class BatchWriter:
+    """Write the records of one stream to bounded batch files.
+
+    A file is completed once it holds ``batch_config.batch_size`` records or
+    ``max_bytes`` bytes of encoded JSON, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        batch_config: BatchConfig,
+        *,
+        tap_name: str,
+        stream_name: str,
+        max_bytes: int | None = None,
+    ) -> None:
+        """Create a writer. Files are only created once records are written.
+
+        Args:
+            batch_config: The ``batch_config`` setting.
+            tap_name: The tap name, used in file names.
+            stream_name: The stream name, used in file names.
+            max_bytes: Size bound of a file, in bytes of uncompressed JSON.
+        """
+        self.batch_config = batch_config
+        self.max_records = batch_config.batch_size
+        self.max_bytes = max_bytes
+        self.parquet = batch_config.encoding.format == "parquet"
+        self.gzip = batch_config.encoding.compression == "gzip"
+        self._sync_id = f"{tap_name}--{stream_name}-{uuid4()}"
+        self._file_count = 0
+        self._fs: FS | None = None
+        self._filename = ""
+        self._raw: t.BinaryIO | None = None
+        self._file: t.Any = None
+        self._buffer: list[bytes] = []
+        self._buffer_size = 0
+        self._rows: list[dict] = []
+        self.records = 0
+        self.bytes = 0
+
+    def write(self, record: dict) -> str | None:
+        """Add a record to the current file.
+
+        Args:
+            record: A conformed record.
+
+        Returns:
+            The URL of the file, if this record completed it.
+        """
+        if self.records == 0:
+            self._open()
+        line = encode_record(record)
+        self.records += 1
+        self.bytes += len(line) + 1
+        if self.parquet:
+            self._rows.append(record)
+        else:
+            self._buffer.append(line)
+            self._buffer_size += len(line) + 1
+            if self._buffer_size >= _WRITE_BUFFER_SIZE:
+                self._write_buffer()
+        if self.records >= self.max_records or (
+            self.max_bytes is not None and self.bytes >= self.max_bytes
+        ):
+            return self.close()
+        return None
+
+    def close(self) -> str | None:
+        """Complete the current file.
+
+        Returns:
+            The URL of the file, or ``None`` if no record was written to it.
+        """
+        if self.records == 0:
+            return None
+        if self.parquet:
+            self._write_parquet()
+        else:
+            self._write_buffer()
+        if self._file is not self._raw:
+            self._file.close()
+        self._raw.close()
+        url = self._fs.geturl(self._filename)
+        self._fs.close()
+        self._fs = self._raw = self._file = None
+        self.records = self.bytes = 0
+        return url
+
+    def _open(self) -> None:
+        self._file_count += 1
+        prefix = self.batch_config.storage.prefix or ""
+        extension = "parquet" if self.parquet else "jsonl"
+        self._filename = f"{prefix}{self._sync_id}-{self._file_count}.{extension}"
+        if self.gzip:
+            self._filename += ".gz"
+        self._fs = open_fs(self.batch_config.storage.fs_url.geturl(), create=True)
+        self._raw = self._file = self._fs.open(self._filename, "wb")
+        if self.gzip and not self.parquet:
+            self._file = gzip.GzipFile(
+                fileobj=self._raw, mode="wb", compresslevel=_GZIP_LEVEL
+            )
+
+    def _write_buffer(self) -> None:
+        if self._buffer:
+            self._buffer.append(b"")
+            self._file.write(b"\n".join(self._buffer))
+            self._buffer.clear()
+            self._buffer_size = 0
+
+    def _write_parquet(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist(self._rows)
+        self._rows.clear()
+        pq.write_table(
+            table,
+            self._file,
+            compression="GZIP" if self.gzip else "snappy",
+        )
@@ -0,0 +1,159 @@
+"""Record real API responses to a cassette file, and replay them offline.
+
+A cassette is a JSON Lines file with one interaction per line: the request
+method, path and query, and ``Stripe-Account`` header, and the response
+status, headers and decoded body. API keys and cookies are never recorded.
+
+Replayed responses are served without a connection, in the order they were
+recorded for each request; the last response recorded for a request is
+replayed for any further identical request. Responses are built like real
+ones, so streaming parsing reads them incrementally.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import typing as t
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+if t.TYPE_CHECKING:
+    import requests
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Response headers describing the original transfer or session rather than the
+# recorded body.
+_DROPPED_HEADERS = frozenset(
+    {
+        "connection",
+        "content-encoding",
+        "content-length",
+        "set-cookie",
+        "transfer-encoding",
+    }
+)
+
+
+class CassetteMissError(LookupError):
+    """Raised when a replayed request was not recorded."""
+
+
+def interaction_key(request: requests.PreparedRequest) -> str:
+    """Return the key matching a request with its recorded response.
+
+    The host is left out, so cassettes recorded against the API replay with
+    any ``api_url``, and query parameters are sorted.
+
+    Args:
+        request: The prepared request.
+
+    Returns:
+        The method, path, sorted query and ``Stripe-Account`` of the request.
+    """
+    url = urlsplit(request.url)
+    query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+    account = request.headers.get("Stripe-Account", "")
+    return f"{request.method} {url.path}?{query} {account}".rstrip()
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter recording responses to, or replaying them from, a file."""
+
+    def __init__(self, path: str, mode: str = REPLAY, **kwargs: t.Any) -> None:
+        """Create an adapter.
+
+        Args:
+            path: The cassette file. Recorded interactions are appended to it.
+            mode: ``record`` to call the API and record its responses, or
+                ``replay`` to answer from the cassette only.
+            **kwargs: Keyword arguments of :class:`HTTPAdapter`.
+
+        Raises:
+            ValueError: If ``mode`` is unknown.
+        """
+        if mode not in {RECORD, REPLAY}:
+            msg = f"Unknown cassette mode {mode!r}, expected 'record' or 'replay'"
+            raise ValueError(msg)
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._file: t.TextIO | None = None
+        self._recorded: dict[str, list[dict]] = defaultdict(list)
+        self._replayed: dict[str, int] = defaultdict(int)
+        if mode == REPLAY:
+            with self.path.open(encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        interaction = json.loads(line)
+                        self._recorded[interaction["key"]].append(interaction)
+
+    def send(  # noqa: D102
+        self,
+        request: requests.PreparedRequest,
+        *args: t.Any,
+        **kwargs: t.Any,
+    ) -> requests.Response:
+        key = interaction_key(request)
+        if self.mode == REPLAY:
+            return self._build(request, self._next_interaction(key))
+
+        response = super().send(request, *args, **kwargs)
+        interaction = {
+            "key": key,
+            "status": response.status_code,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+            "body": response.content.decode("utf-8"),
+        }
+        response.close()
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write(json.dumps(interaction) + "\n")
+            self._file.flush()
+        return self._build(request, interaction)
+
+    def close(self) -> None:
+        """Close the cassette file and the pooled connections."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        super().close()
+
+    def _next_interaction(self, key: str) -> dict:
+        interactions = self._recorded.get(key)
+        if not interactions:
+            msg = f"No response recorded in {self.path} for request {key}"
+            raise CassetteMissError(msg)
+        with self._lock:
+            index = min(self._replayed[key], len(interactions) - 1)
+            self._replayed[key] += 1
+        return interactions[index]
+
+    def _build(
+        self,
+        request: requests.PreparedRequest,
+        interaction: dict,
+    ) -> requests.Response:
+        raw = HTTPResponse(
+            body=io.BytesIO(interaction["body"].encode("utf-8")),
+            headers=interaction["headers"],
+            status=interaction["status"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
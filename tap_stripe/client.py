@@ -3,50 +3,353 @@
 from __future__ import annotations
 
 import datetime
+import itertools
+import json
 import sys
-from typing import Any, Callable, Iterable
+import threading
+import time
 import typing
+from functools import cached_property, lru_cache, partial
+from typing import Any, AsyncIterator, Callable, Generator, Iterable, Iterator
 
 import requests
+from singer_sdk import metrics
 from singer_sdk.authenticators import BearerTokenAuthenticator
-from singer_sdk.helpers.jsonpath import extract_jsonpath
-from singer_sdk.pagination import BaseOffsetPaginator  # noqa: TCH002
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+from singer_sdk.helpers._catalog import pop_deselected_record_properties
+from singer_sdk.helpers._typing import TypeConformanceLevel
+from singer_sdk.pagination import BaseAPIPaginator, BaseOffsetPaginator
 from singer_sdk.streams import RESTStream
 
+from tap_stripe.backfill import (
+    PageCheckpoint,
+    PageCursor,
+    TimeWindow,
+    WindowPlanner,
+    fetch_ordered,
+)
+from tap_stripe.batch import BatchWriter, require_batch_dependencies
+from tap_stripe.conformance import SchemaConformer
+from tap_stripe.ratelimit import RequestScheduler, is_throttled, should_retry
+from tap_stripe.reporting import iter_report_rows
+from tap_stripe.selection import FieldMask, build_field_mask, prune_record
+from tap_stripe.streaming import iter_page_records, require_ijson
+
 if sys.version_info >= (3, 9):
     import importlib.resources as importlib_resources
 else:
     import importlib_resources
 
+if typing.TYPE_CHECKING:
+    from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig
+
+    from tap_stripe.aio import AsyncEngine
+    from tap_stripe.telemetry import StreamTelemetry
+
 _Auth = Callable[[requests.PreparedRequest], requests.PreparedRequest]
 
 TPageToken = typing.TypeVar("TPageToken")
 
-# TODO: Delete this is if not using json files for schema definition
+#: How long Stripe keeps events, in seconds.
+EVENTS_RETENTION = 30 * 24 * 60 * 60
+
+# Marks the end of a page among the records of a backfill window.
+_PAGE_END = object()
+
+# Rows of a report file handled like a list page: child streams are synced and
+# the bookmark is committed after each of them.
+_REPORT_PAGE_ROWS = 1000
+
+#: Packaged JSON schemas of the streams, see :mod:`tap_stripe.schemas.definitions`.
 SCHEMAS_DIR = importlib_resources.files(__package__) / "schemas"
 
+
+@lru_cache(maxsize=None)
+def load_schema(filename: str) -> dict:
+    """Read a packaged stream schema, once per process.
+
+    Args:
+        filename: The file name in :data:`SCHEMAS_DIR`.
+
+    Returns:
+        The JSON schema, shared by every stream that uses the file.
+    """
+    return json.loads((SCHEMAS_DIR / filename).read_text(encoding="utf-8"))
+
+
+class SchemaFile:
+    """The ``schema`` of a stream class, read from its JSON file on first use.
+
+    Importing the streams reads no file; constructing a stream, or reading
+    ``schema`` from its class, does.
+    """
+
+    def __init__(self, filename: str) -> None:
+        """Declare the schema file.
+
+        Args:
+            filename: The file name in :data:`SCHEMAS_DIR`.
+        """
+        self.filename = filename
+
+    def __get__(self, instance: object, owner: type) -> dict:
+        """Return the schema of the class.
+
+        As this descriptor defines no ``__set__``, a schema assigned to a stream
+        instance takes precedence.
+
+        Args:
+            instance: The stream, or ``None`` when read from the class.
+            owner: The stream class.
+
+        Returns:
+            The JSON schema.
+        """
+        return load_schema(self.filename)
+
+
+def get_page(response: requests.Response) -> dict:
+    """Return the decoded body of a Stripe list page.
+
+    The body is decoded once and memoized on the response object, so the
+    paginator and the record parser share a single ``json()`` call per page.
+
+    Args:
+        response: The HTTP ``requests.Response`` object.
+
+    Returns:
+        The decoded list object.
+    """
+    page = getattr(response, "_stripe_page", None)
+    if page is None:
+        page = response.json()
+        response._stripe_page = page  # noqa: SLF001
+    return page
+
+
+def to_epoch(value: Any) -> int | None:  # noqa: ANN401
+    """Convert a bookmark or ``start_date`` value to a Unix timestamp.
+
+    Stripe ``created`` bookmarks are integers, but state written by older
+    versions of the tap (or edited by hand) and the ``start_date`` setting are
+    ISO 8601 strings. Naive datetimes are assumed to be UTC.
+
+    Args:
+        value: An epoch (int, float or numeric string), an ISO 8601 string or a
+            ``datetime``.
+
+    Returns:
+        The value as whole seconds since the epoch, or ``None`` if empty or
+        blank.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime.datetime):
+        moment = value
+    else:
+        text = str(value).strip()
+        if not text:
+            return None
+        if text.lstrip("-").isdigit():
+            return int(text)
+        if text[-1] in "Zz":
+            text = text[:-1] + "+00:00"
+        moment = datetime.datetime.fromisoformat(text)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp())
+
+
 class StripePaginator(BaseOffsetPaginator):
-    def has_more(self, response: requests.Response) -> bool:  # noqa: ARG002
-        return response.json()["has_more"]
+    def has_more(self, response: requests.Response) -> bool:
+        return get_page(response)["has_more"]
 
     def get_next(self, response: requests.Response) -> TPageToken | None:
-        return response.json()["data"][-1]["id"]
+        data = get_page(response)["data"]
+        if not data:
+            return None
+        if isinstance(self.current_value, PageCursor):
+            return self.current_value._replace(starting_after=data[-1]["id"])
+        return data[-1]["id"]
+
+
+class StripeSearchPaginator(BaseAPIPaginator):
+    """Follow the ``next_page`` cursors of Stripe search results."""
+
+    def has_more(self, response: requests.Response) -> bool:
+        return get_page(response)["has_more"]
+
+    def get_next(self, response: requests.Response) -> str | None:
+        return get_page(response).get("next_page")
+
 
 class StripeStream(RESTStream):
     """Stripe stream class."""
 
+    replication_key = "created"
+
+    # Stripe list endpoints return the newest objects first, so the bookmark
+    # can only be promoted once the whole stream has been read.
+    is_sorted = False
+
     @property
     def url_base(self) -> str:
-        return "https://api.stripe.com/v1"
+        return self.config.get("api_url") or "https://api.stripe.com/v1"
+
+    records_jsonpath = "$.data[*]"  # Parsed directly in `parse_response`.
+
+    #: Event types (e.g. ``customer.updated``) whose ``data.object`` is an object
+    #: of this stream, applied with ``events_incremental_sync``.
+    event_types: typing.ClassVar[tuple[str, ...]] = ()
+
+    #: Fields holding the id of another object, which the ``expand`` setting can
+    #: replace with the object itself.
+    expandable_fields: typing.ClassVar[tuple[str, ...]] = ()
+
+    #: Whether ``/<path>/search`` can filter this stream's objects on ``created``.
+    searchable: typing.ClassVar[bool] = False
+
+    #: How :attr:`conformer` conforms records, see ``TYPE_CONFORMANCE_LEVEL``.
+    conformance_level: typing.ClassVar[TypeConformanceLevel] = (
+        TypeConformanceLevel.RECURSIVE
+    )
+
+    # Records are conformed by the compiled conformer before they are written.
+    TYPE_CONFORMANCE_LEVEL = TypeConformanceLevel.NONE
 
-    records_jsonpath = "$.data[*]"  # Or override `parse_response`.
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream.
 
-    # Set this value or override `get_new_paginator`.
-    next_page_token_jsonpath = "$.next_page"  # noqa: S105
+        Args:
+            *args: Positional arguments for the base stream.
+            **kwargs: Keyword arguments for the base stream.
+        """
+        super().__init__(*args, **kwargs)
+        # Account partitions of a stream may be synced on several threads, so
+        # page-level buffers are kept per thread.
+        self._page_buffers = threading.local()
+        schema = self.schema
+        if self.expand and not self.config.get("expand_child_streams"):
+            schema = self._widen_expanded_fields(schema)
+        self.schema = {
+            **schema,
+            "properties": {
+                **schema["properties"],
+                "account_id": {"type": ["string", "null"]},
+            },
+        }
+
+    @property
+    def _pending_page_record(self) -> tuple[dict, dict | None] | None:
+        return getattr(self._page_buffers, "pending_page_record", None)
+
+    @_pending_page_record.setter
+    def _pending_page_record(self, value: tuple[dict, dict | None] | None) -> None:
+        self._page_buffers.pending_page_record = value
+
+    @property
+    def _child_batch(self) -> list[dict]:
+        try:
+            return self._page_buffers.child_batch
+        except AttributeError:
+            self._page_buffers.child_batch = []
+            return self._page_buffers.child_batch
 
     @property
+    def partitions(self) -> list[dict] | None:
+        """One partition per connected account, when syncing several accounts.
+
+        Returns:
+            ``{"account_id": ...}`` contexts, or ``None`` for a single account.
+        """
+        account_ids = self._tap.account_ids
+        if account_ids is None:
+            return super().partitions
+        return [{"account_id": account_id} for account_id in account_ids]
+
+    def get_account_id(self, context: dict | None) -> str | None:
+        """Return the account requests are made on behalf of.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The account of the partition, or the single configured account.
+        """
+        if context and context.get("account_id"):
+            return context["account_id"]
+        account_id = self.config.get("account_id")
+        return account_id if isinstance(account_id, str) else None
+
+    def get_request_headers(self, context: dict | None) -> dict:
+        """Return the HTTP headers of a request made in ``context``.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            :attr:`http_headers`, with ``Stripe-Account`` for Connect accounts.
+        """
+        headers = self.http_headers
+        account_id = self.get_account_id(context)
+        if account_id:
+            headers["Stripe-Account"] = account_id
+        return headers
+
+    @cached_property
+    def expand(self) -> tuple[str, ...]:
+        """The fields expanded into embedded objects, from the ``expand`` setting.
+
+        Returns:
+            The configured fields of this stream that can be expanded.
+        """
+        configured = (self.config.get("expand") or {}).get(self.name) or []
+        unknown = sorted(set(configured) - set(self.expandable_fields))
+        if unknown:
+            self.logger.warning(
+                "Ignoring fields of '%s' that cannot be expanded: %s",
+                self.name,
+                ", ".join(unknown),
+            )
+        return tuple(field for field in configured if field in self.expandable_fields)
+
+    @cached_property
+    def requested_expansions(self) -> tuple[str, ...]:
+        """The expanded fields requested from Stripe for the selected streams.
+
+        Expansions are only requested when their objects are emitted: in the
+        parent field when it is selected, or in the matching child stream
+        with ``expand_child_streams``.
+
+        Returns:
+            The subset of :attr:`expand` to send as ``expand[]``.
+        """
+        if self.config.get("expand_child_streams"):
+            selected = {
+                child.expand_field
+                for child in self.child_streams
+                if isinstance(child, ExpandedObjectStream)
+                and (child.selected or child.has_selected_descendents)
+            }
+            return tuple(field for field in self.expand if field in selected)
+        return tuple(field for field in self.expand if self.mask[("properties", field)])
+
+    def _widen_expanded_fields(self, schema: dict) -> dict:
+        properties = dict(schema["properties"])
+        for field in self.expand:
+            properties[field] = {
+                "anyOf": [
+                    properties[field],
+                    {"type": "object", "additionalProperties": True},
+                ],
+            }
+        return {**schema, "properties": properties}
+
+    @cached_property
     def authenticator(self) -> BearerTokenAuthenticator:
-        """Return a new authenticator object.
+        """Return the authenticator, built once per stream.
 
         Returns:
             An authenticator instance.
@@ -56,6 +359,31 @@ class StripeStream(RESTStream):
             token=self.config.get("api_key", ""),
         )
 
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the pooled HTTP session shared by all streams of the tap.
+
+        Returns:
+            The tap's :class:`requests.Session`.
+        """
+        return self._tap.requests_session
+
+    def build_prepared_request(self, *args: Any, **kwargs: Any) -> requests.PreparedRequest:
+        """Build an authenticated request.
+
+        The authenticator is attached to the request rather than to the shared
+        session, which other streams use concurrently.
+
+        Args:
+            *args: Arguments to pass to :class:`requests.Request`.
+            **kwargs: Keyword arguments to pass to :class:`requests.Request`.
+
+        Returns:
+            A :class:`requests.PreparedRequest` object.
+        """
+        request = requests.Request(*args, auth=self.authenticator, **kwargs)
+        return self.requests_session.prepare_request(request)
+
     @property
     def http_headers(self) -> dict:
         """Return the http headers needed.
@@ -70,23 +398,941 @@ class StripeStream(RESTStream):
         # headers["Private-Token"] = self.config.get("auth_token")  # noqa: ERA001
         return headers
 
-    def get_new_paginator(self) -> BaseOffsetPaginator:
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """Return the request scheduler shared by all streams of the tap.
+
+        Returns:
+            The tap's request scheduler.
+        """
+        return self._tap.request_scheduler
+
+    @cached_property
+    def telemetry(self) -> StreamTelemetry | None:
+        """Return the stream's performance measures, when telemetry is enabled.
+
+        Returns:
+            The measures, or ``None`` when they are not collected.
+        """
+        if self._tap.telemetry is None:
+            return None
+        return self._tap.telemetry.stream(self.name)
+
+    def prepare_request(
+        self,
+        context: dict | None,
+        next_page_token: Any | None,  # noqa: ANN401
+    ) -> requests.PreparedRequest:
+        """Prepare a list request, made on behalf of the context's account.
+
+        Args:
+            context: The stream context.
+            next_page_token: The pagination token.
+
+        Returns:
+            The prepared request.
+        """
+        return self.build_prepared_request(
+            method=self.rest_method,
+            url=self.get_url(context),
+            params=self.get_url_params(context, next_page_token),
+            headers=self.get_request_headers(context),
+            json=self.prepare_request_payload(context, next_page_token),
+        )
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+        *,
+        stream: bool | None = None,
+    ) -> requests.Response:
+        self.scheduler.acquire()
+        started = time.perf_counter()
+        response = self.requests_session.send(
+            prepared_request,
+            timeout=self.timeout,
+            stream=self.stream_responses if stream is None else stream,
+        )
+        elapsed = time.perf_counter() - started
+        self.scheduler.record_response(response, elapsed)
+        if self.telemetry is not None:
+            self.telemetry.observe_request(response, elapsed)
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,
+            extra_tags={"url": prepared_request.path_url}
+            if self._LOG_REQUEST_METRIC_URLS
+            else None,
+        )
+        self.validate_response(response)
+        return response
+
+    def validate_response(self, response: requests.Response) -> None:
+        """Validate HTTP response, following Stripe's retry hints.
+
+        Throttled requests are always retried. Otherwise, the
+        ``Stripe-Should-Retry`` header takes precedence over the status code.
+
+        Args:
+            response: A :class:`requests.Response` object.
+
+        Raises:
+            FatalAPIError: If the request is not retriable.
+            RetriableAPIError: If the request is retriable.
+        """
+        if response.status_code < 400:  # noqa: PLR2004
+            return
+        if is_throttled(response) or should_retry(response):
+            raise RetriableAPIError(self.response_error_message(response), response)
+        if should_retry(response) is False:
+            raise FatalAPIError(self.response_error_message(response))
+        super().validate_response(response)
+
+    def backoff_handler(self, details: dict) -> None:
+        """Count the retry, then log it.
+
+        Args:
+            details: Backoff invocation details.
+        """
+        if self.telemetry is not None:
+            self.telemetry.observe_retry()
+        super().backoff_handler(details)
+
+    def get_new_paginator(self, window: TimeWindow | None = None) -> BaseOffsetPaginator:
+        if window is not None:
+            return StripePaginator(start_value=PageCursor(window), page_size=250)
         return StripePaginator(start_value=0, page_size=250)
 
+    def get_window_planner(self, context: dict | None) -> WindowPlanner | None:
+        """Return a planner splitting this sync into ``created`` windows.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            A planner covering ``[bookmark or start_date, now)``, or ``None`` when
+            time-sliced backfills are disabled or there is no lower bound.
+        """
+        window_days = self.config.get("backfill_window_days")
+        if not window_days:
+            return None
+        start = self.get_starting_created(context)
+        if start is None:
+            self.logger.warning(
+                "Time-sliced backfill needs a bookmark or `start_date`, "
+                "paginating '%s' sequentially.",
+                self.name,
+            )
+            return None
+        return WindowPlanner(
+            start,
+            int(time.time()),
+            window_seconds=int(window_days * 24 * 60 * 60),
+            target_records=self.config.get("backfill_window_target_records"),
+        )
+
+    def compare_start_date(self, value: Any, start_date_value: str) -> int | None:  # noqa: ANN401
+        """Return the later of the ``created`` bookmark and ``start_date``.
+
+        Args:
+            value: The replication key value from state.
+            start_date_value: The start date value from the config.
+
+        Returns:
+            The most recent of the two values, as a Unix timestamp.
+        """
+        return max(to_epoch(value), to_epoch(start_date_value))
+
+    def get_starting_created(self, context: dict | None) -> int | None:
+        """Return the ``created`` lower bound for this sync.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The bookmark or ``start_date`` as a Unix timestamp, if any.
+        """
+        return to_epoch(self.get_starting_replication_key_value(context))
+
     def get_url_params(self, context, next_page_token):
         params = {"limit": 100}
-        start_date = self.get_starting_replication_key_value(context)
 
-        if start_date:
-            if type(start_date) == str:
-                start_date = int(datetime.timestamp(datetime.strptime(start_date, "%Y-%m-%dT%H:%M:%SZ")))
-            params["created[gt]"] = start_date
+        if isinstance(next_page_token, PageCursor):
+            params["created[gte]"], params["created[lt]"] = next_page_token.window
+            next_page_token = next_page_token.starting_after
+        else:
+            start_date = self.get_starting_created(context)
+            if start_date:
+                # Inclusive, so objects created in the bookmarked second are
+                # not lost; the boundary objects are re-emitted instead.
+                params["created[gte]"] = start_date
 
         if next_page_token:
             params["starting_after"] = next_page_token
+        if self.requested_expansions:
+            params["expand[]"] = [
+                f"data.{field}" for field in self.requested_expansions
+            ]
 
         return params
 
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        """Request records from the list endpoint, one page at a time.
+
+        The ``created`` bookmark is only advanced once every record of a page
+        has been emitted, so state messages never reference a partial page.
+
+        When ``backfill_window_days`` is set, the ``created`` range is split into
+        windows that are paginated concurrently, on ``backfill_max_workers``
+        threads or on the tap's async engine when ``async_engine`` is enabled.
+        Windows are emitted oldest first, and the bookmark moves to the end of
+        each window once it has been emitted in full, so an interrupted
+        backfill resumes at the first incomplete window.
+
+        Streams listed in ``search_streams`` are read from the Search API
+        instead, see :meth:`request_search_records`.
+
+        Report streams listed in ``report_streams`` first read the objects
+        created before the end of Stripe's reporting data from a report run,
+        see :meth:`ReportStream.request_report_records`.
+
+        With ``events_incremental_sync``, only the first sync reads the list
+        endpoint. Later syncs apply the changes recorded in ``/events`` since
+        that snapshot, see :meth:`request_event_records`.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            An item for every record in the response.
+        """
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+
+            if not self.events_sync_enabled:
+                yield from self._request_created_records(context, request_counter)
+                return
+
+            state = self.get_context_state(context)
+            cursor = state.get("events_cursor")
+            if cursor is not None:
+                yield from self.request_event_records(context, cursor, request_counter)
+                return
+
+            # Changes made while the snapshot runs are read from `/events` on
+            # the next sync. Keep the original start if the snapshot resumes.
+            with self._state_lock:
+                state.setdefault("events_snapshot_started", int(time.time()))
+            yield from self._request_created_records(context, request_counter)
+
+            def start_events_cursor() -> None:
+                state["events_cursor"] = {
+                    "created": state.pop("events_snapshot_started"),
+                    "id": None,
+                }
+                self._is_state_flushed = False
+
+            self._update_state(start_events_cursor)
+
+    def _request_created_records(
+        self,
+        context: dict | None,
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        if not self.search_enabled:
+            yield from self._request_list_records(context, request_counter)
+            return
+
+        start = self.get_starting_created(context) or 0
+        end = int(time.time()) - self.config.get("search_indexing_lag_seconds", 60)
+        pages = self._request_search_pages(context, request_counter, end)
+        try:
+            first_page = next(iter(pages), None)
+        except FatalAPIError as ex:
+            self.logger.warning(
+                "Search is unavailable for '%s', listing instead: %s",
+                self.name,
+                ex,
+            )
+            yield from self._request_list_records(context, request_counter)
+            return
+        if first_page is not None:
+            for response in itertools.chain([first_page], pages):
+                yield from self.parse_response(response)
+                self._finish_page(context)
+        if end > start:
+            self._commit_window_state(context, TimeWindow(start, end))
+
+    @cached_property
+    def search_enabled(self) -> bool:
+        """Whether this stream is read from the Search API.
+
+        Returns:
+            True when the stream is listed in ``search_streams`` and its search
+            endpoint can filter on ``created``.
+        """
+        if self.name not in (self.config.get("search_streams") or []):
+            return False
+        if not self.searchable:
+            self.logger.warning(
+                "The search endpoint of '%s' cannot filter on `created`, "
+                "listing instead.",
+                self.name,
+            )
+        return self.searchable
+
+    def get_search_query(self, context: dict | None, end: int | None = None) -> str:
+        """Return the search query selecting objects created since the bookmark.
+
+        Search results are indexed with a delay, so recent objects may be
+        missing from them. Queries end ``search_indexing_lag_seconds`` before
+        the sync starts, and the bookmark moves to that end rather than to the
+        newest object found. As a second guard, the lower bound is moved back
+        by ``search_overlap_seconds``, and the objects created in that overlap
+        are read again.
+
+        Args:
+            context: The stream context.
+            end: Exclusive upper bound of ``created``, if any.
+
+        Returns:
+            A Stripe search query.
+        """
+        start = self.get_starting_created(context)
+        if start is None:
+            query = "created>=0"
+        else:
+            overlap = self.config.get("search_overlap_seconds", 300)
+            query = f"created>={max(start - overlap, 0)}"
+        if end is not None:
+            query += f" AND created<{end}"
+        return query
+
+    def get_search_params(
+        self,
+        context: dict | None,
+        next_page_token: str | None,
+        end: int | None = None,
+    ) -> dict[str, Any]:
+        """Return the query parameters of a search request.
+
+        Args:
+            context: The stream context.
+            next_page_token: The ``next_page`` cursor of the previous page.
+            end: Exclusive upper bound of ``created``, if any.
+
+        Returns:
+            The query parameters.
+        """
+        params: dict[str, Any] = {
+            "limit": 100,
+            "query": self.get_search_query(context, end),
+        }
+        if next_page_token:
+            params["page"] = next_page_token
+        if self.requested_expansions:
+            params["expand[]"] = [
+                f"data.{field}" for field in self.requested_expansions
+            ]
+        return params
+
+    def _request_search_pages(
+        self,
+        context: dict | None,
+        request_counter: metrics.Counter,
+        end: int,
+    ) -> Iterable[requests.Response]:
+        url = f"{self.url_base}{self.path}/search"
+
+        def prepare_request(next_page_token: str | None) -> requests.PreparedRequest:
+            return self.build_prepared_request(
+                method="GET",
+                url=url,
+                params=self.get_search_params(context, next_page_token, end),
+                headers=self.get_request_headers(context),
+            )
+
+        return self._request_pages(
+            context,
+            StripeSearchPaginator(start_value=None),
+            request_counter,
+            prepare_request=prepare_request,
+        )
+
+    def _request_list_records(
+        self,
+        context: dict | None,
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        """Request records from the list endpoint, resuming from a checkpoint.
+
+        Every ``checkpoint_interval_pages`` pages, the position within the
+        ``created`` range being read is saved in state, see
+        :class:`PageCheckpoint`. An interrupted sync resumes from there rather
+        than from the first page, skipping the objects emitted before the
+        checkpoint that share the last ``created`` second.
+
+        Args:
+            context: The stream context.
+            request_counter: Counter of HTTP requests.
+
+        Yields:
+            The records, in pages.
+        """
+        planner = self.get_window_planner(context)
+        try:
+            if planner is None:
+                yield from self._request_range_records(context, request_counter)
+            else:
+                yield from self._request_window_records(
+                    context, planner, request_counter
+                )
+        finally:
+            self._page_buffers.checkpoint = None
+
+        def clear_checkpoint() -> None:
+            self.get_context_state(context).pop("checkpoint", None)
+
+        self._update_state(clear_checkpoint)
+
+    def _request_range_records(
+        self,
+        context: dict | None,
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        start = self.get_starting_created(context) or 0
+        resumed = self._get_resumable_checkpoint(context, start, None)
+        self._page_buffers.checkpoint = resumed or PageCheckpoint(start)
+        paginator = self.get_new_paginator(resumed.remaining if resumed else None)
+        items = self._iter_page_items(
+            self._request_pages(context, paginator, request_counter)
+        )
+        if resumed is not None:
+            items = resumed.skip_emitted(items)
+        yield from self._emit_page_items(context, items)
+
+    def _request_window_records(
+        self,
+        context: dict | None,
+        planner: WindowPlanner,
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        windows: Iterable[TimeWindow] = planner
+        resumed = self._get_resumable_checkpoint(context, planner.start, planner.end)
+        resumed_window = None
+        if resumed is not None:
+            # The first window ends where the interrupted one did, but its
+            # pages only cover what was left of it.
+            resumed_window = TimeWindow(planner.start, resumed.end)
+            planner = WindowPlanner(
+                resumed.end,
+                planner.end,
+                window_seconds=planner.window_seconds,
+                target_records=planner.target_records,
+            )
+            windows = itertools.chain([resumed_window], planner)
+
+        def request_window(window: TimeWindow) -> TimeWindow:
+            return resumed.remaining if window is resumed_window else window
+
+        max_created = resumed.max_created if resumed else None
+        for window, items in self._fetch_windows(
+            context, windows, request_window, request_counter
+        ):
+            if window is resumed_window:
+                checkpoint = resumed
+                items = resumed.skip_emitted(items)  # noqa: PLW2901
+            else:
+                checkpoint = PageCheckpoint(*window, max_created=max_created)
+            self._page_buffers.checkpoint = checkpoint
+            record_count = yield from self._emit_page_items(context, items)
+            if window is not resumed_window:
+                planner.observe(window, record_count)
+            max_created = checkpoint.max_created
+            self._commit_window_state(context, window)
+
+    def _fetch_windows(
+        self,
+        context: dict | None,
+        windows: Iterable[TimeWindow],
+        request_window: Callable[[TimeWindow], TimeWindow],
+        request_counter: metrics.Counter,
+    ) -> Iterable[tuple[TimeWindow, Iterable]]:
+        """Fetch windows concurrently, on threads or on the async engine.
+
+        Args:
+            context: The stream context.
+            windows: The windows, oldest first.
+            request_window: Returns the range whose pages a window requests.
+            request_counter: Counter of HTTP requests.
+
+        Returns:
+            Each window, in order, with the records and page markers of its pages.
+        """
+        engine = self._tap.async_engine
+        if engine is not None:
+            fetched = engine.fetch_ordered(
+                windows,
+                lambda window: self._request_pages_async(
+                    engine,
+                    context,
+                    request_window(window),
+                    request_counter,
+                ),
+            )
+        else:
+
+            def fetch(window: TimeWindow) -> Iterable:
+                pages = self._request_pages(
+                    context,
+                    self.get_new_paginator(request_window(window)),
+                    request_counter,
+                )
+                # Streamed pages are parsed on the worker thread, so that
+                # windows buffer a few records rather than whole pages.
+                return self._iter_page_items(pages) if self.stream_responses else pages
+
+            fetched = fetch_ordered(
+                windows,
+                fetch,
+                max_workers=self.config.get("backfill_max_workers", 4),
+            )
+            if self.stream_responses:
+                return fetched
+        return ((window, self._iter_page_items(pages)) for window, pages in fetched)
+
+    def _emit_page_items(
+        self,
+        context: dict | None,
+        items: Iterable,
+    ) -> Generator[dict, None, int]:
+        """Yield the records of pages, finishing each page at its marker.
+
+        Args:
+            context: The stream context.
+            items: Records and page markers, see :meth:`_iter_page_items`.
+
+        Yields:
+            The records.
+
+        Returns:
+            The number of records.
+        """
+        record_count = 0
+        for item in items:
+            if item is _PAGE_END:
+                self._finish_page(context)
+                continue
+            record_count += 1
+            yield item
+        return record_count
+
+    def _get_resumable_checkpoint(
+        self,
+        context: dict | None,
+        start: int,
+        end: int | None,
+    ) -> PageCheckpoint | None:
+        """Return the saved checkpoint, if it continues the range to read.
+
+        Args:
+            context: The stream context.
+            start: Start of the ``created`` range to read.
+            end: End of the range when it is read in windows, else ``None``.
+
+        Returns:
+            The checkpoint to resume from, or ``None`` to read from the start.
+        """
+        saved = self.get_context_state(context).get("checkpoint")
+        if not saved:
+            return None
+        checkpoint = PageCheckpoint.from_dict(saved)
+        if checkpoint.remaining is None:
+            return None
+        if end is None:
+            resumable = checkpoint.end is None and checkpoint.start == start
+        else:
+            resumable = (
+                checkpoint.end is not None
+                and start <= checkpoint.last_created < checkpoint.end <= end
+            )
+        if not resumable:
+            self.logger.info(
+                "Ignoring the checkpoint of '%s', which does not match the "
+                "range to sync.",
+                self.name,
+            )
+            return None
+        self.logger.info(
+            "Resuming '%s' from its checkpoint, at objects created at %d or "
+            "before, after %d pages.",
+            self.name,
+            checkpoint.last_created,
+            checkpoint.pages,
+        )
+        # The bookmark covers the objects emitted before the interruption.
+        self._increment_stream_state(
+            {self.replication_key: checkpoint.max_created}, context=context
+        )
+        return checkpoint
+
+    def _checkpoint_page(self, context: dict | None) -> None:
+        checkpoint = getattr(self._page_buffers, "checkpoint", None)
+        if checkpoint is None:
+            return
+        checkpoint.pages += 1
+        interval = self.config.get("checkpoint_interval_pages", 10)
+        if not interval or checkpoint.pages % interval or checkpoint.remaining is None:
+            return
+        saved = checkpoint.to_dict()
+
+        def save_checkpoint() -> None:
+            self.get_context_state(context)["checkpoint"] = saved
+            self._is_state_flushed = False
+
+        self._update_state(save_checkpoint)
+        self._write_state_message()
+
+    def _iter_page_items(self, responses: Iterable[requests.Response]) -> Iterable:
+        for response in responses:
+            yield from self.parse_response(response)
+            yield _PAGE_END
+
+    @cached_property
+    def stream_responses(self) -> bool:
+        """Whether list pages are parsed while they are downloaded.
+
+        Returns:
+            True when ``streaming_parse`` is enabled.
+        """
+        if not self.config.get("streaming_parse"):
+            return False
+        require_ijson()
+        return True
+
+    @property
+    def events_sync_enabled(self) -> bool:
+        """Whether this stream is kept up to date from ``/events``.
+
+        Returns:
+            True when ``events_incremental_sync`` is set and the stream declares
+            the event types that change its objects.
+        """
+        return bool(self.event_types) and bool(
+            self.config.get("events_incremental_sync")
+        )
+
+    def get_events_url_params(
+        self,
+        cursor: dict,
+        next_page_token: str | None,
+    ) -> dict[str, Any]:
+        """Return the ``/events`` query parameters for this stream's changes.
+
+        Args:
+            cursor: The events bookmark, with the ``created`` timestamp and
+                ``id`` of the newest event already applied.
+            next_page_token: The id of the last event of the previous page.
+
+        Returns:
+            The query parameters.
+        """
+        params: dict[str, Any] = {
+            "limit": 100,
+            "types[]": list(self.event_types),
+            # Inclusive, so events from the bookmarked second are not lost.
+            "created[gte]": cursor["created"],
+        }
+        if next_page_token:
+            params["starting_after"] = next_page_token
+        return params
+
+    def request_event_records(
+        self,
+        context: dict | None,
+        cursor: dict,
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        """Emit the latest state of every object changed since ``cursor``.
+
+        Events are listed newest first, so the first event seen for an object
+        carries its latest state and older events for the same object are
+        skipped. The events bookmark only moves once every page has been read,
+        so an interrupted sync reads the same changes again.
+
+        Args:
+            context: The stream context.
+            cursor: The events bookmark.
+            request_counter: Counter of HTTP requests.
+
+        Yields:
+            The ``data.object`` of the newest event of each changed object.
+        """
+        url = f"{self.url_base}/events"
+
+        def prepare_request(next_page_token: str | None) -> requests.PreparedRequest:
+            return self.build_prepared_request(
+                method="GET",
+                url=url,
+                params=self.get_events_url_params(cursor, next_page_token),
+                headers=self.get_request_headers(context),
+            )
+
+        seen: set[str] = set()
+        newest: dict | None = None
+        paginator = StripePaginator(start_value=None, page_size=100)
+        for response in self._request_pages(
+            context,
+            paginator,
+            request_counter,
+            prepare_request=prepare_request,
+        ):
+            for event in self.parse_response(response):
+                if event["id"] == cursor.get("id"):
+                    continue
+                if newest is None:
+                    newest = {"created": event["created"], "id": event["id"]}
+                obj = event["data"]["object"]
+                if obj["id"] in seen:
+                    continue
+                seen.add(obj["id"])
+                yield obj
+            self._finish_page(context)
+
+        if newest is not None:
+
+            def move_events_cursor() -> None:
+                self.get_context_state(context)["events_cursor"] = newest
+                self._is_state_flushed = False
+
+            self._update_state(move_events_cursor)
+
+    def _request_pages(
+        self,
+        context: dict | None,
+        paginator: BaseAPIPaginator,
+        request_counter: metrics.Counter,
+        *,
+        prepare_request: Callable[[Any], requests.PreparedRequest] | None = None,
+    ) -> Iterable[requests.Response]:
+        decorated_request = self.request_decorator(self._request)
+        while not paginator.finished:
+            if prepare_request is None:
+                prepared_request = self.prepare_request(
+                    context,
+                    next_page_token=paginator.current_value,
+                )
+            else:
+                prepared_request = prepare_request(paginator.current_value)
+            response = decorated_request(prepared_request, context)
+            request_counter.increment()
+            self.update_sync_costs(prepared_request, response, context)
+            yield response
+            paginator.advance(response)
+
+    async def _request_pages_async(
+        self,
+        engine: AsyncEngine,
+        context: dict | None,
+        window: TimeWindow,
+        request_counter: metrics.Counter,
+    ) -> AsyncIterator[requests.Response]:
+        async for response in engine.paginate(self, context, window):
+            request_counter.increment()
+            yield response
+
+    @property
+    def _state_lock(self) -> threading.RLock:
+        return self._tap.message_lock
+
+    def _write_starting_replication_value(self, context: dict | None) -> None:
+        with self._state_lock:
+            if self.events_sync_enabled:
+                self._expire_events_cursor(context)
+            super()._write_starting_replication_value(context)
+
+    def _expire_events_cursor(self, context: dict | None) -> None:
+        state = self.get_context_state(context)
+        cursor = state.get("events_cursor")
+        since = cursor["created"] if cursor else state.get("events_snapshot_started")
+        if since is None or since > time.time() - EVENTS_RETENTION:
+            return
+        # Older changes are no longer listed, so take a new snapshot.
+        self.logger.warning(
+            "Events bookmark of '%s' is older than Stripe's event retention, "
+            "replicating the whole stream again.",
+            self.name,
+        )
+        state.pop("events_cursor", None)
+        state.pop("events_snapshot_started", None)
+        state.pop("replication_key_value", None)
+        state.pop("progress_markers", None)
+        state.pop("checkpoint", None)
+
+    def _write_state_message(self) -> None:
+        with self._state_lock:
+            super()._write_state_message()
+
+    def _finalize_state(self, state: dict | None = None) -> None:
+        # The SDK finalizes state as soon as the records are read, which with
+        # BATCH output is ahead of the bookmarks still waiting for their file.
+        self._update_state(partial(super()._finalize_state, state))
+
+    def finalize_state_progress_markers(self, state: dict | None = None) -> None:
+        with self._state_lock:
+            super().finalize_state_progress_markers(state)
+
+    def _increment_stream_state(
+        self,
+        latest_record: dict[str, Any],
+        *,
+        context: dict | None = None,
+    ) -> None:
+        if not self.replication_key:
+            return
+        checkpoint = getattr(self._page_buffers, "checkpoint", None)
+        if checkpoint is not None and "id" in latest_record:
+            checkpoint.observe(latest_record[self.replication_key], latest_record["id"])
+        # Hold back the bookmark until the page has been fully emitted, see
+        # `_commit_page_state`.
+        pending = self._pending_page_record
+        if pending is None or latest_record[self.replication_key] > pending[0][
+            self.replication_key
+        ]:
+            self._pending_page_record = (latest_record, context)
+
+    def _update_state(self, update: Callable[[], None]) -> None:
+        # With BATCH output, records are only written once their file is
+        # complete, and the bookmarks covering them wait until then; see
+        # `_sync_batches`.
+        unwritten = getattr(self._page_buffers, "unwritten_state_updates", None)
+        if unwritten is not None:
+            unwritten.append(update)
+            return
+        with self._state_lock:
+            update()
+
+    def _commit_page_state(self) -> None:
+        index = self._tap.dedup_index
+        if index is not None:
+            # Includes the records of child streams, synced with the page.
+            entries = index.take_staged()
+            if entries:
+                self._update_state(partial(index.save, entries))
+        pending = self._pending_page_record
+        self._pending_page_record = None
+        if pending is not None:
+            self._update_state(
+                partial(super()._increment_stream_state, pending[0], context=pending[1])
+            )
+
+    def _commit_window_state(self, context: dict | None, window: TimeWindow) -> None:
+        # Every object created before the end of this window has been emitted,
+        # which makes the window end a resumable bookmark.
+        boundary = window.end - 1
+        increment_stream_state = super()._increment_stream_state
+
+        def move_bookmark() -> None:
+            increment_stream_state({self.replication_key: boundary}, context=context)
+            state = self.get_context_state(context)
+            state["replication_key"] = self.replication_key
+            state["replication_key_value"] = boundary
+            state.pop("checkpoint", None)
+            self._is_state_flushed = False
+
+        self._update_state(move_bookmark)
+        self._write_state_message()
+
+    def _sync_batches(
+        self,
+        batch_config: BatchConfig,
+        context: dict | None = None,
+    ) -> None:
+        # Bookmarks only move once the files holding their records have been
+        # announced, so that state never covers records a target cannot read.
+        self._page_buffers.unwritten_state_updates = []
+        try:
+            with metrics.batch_counter(self.name, context=context) as counter:
+                for encoding, manifest in self.get_batches(batch_config, context):
+                    counter.increment()
+                    self._write_batch_message(encoding=encoding, manifest=manifest)
+                    self._apply_state_updates()
+                    self._write_state_message()
+            self._apply_state_updates()
+            self._write_state_message()
+        finally:
+            self._page_buffers.unwritten_state_updates = None
+
+    def _apply_state_updates(self) -> None:
+        updates = self._page_buffers.unwritten_state_updates
+        with self._state_lock:
+            for update in updates:
+                update()
+        updates.clear()
+
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: dict | None = None,
+    ) -> Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write records to batch files, yielding each completed file.
+
+        Files are completed at ``batch_config.batch_size`` records or
+        ``batch_max_bytes`` bytes. The files of child streams stay open across
+        pages of parent records, and are completed before each file of their
+        parent stream.
+
+        Args:
+            batch_config: The ``batch_config`` setting.
+            context: The stream context.
+
+        Yields:
+            The encoding and the URL of each completed file.
+        """
+        require_batch_dependencies(batch_config)
+        writer = self._get_batch_writer(batch_config)
+        for record in self._sync_records(context, write_messages=False):
+            pop_deselected_record_properties(record, self.schema, self.mask)
+            url = writer.write(self.conformer(record))
+            if url:
+                self._flush_child_batches()
+                yield batch_config.encoding, [url]
+        if self.parent_stream_type is None:
+            self._page_buffers.batch_writer = None
+            url = writer.close()
+            self._flush_child_batches()
+            if url:
+                yield batch_config.encoding, [url]
+
+    def flush_batches(self) -> None:
+        """Complete the open batch files of this stream and its child streams."""
+        writer: BatchWriter | None = getattr(self._page_buffers, "batch_writer", None)
+        url = writer.close() if writer else None
+        self._flush_child_batches()
+        if url:
+            self._write_batch_message(
+                encoding=writer.batch_config.encoding,
+                manifest=[url],
+            )
+
+    def _flush_child_batches(self) -> None:
+        for child_stream in self.child_streams:
+            if child_stream.selected or child_stream.has_selected_descendents:
+                child_stream.flush_batches()
+
+    def _get_batch_writer(self, batch_config: BatchConfig) -> BatchWriter:
+        writer = getattr(self._page_buffers, "batch_writer", None)
+        if writer is None:
+            writer = self._page_buffers.batch_writer = BatchWriter(
+                batch_config,
+                tap_name=self.tap_name,
+                stream_name=self.name,
+                max_bytes=self.config.get("batch_max_bytes"),
+            )
+        return writer
+
     def prepare_request_payload(
         self,
         context: dict | None,  # noqa: ARG002
@@ -109,21 +1355,36 @@ class StripeStream(RESTStream):
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result records.
 
+        With ``streaming_parse``, records are parsed as the body is downloaded
+        and the page is never held in memory as a whole.
+
         Args:
             response: The HTTP ``requests.Response`` object.
 
         Yields:
             Each record from the source.
         """
-        # TODO: Parse response body and return a set of records.
-        yield from extract_jsonpath(self.records_jsonpath, input=response.json())
+        records = self._parse_page(response)
+        if self.telemetry is not None:
+            records = self.telemetry.observe_page(response, records)
+        yield from records
+
+    def _parse_page(self, response: requests.Response) -> Iterator[dict]:
+        if self.stream_responses:
+            yield from iter_page_records(response)
+        else:
+            yield from get_page(response)["data"]
 
     def post_process(
         self,
         row: dict,
-        context: dict | None = None,  # noqa: ARG002
+        context: dict | None = None,
     ) -> dict | None:
-        """As needed, append or transform raw data to match expected structure.
+        """Tag the record with its account and drop unselected fields.
+
+        With ``dedup_index_path``, records identical to the last version
+        emitted are skipped, see :class:`DedupIndex`. They still count towards
+        the bookmark.
 
         Args:
             row: An individual record from the stream.
@@ -132,5 +1393,562 @@ class StripeStream(RESTStream):
         Returns:
             The updated record dictionary, or ``None`` to skip the record.
         """
-        # TODO: Delete this method if not needed.
+        account_id = self.get_account_id(context)
+        if account_id:
+            row.setdefault("account_id", account_id)
+        if self.field_mask is not None:
+            row = prune_record(row, self.field_mask)
+        index = self._tap.dedup_index
+        if index is not None and "id" in row and not index.observe(self.name, row):
+            self._increment_stream_state(row, context=context)
+            return None
         return row
+
+    @cached_property
+    def conformer(self) -> SchemaConformer:
+        """The record conformer compiled from the stream schema.
+
+        Returns:
+            A conformer, whose code is shared by streams of the same schema.
+        """
+        return SchemaConformer(
+            self.schema,
+            stream_name=self.name,
+            logger=self.logger,
+            level=self.conformance_level,
+        )
+
+    @cached_property
+    def field_mask(self) -> FieldMask | None:
+        """The fields kept by :meth:`post_process`, from the catalog selection.
+
+        Unselected fields are dropped before records are conformed to the
+        schema, so that work scales with the selected fields only. Fields that
+        selected child streams read from are kept, with the keys of the record
+        even if the stream itself is not selected; the SDK drops them when the
+        record is written.
+
+        Returns:
+            The field mask, or ``None`` when every field is selected.
+        """
+        field_mask = build_field_mask(self.schema, self.mask)
+        if field_mask is None:
+            return None
+        for key in (*self.primary_keys, self.replication_key):
+            if key:
+                field_mask[key] = None
+        for child in self.child_streams:
+            if not (child.selected or child.has_selected_descendents):
+                continue
+            if isinstance(child, SublistStream):
+                field_mask[child.sublist_field] = None
+            elif isinstance(child, ExpandedObjectStream):
+                field_mask[child.expand_field] = None
+        return field_mask
+
+    def _write_record_message(self, record: dict) -> None:
+        # After `generate_child_contexts`, which reads fields outside the schema.
+        if self.telemetry is None:
+            super()._write_record_message(self.conformer(record))
+            return
+        started = time.perf_counter()
+        record = self.conformer(record)
+        conformed = time.perf_counter()
+        super()._write_record_message(record)
+        self.telemetry.observe_record(
+            conformed - started, time.perf_counter() - conformed
+        )
+
+    def generate_child_contexts(
+        self,
+        record: dict,
+        context: dict | None,  # noqa: ARG002
+    ) -> Iterable[dict | None]:
+        """Collect what the child streams need from a record.
+
+        Child streams are synced once per page of parent records rather than
+        once per record, see :meth:`_sync_child_batch`, so this only adds the
+        record to the current batch.
+
+        With ``expand_child_streams``, expanded objects are handed over to the
+        matching :class:`ExpandedObjectStream` and the parent record keeps only
+        their ids.
+
+        Args:
+            record: A record of this stream.
+            context: The stream context.
+
+        Yields:
+            Nothing, child contexts are built per page.
+        """
+        entry = {}
+        if self.config.get("expand_child_streams"):
+            for field in self.expand:
+                value = record.get(field)
+                if isinstance(value, dict):
+                    entry[field] = value
+                    record[field] = value.get("id")
+        for child_stream in self.child_streams:
+            if isinstance(child_stream, SublistStream):
+                sublist = record.get(child_stream.sublist_field)
+                if sublist is not None:
+                    entry[child_stream.sublist_field] = sublist
+        if entry and self.stream_maps[0].get_filter_result(record):
+            entry["id"] = record["id"]
+            self._child_batch.append(entry)
+        yield from ()
+
+    def _sync_child_batch(self, context: dict | None) -> None:
+        batch = ChildBatch(self._child_batch)
+        self._child_batch.clear()
+        if batch:
+            self._sync_children({**(context or {}), "parents": batch})
+
+    def _finish_page(self, context: dict | None) -> None:
+        # Children first, so the bookmark never moves past parents whose child
+        # records were not emitted.
+        self._sync_child_batch(context)
+        self._commit_page_state()
+        self._checkpoint_page(context)
+
+
+class ChildBatch(list):
+    """Entries of a page of parent records, handed to child streams at once."""
+
+    def __repr__(self) -> str:
+        # Child contexts are logged; the objects themselves would flood the log.
+        return f"<{len(self)} parent records>"
+
+
+class ReportStream(StripeStream):
+    """A stream whose history can be read from Stripe report runs.
+
+    Streams listed in ``report_streams`` first read the objects created before
+    the end of Stripe's reporting data from a run of :attr:`report_type`, then
+    carry on from the list endpoint.
+    """
+
+    #: Type of the Stripe report run listing this stream's objects; rows are
+    #: converted by :meth:`parse_report_row`.
+    report_type: typing.ClassVar[str]
+
+    #: Columns requested from :attr:`report_type`.
+    report_columns: typing.ClassVar[tuple[str, ...]] = ()
+
+    #: Shortest ``created`` range read from a report run rather than pages.
+    report_min_seconds: typing.ClassVar[int] = 7 * 24 * 60 * 60
+
+    def _request_created_records(
+        self,
+        context: dict | None,
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        if self.reports_enabled:
+            yield from self.request_report_records(context, request_counter)
+        yield from super()._request_created_records(context, request_counter)
+
+    @cached_property
+    def reports_enabled(self) -> bool:
+        """Whether this stream's history is read from report runs.
+
+        Returns:
+            True when the stream is listed in ``report_streams``.
+        """
+        return self.name in (self.config.get("report_streams") or [])
+
+    def parse_report_row(self, row: dict[str, str]) -> dict:
+        """Convert a row of :attr:`report_type` to a record.
+
+        Args:
+            row: The row, keyed by column name.
+
+        Raises:
+            NotImplementedError: Report streams must implement this.
+        """
+        raise NotImplementedError
+
+    def request_report_records(
+        self,
+        context: dict | None,
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        """Emit the objects created up to the end of Stripe's reporting data.
+
+        A report run covering ``[bookmark or start_date, data_available_end)``
+        is created and polled until its file is ready, every
+        ``report_poll_seconds`` at first, then less and less often. The file is
+        parsed while it is downloaded. Once it has been read, the bookmark moves
+        to the end of the report, where the list endpoint picks up.
+
+        The run is saved in state, with the number of rows emitted every
+        ``checkpoint_interval_pages`` pages of rows, so an interrupted sync
+        downloads the same file again and skips those rows.
+
+        Nothing is read from a report when the range is shorter than
+        :attr:`report_min_seconds`, or reports are unavailable, e.g. to
+        restricted API keys.
+
+        Args:
+            context: The stream context.
+            request_counter: Counter of HTTP requests.
+
+        Yields:
+            A record for every row of the report.
+        """
+        start = self.get_starting_created(context) or 0
+        try:
+            run = self._get_report_run(context, start, request_counter)
+        except FatalAPIError as ex:
+            self.logger.warning(
+                "Reports are unavailable for '%s', listing instead: %s",
+                self.name,
+                ex,
+            )
+            return
+        if run is None:
+            return
+
+        saved = self.get_context_state(context).get("report_run") or {}
+        emitted = saved.get("rows", 0)
+        if emitted:
+            self.logger.info(
+                "Resuming report run %s of '%s' after %d rows.",
+                run["id"],
+                self.name,
+                emitted,
+            )
+        with self._request_report_api(
+            requests.Request("GET", run["result"]["url"]),
+            context,
+            request_counter,
+            stream=True,
+        ) as response:
+            for row in itertools.islice(iter_report_rows(response), emitted, None):
+                yield self.parse_report_row(row)
+                emitted += 1
+                if emitted % _REPORT_PAGE_ROWS == 0:
+                    self._finish_page(context)
+                    self._checkpoint_report(context, emitted)
+        self._finish_page(context)
+
+        def clear_report_run() -> None:
+            self.get_context_state(context).pop("report_run", None)
+
+        end = run["parameters"]["interval_end"]
+        self._update_state(clear_report_run)
+        with self._state_lock:
+            # The rest of this sync starts where the report ends, which
+            # excludes ``interval_end``.
+            self.get_context_state(context)["starting_replication_value"] = end
+        self._commit_window_state(context, TimeWindow(start, end))
+
+    def _get_report_run(
+        self,
+        context: dict | None,
+        start: int,
+        request_counter: metrics.Counter,
+    ) -> dict | None:
+        """Return a succeeded report run of the objects created since ``start``.
+
+        Args:
+            context: The stream context.
+            start: Start of the ``created`` range to read.
+            request_counter: Counter of HTTP requests.
+
+        Returns:
+            The run saved in state by an interrupted sync from the same start, or
+            a new one; ``None`` when the range is too short or the run failed.
+        """
+        state = self.get_context_state(context)
+        saved = state.get("report_run")
+        runs_url = f"{self.url_base}/reporting/report_runs"
+        run = None
+        if saved and saved["start"] == start:
+            run = self._request_report_api(
+                requests.Request("GET", f"{runs_url}/{saved['id']}"),
+                context,
+                request_counter,
+            ).json()
+        if run is None or run["status"] == "failed":
+            report_type = self._request_report_api(
+                requests.Request(
+                    "GET", f"{self.url_base}/reporting/report_types/{self.report_type}"
+                ),
+                context,
+                request_counter,
+            ).json()
+            interval_start = max(start, report_type["data_available_start"])
+            interval_end = report_type["data_available_end"]
+            if interval_end - interval_start < self.report_min_seconds:
+                return None
+            data = {
+                "report_type": self.report_type,
+                "parameters[interval_start]": interval_start,
+                "parameters[interval_end]": interval_end,
+                "parameters[columns][]": list(self.report_columns),
+            }
+            run = self._request_report_api(
+                requests.Request("POST", runs_url, data=data),
+                context,
+                request_counter,
+            ).json()
+            with self._state_lock:
+                state["report_run"] = {"id": run["id"], "start": start}
+            self.logger.info(
+                "Created report run %s of '%s', from %d to %d.",
+                run["id"],
+                self.name,
+                interval_start,
+                interval_end,
+            )
+
+        delay = self.config.get("report_poll_seconds", 5)
+        while run["status"] == "pending":
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+            run = self._request_report_api(
+                requests.Request("GET", f"{runs_url}/{run['id']}"),
+                context,
+                request_counter,
+            ).json()
+        if run["status"] != "succeeded":
+            self.logger.warning(
+                "Report run %s of '%s' %s, listing instead: %s",
+                run["id"],
+                self.name,
+                run["status"],
+                run.get("error"),
+            )
+            with self._state_lock:
+                state.pop("report_run", None)
+            return None
+        return run
+
+    def _request_report_api(
+        self,
+        request: requests.Request,
+        context: dict | None,
+        request_counter: metrics.Counter,
+        *,
+        stream: bool = False,
+    ) -> requests.Response:
+        prepared_request = self.build_prepared_request(
+            method=request.method,
+            url=request.url,
+            data=request.data or None,
+            headers=self.get_request_headers(context),
+        )
+        response = self.request_decorator(self._request)(
+            prepared_request, context, stream=stream
+        )
+        request_counter.increment()
+        return response
+
+    def _checkpoint_report(self, context: dict | None, rows: int) -> None:
+        interval = self.config.get("checkpoint_interval_pages", 10)
+        if not interval or rows // _REPORT_PAGE_ROWS % interval:
+            return
+
+        def save_rows() -> None:
+            self.get_context_state(context)["report_run"]["rows"] = rows
+            self._is_state_flushed = False
+
+        self._update_state(save_rows)
+        self._write_state_message()
+
+
+class ExpandedObjectStream(StripeStream):
+    """Objects embedded in the records of the parent stream with ``expand[]``.
+
+    Records come from the parent's child context instead of the API, see
+    :meth:`StripeStream.generate_child_contexts`. Objects shared by several
+    parent records are emitted once per sync.
+    """
+
+    #: The parent field holding the objects of this stream.
+    expand_field: typing.ClassVar[str]
+
+    # Each expanded stream adds API work to its parent, so users opt in.
+    selected_by_default = False
+    replication_key = None
+    state_partitioning_keys: typing.ClassVar[list[str]] = []
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream.
+
+        Args:
+            *args: Positional arguments for the base stream.
+            **kwargs: Keyword arguments for the base stream.
+        """
+        super().__init__(*args, **kwargs)
+        self._emitted_ids: set[str] = set()
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        """Return the expanded objects of a page of parent records.
+
+        Args:
+            context: The child context built by the parent stream.
+
+        Yields:
+            Each object not emitted yet.
+        """
+        for entry in (context or {}).get("parents", ()):
+            obj = entry.get(self.expand_field)
+            if obj is None or obj["id"] in self._emitted_ids:
+                continue
+            self._emitted_ids.add(obj["id"])
+            record = self.post_process(obj, context)
+            if record is not None:
+                yield record
+
+
+class SublistStream(StripeStream):
+    """Items of a list embedded in the records of the parent stream.
+
+    Stripe embeds the first items of some lists (e.g. subscription items) in
+    their parent object, with ``has_more`` set when there are more. Embedded
+    items are emitted as they are, and the remaining pages are only requested
+    for the parents whose list was truncated.
+
+    ``path`` may reference the parent id as ``{parent_id}``.
+    """
+
+    #: The parent field holding the embedded list object.
+    sublist_field: typing.ClassVar[str]
+
+    #: Item field holding the parent id, set on items that lack it.
+    parent_key: typing.ClassVar[str]
+
+    #: Query parameter filtering ``path`` by parent id, if the path does not.
+    parent_id_param: typing.ClassVar[str | None] = None
+
+    # Truncated lists cost a request per parent, so users opt in.
+    selected_by_default = False
+    replication_key = None
+    state_partitioning_keys: typing.ClassVar[list[str]] = []
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        """Return the items of the lists of a page of parent records.
+
+        With the async engine, the remaining pages of every truncated list of
+        the page are requested concurrently, one page of each list at a time.
+
+        Args:
+            context: The child context built by the parent stream.
+
+        Yields:
+            Each item, embedded or fetched.
+        """
+        engine = self._tap.async_engine
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+            truncated: dict[str, StripePaginator] = {}
+            for entry in (context or {}).get("parents", ()):
+                sublist = entry.get(self.sublist_field)
+                if not sublist:
+                    continue
+                items = sublist["data"]
+                yield from self._process_items(items, entry["id"], context)
+                if not (sublist.get("has_more") and items):
+                    continue
+                paginator = StripePaginator(start_value=items[-1]["id"], page_size=100)
+                if engine is None:
+                    yield from self._request_remaining_items(
+                        context, entry["id"], paginator, request_counter
+                    )
+                else:
+                    truncated[entry["id"]] = paginator
+            if truncated:
+                yield from self._request_remaining_items_async(
+                    engine, context, truncated, request_counter
+                )
+
+    def get_sublist_params(
+        self,
+        parent_id: str,
+        next_page_token: str | None,
+    ) -> dict[str, Any]:
+        """Return the query parameters of a page of one parent's list.
+
+        Args:
+            parent_id: The parent object id.
+            next_page_token: The id of the last item already read.
+
+        Returns:
+            The query parameters.
+        """
+        params: dict[str, Any] = {"limit": 100, "starting_after": next_page_token}
+        if self.parent_id_param:
+            params[self.parent_id_param] = parent_id
+        return params
+
+    def _process_items(
+        self,
+        items: Iterable[dict],
+        parent_id: str,
+        context: dict | None,
+    ) -> Iterable[dict]:
+        for item in items:
+            item.setdefault(self.parent_key, parent_id)
+            record = self.post_process(item, context)
+            if record is not None:
+                yield record
+
+    def _prepare_sublist_request(
+        self,
+        context: dict | None,
+        parent_id: str,
+        next_page_token: str,
+    ) -> requests.PreparedRequest:
+        return self.build_prepared_request(
+            method="GET",
+            url=self.url_base + self.path.format(parent_id=parent_id),
+            params=self.get_sublist_params(parent_id, next_page_token),
+            headers=self.get_request_headers(context),
+        )
+
+    def _request_remaining_items(
+        self,
+        context: dict | None,
+        parent_id: str,
+        paginator: StripePaginator,
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        for response in self._request_pages(
+            context,
+            paginator,
+            request_counter,
+            prepare_request=partial(self._prepare_sublist_request, context, parent_id),
+        ):
+            yield from self._process_items(
+                self.parse_response(response), parent_id, context
+            )
+
+    def _request_remaining_items_async(
+        self,
+        engine: AsyncEngine,
+        context: dict | None,
+        paginators: dict[str, StripePaginator],
+        request_counter: metrics.Counter,
+    ) -> Iterable[dict]:
+        while paginators:
+            parent_ids = list(paginators)
+            responses = engine.get_many(
+                self,
+                [
+                    self._prepare_sublist_request(
+                        context, parent_id, paginators[parent_id].current_value
+                    )
+                    for parent_id in parent_ids
+                ],
+                context,
+            )
+            for parent_id, response in zip(parent_ids, responses):
+                request_counter.increment()
+                yield from self._process_items(
+                    self.parse_response(response), parent_id, context
+                )
+                paginator = paginators[parent_id]
+                paginator.advance(response)
+                if paginator.finished:
+                    del paginators[parent_id]
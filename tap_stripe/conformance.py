@@ -0,0 +1,252 @@
+"""Record conformance compiled from stream schemas.
+
+The SDK conforms every record by walking the stream schema alongside it. Here
+each schema is compiled once into Python functions that only visit the
+properties needing work, and the compiled code is cached in memory, keyed by a
+hash of the schema. Compiling takes about a millisecond per schema, so
+conformers are not cached on disk: executing code read back from a file would
+trust whoever can write to it.
+
+Records are decoded JSON, so strings, numbers, nulls and untyped objects
+already have the types the SDK would produce and are left alone. What is
+left to do is what the SDK does for such records: drop properties missing
+from the schema, coerce non-boolean values of boolean properties, and recurse
+into nested objects and arrays of objects.
+
+Nothing is compiled for validation: the SDK validates records in targets, not
+in taps, so there is no per-record validation here to speed up.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import typing as t
+
+from singer_sdk.helpers._typing import (
+    TypeConformanceLevel,
+    is_boolean_type,
+    is_object_type,
+    is_uniform_list,
+)
+
+if t.TYPE_CHECKING:
+    import logging
+    from types import CodeType
+
+_code_cache: dict[str, CodeType] = {}
+_code_cache_lock = threading.Lock()
+
+
+def schema_hash(schema: dict, level: TypeConformanceLevel) -> str:
+    """Return the cache key of the conformer of ``schema``.
+
+    Args:
+        schema: A stream schema.
+        level: The conformance level.
+
+    Returns:
+        A hex digest.
+    """
+    payload = json.dumps(
+        [level.name, schema],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SchemaConformer:
+    """Conform records of one schema, like the SDK's ``conform_record_data_types``.
+
+    Records are conformed in place where possible: an object is only copied
+    when properties missing from the schema have to be dropped.
+    """
+
+    def __init__(
+        self,
+        schema: dict,
+        *,
+        stream_name: str,
+        logger: logging.Logger,
+        level: TypeConformanceLevel = TypeConformanceLevel.RECURSIVE,
+    ) -> None:
+        """Compile the conformer of ``schema``, unless already compiled.
+
+        Args:
+            schema: The stream schema.
+            stream_name: The stream name, for warnings.
+            logger: Where properties missing from the schema are reported.
+            level: How deep records are conformed.
+        """
+        self.stream_name = stream_name
+        self.logger = logger
+        self.level = level
+        self.key = schema_hash(schema, level)
+        self._reported: set[str] = set()
+        if level is TypeConformanceLevel.NONE:
+            self._conform: t.Callable[[dict], dict] = _identity
+            return
+        namespace = {"_drop": self._drop_unmapped}
+        # The code is generated from the schema, never read from elsewhere.
+        exec(_load_code(schema, level, self.key), namespace)  # noqa: S102
+        self._conform = namespace["conform"]
+
+    def __call__(self, record: dict) -> dict:
+        """Conform a record.
+
+        Args:
+            record: A record of the stream.
+
+        Returns:
+            The conformed record.
+        """
+        return self._conform(record)
+
+    def _drop_unmapped(self, record: dict, keys: frozenset[str], path: str) -> dict:
+        unmapped = [f"{path}{key}" for key in record if key not in keys]
+        new = [name for name in unmapped if name not in self._reported]
+        if new:
+            self._reported.update(new)
+            self.logger.warning(
+                "Properties %s were present in the '%s' stream but "
+                "not found in catalog schema. Ignoring.",
+                tuple(new),
+                self.stream_name,
+            )
+        return {key: value for key, value in record.items() if key in keys}
+
+
+def _identity(record: dict) -> dict:
+    return record
+
+
+def _load_code(
+    schema: dict,
+    level: TypeConformanceLevel,
+    key: str,
+) -> CodeType:
+    code = _code_cache.get(key)
+    if code is not None:
+        return code
+    with _code_cache_lock:
+        code = _code_cache.get(key)
+        if code is None:
+            source = _Compiler(level).compile(schema)
+            code = compile(source, f"<conformer {key[:12]}>", "exec")
+            _code_cache[key] = code
+    return code
+
+
+def _is_typed(schema: dict) -> bool:
+    return "type" in schema or "anyOf" in schema
+
+
+class _Compiler:
+    """Generate the source of the conformer of a schema.
+
+    Each object schema becomes a function conforming one object. Only the
+    properties that may need work get a statement; the others are the fast
+    path and cost nothing beyond the key check.
+    """
+
+    def __init__(self, level: TypeConformanceLevel) -> None:
+        self.level = level
+        self.functions: list[str] = []
+
+    def compile(self, schema: dict) -> str:
+        root = self._object(schema, "")
+        functions = [function for function in self.functions if function]
+        if root is None:
+            functions.append("def _conform(record):\n    return record")
+            root = "_conform"
+        return "\n\n".join([*functions, f"conform = {root}\n"])
+
+    def _object(self, schema: dict, path: str) -> str | None:
+        """Generate the function conforming an object, and return its name.
+
+        Returns:
+            The function name, or ``None`` if objects are left as they are.
+        """
+        index = len(self.functions)
+        self.functions.append("")  # Reserve the name before nested objects.
+        name = f"_conform_{index}"
+        properties = schema.get("properties") or {}
+        body = []
+        for property_name, property_schema in properties.items():
+            body += self._property(property_name, property_schema, path)
+        lines = []
+        if not schema.get("additionalProperties"):
+            keys = f"_KEYS_{index}"
+            lines.append(f"{keys} = frozenset({sorted(properties)!r})")
+            body[:0] = [
+                f"    if not record.keys() <= {keys}:",
+                f"        record = _drop(record, {keys}, {path!r})",
+            ]
+        if not body:
+            return None
+        lines += [f"def {name}(record):", *body, "    return record"]
+        self.functions[index] = "\n".join(lines)
+        return name
+
+    def _property(self, name: str, schema: dict, path: str) -> list[str]:
+        """Mirror the branches of the SDK's ``_conform_record_data_types``.
+
+        A branch without a statement leaves matching values as they are.
+        """
+        if not _is_typed(schema):
+            # Untyped properties accept anything, and are left as they are.
+            return []
+        recursive = self.level is TypeConformanceLevel.RECURSIVE
+        key = repr(name)
+        branches: list[tuple[str, str | None]] = []
+        if is_uniform_list(schema):
+            item = None
+            if recursive:
+                item = self._item(schema["items"], f"{path}{name}")
+            branches.append(
+                (
+                    "isinstance(value, list)",
+                    f"record[{key}] = [{item} for item in value]" if item else None,
+                )
+            )
+        if is_object_type(schema) and "properties" in schema:
+            function = None
+            if recursive:
+                function = self._object(schema, f"{path}{name}.")
+            branches.append(
+                (
+                    "isinstance(value, dict)",
+                    f"record[{key}] = {function}(value)" if function else None,
+                )
+            )
+        if is_boolean_type(schema):
+            branches.append(
+                (
+                    "value is not None and value.__class__ is not bool",
+                    f"record[{key}] = value != 0",
+                )
+            )
+        while branches and branches[-1][1] is None:
+            branches.pop()
+        if not branches:
+            return []
+        lines = [f"    value = record.get({key})"]
+        for index, (condition, statement) in enumerate(branches):
+            keyword = "elif" if index else "if"
+            lines += [f"    {keyword} {condition}:", f"        {statement or 'pass'}"]
+        return lines
+
+    def _item(self, schema: dict, path: str) -> str | None:
+        """Return the expression conforming an array ``item``, if any."""
+        if not _is_typed(schema):
+            return None
+        if is_object_type(schema) and "properties" in schema:
+            function = self._object(schema, f"{path}.")
+            if function:
+                return f"{function}(item) if isinstance(item, dict) else item"
+            return None
+        if is_boolean_type(schema):
+            return "item if item is None or item.__class__ is bool else item != 0"
+        return None
@@ -0,0 +1,273 @@
+"""Index of the objects already emitted, to drop records that did not change.
+
+Overlapping windows, search overlaps, event replays and retried pages emit
+objects that the target already holds. The index keeps a 64-bit hash of the
+last version emitted of every object, per stream, in a SQLite file, so its
+memory use is bounded by SQLite's page cache whatever the number of objects.
+Objects are keyed by a 64-bit hash of their id, which keeps rows at a few dozen
+bytes; a collision of ids would only drop a record if its content hash also
+matched the other object's.
+
+Hashes are staged while a page is emitted and saved with the bookmark of the
+page, so an interrupted sync never drops records it did not emit.
+
+Entries are only rewritten when an object changes. Compact the file from time
+to time, dropping the entries of objects unchanged for long::
+
+    tap-stripe-dedup compact index.sqlite --max-age-days 90
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_SECONDS_PER_DAY = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS streams (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS objects (
+    stream INTEGER NOT NULL,
+    key INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    PRIMARY KEY (stream, key)
+) WITHOUT ROWID;
+"""
+
+
+def _hash64(data: bytes) -> int:
+    digest = hashlib.blake2b(data, digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def content_hash(record: dict) -> int:
+    """Return a hash of a record that does not depend on its key order.
+
+    Args:
+        record: A record.
+
+    Returns:
+        A signed 64-bit hash of the record's canonical JSON.
+    """
+    if orjson is not None:
+        data = orjson.dumps(record, default=str, option=orjson.OPT_SORT_KEYS)
+    else:
+        data = json.dumps(
+            record, default=str, sort_keys=True, separators=(",", ":")
+        ).encode()
+    return _hash64(data)
+
+
+class DedupIndex:
+    """Hashes of the last emitted version of objects, in a SQLite file.
+
+    Safe to use from several threads: each thread reads on its own connection,
+    and stages the hashes of the records it emits until :meth:`take_staged`.
+    """
+
+    def __init__(self, path: str | Path, *, cache_mib: int = 16) -> None:
+        """Open or create an index.
+
+        Args:
+            path: The SQLite file.
+            cache_mib: Page cache of each connection, in MiB.
+        """
+        self.path = Path(path)
+        self.cache_mib = cache_mib
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._stream_ids: dict[str, int] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+
+    def observe(self, stream: str, record: dict) -> bool:
+        """Stage the hash of a record about to be emitted, unless unchanged.
+
+        Args:
+            stream: The stream name.
+            record: The record, with an ``id``.
+
+        Returns:
+            False if the record is identical to the last version emitted or
+            staged, True otherwise.
+        """
+        key = (self._stream_id(stream), _hash64(record["id"].encode()))
+        digest = content_hash(record)
+        staged = self._staged()
+        last = staged.get(key)
+        if last is None:
+            row = self._connection().execute(
+                "SELECT hash FROM objects WHERE stream = ? AND key = ?", key
+            ).fetchone()
+            last = row[0] if row else None
+        if last == digest:
+            return False
+        staged[key] = digest
+        return True
+
+    def take_staged(self) -> list[tuple[int, int, int]]:
+        """Return and clear the hashes staged by the calling thread.
+
+        Returns:
+            Entries to hand to :meth:`save` once their records are emitted.
+        """
+        staged = self._staged()
+        entries = [(*key, digest) for key, digest in staged.items()]
+        staged.clear()
+        return entries
+
+    def save(self, entries: list[tuple[int, int, int]]) -> None:
+        """Record staged hashes as emitted.
+
+        Args:
+            entries: Entries returned by :meth:`take_staged`.
+        """
+        day = int(time.time()) // _SECONDS_PER_DAY
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)",
+                [(*entry, day) for entry in entries],
+            )
+
+    def close(self) -> None:
+        """Close the connections of every thread."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=60, check_same_thread=False
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA cache_size=-{self.cache_mib * 1024}")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _staged(self) -> dict[tuple[int, int], int]:
+        try:
+            return self._local.staged
+        except AttributeError:
+            self._local.staged = {}
+            return self._local.staged
+
+    def _stream_id(self, stream: str) -> int:
+        stream_id = self._stream_ids.get(stream)
+        if stream_id is None:
+            connection = self._connection()
+            with self._lock, connection:
+                connection.execute(
+                    "INSERT OR IGNORE INTO streams (name) VALUES (?)", (stream,)
+                )
+                (stream_id,) = connection.execute(
+                    "SELECT id FROM streams WHERE name = ?", (stream,)
+                ).fetchone()
+                self._stream_ids[stream] = stream_id
+        return stream_id
+
+
+def compact(
+    path: str | Path,
+    *,
+    max_age_days: int | None = None,
+    streams: t.Sequence[str] = (),
+) -> tuple[int, int]:
+    """Drop old entries from an index, and shrink its file.
+
+    Objects whose entry is dropped are emitted again the next time they are
+    read, even if unchanged.
+
+    Args:
+        path: The SQLite file.
+        max_age_days: Drop the entries of objects that did not change for this
+            many days.
+        streams: Drop every entry of these streams.
+
+    Returns:
+        The number of entries dropped and kept.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            removed = 0
+            if max_age_days is not None:
+                cutoff = int(time.time()) // _SECONDS_PER_DAY - max_age_days
+                removed += connection.execute(
+                    "DELETE FROM objects WHERE day < ?", (cutoff,)
+                ).rowcount
+            for stream in streams:
+                removed += connection.execute(
+                    "DELETE FROM objects WHERE stream IN "
+                    "(SELECT id FROM streams WHERE name = ?)",
+                    (stream,),
+                ).rowcount
+        connection.execute("VACUUM")
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        (kept,) = connection.execute("SELECT COUNT(*) FROM objects").fetchone()
+    finally:
+        connection.close()
+    return removed, kept
+
+
+def main(argv: t.Sequence[str] | None = None) -> None:
+    """Run the ``tap-stripe-dedup`` command."""
+    parser = argparse.ArgumentParser(
+        prog="tap-stripe-dedup",
+        description="Maintain the index of `dedup_index_path`.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    compact_parser = commands.add_parser(
+        "compact",
+        help="Drop old entries and shrink the file. Run while no sync uses it.",
+    )
+    compact_parser.add_argument("path", help="The index file")
+    compact_parser.add_argument(
+        "--max-age-days",
+        type=int,
+        help="Drop the entries of objects unchanged for this many days",
+    )
+    compact_parser.add_argument(
+        "--stream",
+        action="append",
+        default=[],
+        help="Drop every entry of a stream; repeatable",
+    )
+    args = parser.parse_args(argv)
+
+    size = Path(args.path).stat().st_size
+    removed, kept = compact(
+        args.path, max_age_days=args.max_age_days, streams=args.stream
+    )
+    sys.stdout.write(
+        f"Dropped {removed} entries, kept {kept}; "
+        f"{size} -> {Path(args.path).stat().st_size} bytes\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
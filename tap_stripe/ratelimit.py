@@ -0,0 +1,254 @@
+"""Client-side request scheduling for Stripe's per-account rate limits."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    import requests
+
+#: Stripe's default read limits, in requests per second.
+LIVE_MODE_RATE = 100.0
+TEST_MODE_RATE = 25.0
+
+_THROTTLE_ERROR_CODES = frozenset({"rate_limit", "lock_timeout"})
+
+
+class TokenBucket:
+    """A thread-safe token bucket refilled continuously at ``rate`` per second."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """Create a full bucket.
+
+        Args:
+            rate: Tokens added per second.
+            capacity: Maximum number of tokens, defaults to one second's worth.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds``.
+
+        Args:
+            seconds: How long to pause for.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def try_acquire(self) -> float:
+        """Take one token if one is available.
+
+        Returns:
+            ``0`` if a token was taken, otherwise the number of seconds to wait
+            before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                self._updated = self._paused_until
+                return self._paused_until - now
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Take one token, blocking until one is available.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while delay := self.try_acquire():
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+    async def acquire_async(self) -> float:
+        """Take one token without blocking the event loop.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while delay := self.try_acquire():
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+
+class RequestScheduler:
+    """Share one request budget between every stream of a tap.
+
+    Requests take a token from a bucket sized for the account's mode before
+    they are sent. Throttled responses (HTTP 429, ``rate_limit`` and
+    ``lock_timeout`` errors) halve the request rate and pause the bucket for
+    the server's ``Retry-After``; every successful response then adds back a
+    small fraction of the configured rate until it is reached again.
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        *,
+        min_rate: float = 1.0,
+        recovery_steps: int = 100,
+    ) -> None:
+        """Create a scheduler.
+
+        Args:
+            max_rate: Highest request rate, in requests per second.
+            min_rate: Lowest rate the scheduler backs off to.
+            recovery_steps: Successful responses needed to recover from the
+                minimum rate back to ``max_rate``.
+        """
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self._increase = (max_rate - self.min_rate) / max(recovery_steps, 1)
+        self.bucket = TokenBucket(max_rate)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled_responses = 0
+        self.throttled_seconds = 0.0
+        self.request_seconds = 0.0
+
+    @classmethod
+    def for_api_key(
+        cls,
+        api_key: str,
+        max_rate: float | None = None,
+    ) -> RequestScheduler:
+        """Create a scheduler sized for the mode of ``api_key``.
+
+        Args:
+            api_key: A Stripe secret or restricted key.
+            max_rate: Optional rate overriding Stripe's default limit.
+
+        Returns:
+            A new scheduler.
+        """
+        if max_rate is None:
+            live = api_key.startswith(("sk_live_", "rk_live_"))
+            max_rate = LIVE_MODE_RATE if live else TEST_MODE_RATE
+        return cls(max_rate)
+
+    @property
+    def rate(self) -> float:
+        """The current request rate, in requests per second."""
+        return self.bucket.rate
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        waited = self.bucket.acquire()
+        with self._lock:
+            self.throttled_seconds += waited
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a request may be sent."""
+        waited = await self.bucket.acquire_async()
+        with self._lock:
+            self.throttled_seconds += waited
+
+    def record_response(self, response: requests.Response, elapsed: float) -> None:
+        """Adapt the request rate to a response.
+
+        Args:
+            response: The HTTP response.
+            elapsed: Seconds spent waiting for it.
+        """
+        throttled = is_throttled(response)
+        with self._lock:
+            self.requests += 1
+            self.request_seconds += elapsed
+            if throttled:
+                self.throttled_responses += 1
+                self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+            elif self.bucket.rate < self.max_rate:
+                self.bucket.rate = min(self.max_rate, self.bucket.rate + self._increase)
+        if throttled:
+            self.bucket.pause(retry_after(response) or 1 / self.bucket.rate)
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Counters of useful and throttled time."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled_responses": self.throttled_responses,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "request_seconds": round(self.request_seconds, 3),
+                "rate": round(self.bucket.rate, 2),
+            }
+
+
+def error_code(response: requests.Response) -> str | None:
+    """Return the ``error.code`` of a Stripe error response, if any.
+
+    Args:
+        response: The HTTP response.
+
+    Returns:
+        The error code, or ``None`` for successful or non-JSON responses.
+    """
+    if response.status_code < 400:  # noqa: PLR2004
+        return None
+    try:
+        return response.json().get("error", {}).get("code")
+    except ValueError:
+        return None
+
+
+def is_throttled(response: requests.Response) -> bool:
+    """Tell whether Stripe rejected a request because of load.
+
+    Args:
+        response: The HTTP response.
+
+    Returns:
+        True for 429s and ``rate_limit``/``lock_timeout`` errors.
+    """
+    return response.status_code == 429 or error_code(response) in _THROTTLE_ERROR_CODES  # noqa: PLR2004
+
+
+def retry_after(response: requests.Response) -> float | None:
+    """Return the ``Retry-After`` delay of a response, in seconds.
+
+    Args:
+        response: The HTTP response.
+
+    Returns:
+        The delay, or ``None`` if the header is missing or not a number.
+    """
+    try:
+        return max(float(response.headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return None
+
+
+def should_retry(response: requests.Response) -> bool | None:
+    """Return Stripe's ``Stripe-Should-Retry`` hint.
+
+    Args:
+        response: The HTTP response.
+
+    Returns:
+        The hint, or ``None`` when Stripe did not send one.
+    """
+    value = response.headers.get("Stripe-Should-Retry")
+    if value is None:
+        return None
+    return value.lower() == "true"
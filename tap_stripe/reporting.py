@@ -0,0 +1,111 @@
+"""Stripe report runs: CSV result files, parsed while they are downloaded.
+
+Report files express amounts in major currency units (``12.34``) and times as
+``YYYY-MM-DD HH:MM:SS`` strings, where the API uses integer amounts in minor
+units and Unix timestamps. The helpers here convert report values to the API
+representation, so records read from reports match those read from lists.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+import typing as t
+from decimal import Decimal
+
+if t.TYPE_CHECKING:
+    import requests
+
+#: Currencies without minor units, see https://stripe.com/docs/currencies.
+ZERO_DECIMAL_CURRENCIES = frozenset(
+    (
+        "bif",
+        "clp",
+        "djf",
+        "gnf",
+        "jpy",
+        "kmf",
+        "krw",
+        "mga",
+        "pyg",
+        "rwf",
+        "ugx",
+        "vnd",
+        "vuv",
+        "xaf",
+        "xof",
+        "xpf",
+    )
+)
+
+#: Currencies whose minor unit is a thousandth.
+THREE_DECIMAL_CURRENCIES = frozenset(("bhd", "jod", "kwd", "omr", "tnd"))
+
+
+def currency_exponent(currency: str) -> int:
+    """Return the number of decimals of a currency's major unit.
+
+    Args:
+        currency: A three-letter ISO currency code.
+
+    Returns:
+        0, 2 or 3.
+    """
+    currency = currency.lower()
+    if currency in ZERO_DECIMAL_CURRENCIES:
+        return 0
+    if currency in THREE_DECIMAL_CURRENCIES:
+        return 3
+    return 2
+
+
+def to_minor_units(amount: str, currency: str) -> int | None:
+    """Convert a report amount to the integer amount used by the API.
+
+    Args:
+        amount: A decimal amount in major units, e.g. ``-12.34``.
+        currency: The currency of the amount.
+
+    Returns:
+        The amount in minor units, e.g. ``-1234``, or ``None`` if empty.
+    """
+    if not amount:
+        return None
+    return int(Decimal(amount).scaleb(currency_exponent(currency)))
+
+
+def parse_report_time(value: str) -> int | None:
+    """Convert a report time, in UTC, to a Unix timestamp.
+
+    Args:
+        value: A ``YYYY-MM-DD HH:MM:SS`` string, as in ``*_utc`` columns.
+
+    Returns:
+        The timestamp, or ``None`` if empty.
+    """
+    if not value:
+        return None
+    moment = datetime.datetime.fromisoformat(value)
+    return int(moment.replace(tzinfo=datetime.timezone.utc).timestamp())
+
+
+def iter_report_rows(response: requests.Response) -> t.Iterator[dict[str, str]]:
+    """Yield the rows of a report file while it is downloaded.
+
+    Args:
+        response: The response to a file download, preferably sent with
+            ``stream=True``.
+
+    Yields:
+        Each row, keyed by column name.
+    """
+    if response.raw is None or response._content is not False:  # noqa: SLF001
+        text: t.TextIO = io.StringIO(response.content.decode("utf-8-sig"))
+    else:
+        response.raw.decode_content = True
+        # Reached at the end of the body rather than closed, as text wrappers
+        # expect of their buffer.
+        response.raw.auto_close = False
+        text = io.TextIOWrapper(response.raw, encoding="utf-8-sig", newline="")
+    yield from csv.DictReader(text)
@@ -0,0 +1,376 @@
+"""Definitions of the stream schemas, compiled into the JSON files of this package.
+
+Streams load their schema from the JSON files when first used, so importing the
+tap builds no schema. After changing a definition, regenerate the files with::
+
+    python -m tap_stripe.schemas.definitions
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from singer_sdk import typing as th  # JSON Schema typing helpers
+
+CUSTOMERS = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+    th.Property("address", th.AnyType),
+    th.Property("balance", th.IntegerType, required=True),
+    th.Property("created", th.IntegerType, required=True),
+    th.Property("currency", th.StringType),
+    th.Property("default_source", th.StringType),
+    th.Property("delinquent", th.BooleanType, required=True),
+    th.Property("description", th.StringType),
+    th.Property("discount", th.AnyType),
+    th.Property("email", th.StringType, required=True),
+    th.Property("invoice_prefix", th.StringType, required=True),
+    th.Property(
+        "invoice_settings",
+        th.ObjectType(
+            th.Property("custom_fields", th.AnyType),
+            th.Property("default_payment_method", th.StringType),
+            th.Property("footer", th.StringType),
+            th.Property("rendering_options", th.AnyType),
+        ),
+        required=True,
+    ),
+    th.Property("livemode", th.BooleanType, required=True),
+    th.Property("metadata", th.ObjectType(), required=True),
+    th.Property("name", th.StringType),
+    th.Property("next_invoice_sequence", th.IntegerType, required=True),
+    th.Property("phone", th.StringType),
+    th.Property("preferred_locales", th.ArrayType(th.StringType), required=True),
+    th.Property("shipping", th.AnyType),
+    th.Property(
+        "tax_exempt",
+        th.StringType,
+        required=True,
+        allowed_values=["none", "exempt", "reverse"],
+    ),
+    th.Property("test_clock", th.AnyType),
+).to_dict()
+
+SUBSCRIPTIONS = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+    th.Property("created", th.IntegerType, required=True),
+    th.Property("cancel_at", th.IntegerType),
+    th.Property("cancel_at_period_end", th.BooleanType, required=True),
+    th.Property("canceled_at", th.IntegerType),
+    th.Property(
+        "cancellation_details",
+        th.ObjectType(
+            th.Property("comment", th.StringType),
+            th.Property("feedback", th.StringType),
+            th.Property("reason", th.StringType),
+        ),
+        required=True,
+    ),
+    th.Property("collection_method", th.StringType, required=True),
+    th.Property(
+        "pause_collection",
+        th.ObjectType(
+            th.Property("behavior", th.StringType),
+            th.Property("resumes_at", th.IntegerType),
+        ),
+    ),
+    th.Property("customer", th.StringType, required=True),
+    th.Property("default_payment_method", th.StringType),
+    th.Property("current_period_end", th.IntegerType, required=True),
+    th.Property("current_period_start", th.IntegerType, required=True),
+    th.Property(
+        "items",
+        th.ObjectType(
+            th.Property("object", th.StringType, required=True),
+            th.Property(
+                "data",
+                th.ArrayType(
+                    th.ObjectType(
+                        th.Property("id", th.StringType, required=True),
+                        th.Property("object", th.StringType, required=True),
+                        th.Property(
+                            "billing_thresholds",
+                            th.ObjectType(additional_properties=True),
+                        ),
+                        th.Property("created", th.IntegerType, required=True),
+                        th.Property("discounts", th.ArrayType(th.StringType)),
+                        th.Property(
+                            "metadata",
+                            th.ObjectType(additional_properties=True),
+                            required=True,
+                        ),
+                        th.Property("price", th.ObjectType(additional_properties=True)),
+                        th.Property("quantity", th.IntegerType),
+                        th.Property("subscription", th.StringType, required=True),
+                        th.Property(
+                            "tax_rates",
+                            th.ArrayType(th.ObjectType(additional_properties=True)),
+                        ),
+                        additional_properties=True,
+                    )
+                ),
+                required=True,
+            ),
+            th.Property("total_count", th.IntegerType, required=True),
+            additional_properties=True,
+        ),
+        required=True,
+    ),
+    th.Property("latest_invoice", th.StringType),
+    th.Property("livemode", th.BooleanType, required=True),
+    th.Property("metadata", th.ObjectType(additional_properties=True), required=True),
+    th.Property(
+        "payment_settings", th.ObjectType(additional_properties=True), required=True
+    ),
+    th.Property("start_date", th.IntegerType, required=True),
+    th.Property("status", th.StringType, required=True),
+    th.Property("trial_end", th.IntegerType),
+    th.Property(
+        "trial_settings", th.ObjectType(additional_properties=True), required=True
+    ),
+    th.Property("trial_start", th.IntegerType),
+).to_dict()
+
+PRODUCTS = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+    th.Property("active", th.BooleanType, required=True),
+    th.Property("attributes", th.ArrayType(th.StringType), required=True),
+    th.Property("created", th.IntegerType, required=True),
+    th.Property("default_price", th.StringType, required=True),
+    th.Property("description", th.StringType),
+    th.Property(
+        "features",
+        th.ArrayType(th.ObjectType(additional_properties=True)),
+        required=True,
+    ),
+    th.Property("images", th.ArrayType(th.StringType), required=True),
+    th.Property("livemode", th.BooleanType, required=True),
+    th.Property(
+        "marketing_features",
+        th.ArrayType(th.ObjectType(additional_properties=True)),
+        required=True,
+    ),
+    th.Property("metadata", th.ObjectType(additional_properties=True), required=True),
+    th.Property("name", th.StringType, required=True),
+    th.Property("package_dimensions", th.ObjectType(additional_properties=True)),
+    th.Property("shippable", th.BooleanType),
+    th.Property("statement_descriptor", th.StringType),
+    th.Property("tax_code", th.StringType),
+    th.Property("type", th.StringType, required=True),
+    th.Property("unit_label", th.StringType),
+    th.Property("updated", th.IntegerType, required=True),
+    th.Property("url", th.StringType),
+).to_dict()
+
+EVENTS = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+    th.Property("type", th.StringType, required=True),
+    th.Property("created", th.IntegerType, required=True),
+    th.Property("data", th.ObjectType(additional_properties=True)),
+).to_dict()
+
+INVOICES = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+    th.Property("auto_advance", th.BooleanType, required=True),
+    th.Property("charge", th.StringType),
+    th.Property(
+        "collection_method",
+        th.StringType,
+        required=True,
+        allowed_values=["charge_automatically", "send_invoice"],
+    ),
+    th.Property("currency", th.StringType, required=True),
+    th.Property("customer", th.StringType, required=True),
+    th.Property("description", th.StringType),
+    th.Property("hosted_invoice_url", th.StringType),
+    th.Property("metadata", th.ObjectType(additional_properties=True)),
+    th.Property("payment_intent", th.StringType),
+    th.Property("period_end", th.IntegerType, required=True),
+    th.Property("period_start", th.IntegerType, required=True),
+    th.Property(
+        "status",
+        th.StringType,
+        allowed_values=["draft", "open", "paid", "uncollectible", "void"],
+    ),
+    th.Property("subscription", th.StringType),
+    th.Property("total", th.IntegerType, required=True),
+    th.Property("account_country", th.StringType),
+    th.Property("account_name", th.StringType),
+    th.Property("account_tax_ids", th.ArrayType(th.StringType)),
+    th.Property("amount_due", th.IntegerType, required=True),
+    th.Property("amount_paid", th.IntegerType, required=True),
+    th.Property("amount_remaining", th.IntegerType, required=True),
+    th.Property("amount_shipping", th.IntegerType),
+    th.Property("application", th.StringType),
+    th.Property("application_fee_amount", th.IntegerType),
+    th.Property("attempt_count", th.IntegerType, required=True),
+    th.Property("attempted", th.BooleanType, required=True),
+    th.Property("automatically_finalizes_at", th.IntegerType),
+    th.Property("billing_reason", th.StringType),
+    th.Property("created", th.IntegerType, required=True),
+    th.Property("default_payment_method", th.StringType),
+    th.Property("default_source", th.StringType),
+    th.Property(
+        "default_tax_rates", th.ArrayType(th.ObjectType(additional_properties=True))
+    ),
+    th.Property("discount", th.ObjectType(additional_properties=True)),
+    th.Property("discounts", th.ArrayType(th.StringType)),
+    th.Property("due_date", th.IntegerType),
+    th.Property("effective_at", th.IntegerType),
+    th.Property("ending_balance", th.IntegerType),
+    th.Property("footer", th.StringType),
+    th.Property("from_invoice", th.ObjectType(additional_properties=True)),
+    th.Property("invoice_pdf", th.StringType),
+    th.Property("next_payment_attempt", th.IntegerType),
+    th.Property("number", th.StringType),
+    th.Property("on_behalf_of", th.StringType),
+    th.Property("paid", th.BooleanType, required=True),
+    th.Property("paid_out_of_band", th.BooleanType, required=True),
+    th.Property(
+        "payment_settings",
+        th.ObjectType(
+            th.Property("default_mandate", th.StringType),
+            th.Property(
+                "payment_method_options", th.ObjectType(additional_properties=True)
+            ),
+            th.Property("payment_method_types", th.ArrayType(th.StringType)),
+        ),
+        required=True,
+    ),
+    th.Property(
+        "status_transitions",
+        th.ObjectType(
+            th.Property("finalized_at", th.IntegerType),
+            th.Property("marked_uncollectible_at", th.IntegerType),
+            th.Property("paid_at", th.IntegerType),
+            th.Property("voided_at", th.IntegerType),
+        ),
+    ),
+    th.Property("subscription_details", th.ObjectType(additional_properties=True)),
+    th.Property("subscription_proration_date", th.IntegerType),
+    th.Property("subtotal", th.IntegerType, required=True),
+    th.Property("subtotal_excluding_tax", th.IntegerType),
+    th.Property("tax", th.IntegerType),
+    th.Property("test_clock", th.StringType),
+    th.Property("threshold_reason", th.ObjectType(additional_properties=True)),
+    th.Property(
+        "total_discount_amounts",
+        th.ArrayType(th.ObjectType(additional_properties=True)),
+    ),
+    th.Property("total_excluding_tax", th.IntegerType),
+    th.Property(
+        "total_tax_amounts", th.ArrayType(th.ObjectType(additional_properties=True))
+    ),
+    th.Property("transfer_data", th.ObjectType(additional_properties=True)),
+    th.Property("webhooks_delivered_at", th.IntegerType),
+).to_dict()
+
+BALANCE_TRANSACTIONS = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+    th.Property("amount", th.IntegerType, required=True),
+    th.Property("available_on", th.IntegerType, required=True),
+    th.Property("created", th.IntegerType, required=True),
+    th.Property("currency", th.StringType, required=True),
+    th.Property("description", th.StringType),
+    th.Property("exchange_rate", th.NumberType),
+    th.Property("fee", th.IntegerType, required=True),
+    th.Property(
+        "fee_details",
+        th.ArrayType(th.ObjectType(additional_properties=True)),
+    ),
+    th.Property("net", th.IntegerType, required=True),
+    th.Property("reporting_category", th.StringType, required=True),
+    th.Property("source", th.StringType),
+    th.Property("status", th.StringType),
+    th.Property("type", th.StringType),
+).to_dict()
+
+# Only listed to discover account partitions.
+CONNECTED_ACCOUNTS = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+).to_dict()
+
+# Expanded objects that have no stream of their own.
+EXPANDED_OBJECT = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+    th.Property("created", th.IntegerType),
+    th.Property("livemode", th.BooleanType),
+    th.Property("metadata", th.ObjectType(additional_properties=True)),
+    additional_properties=True,
+).to_dict()
+
+INVOICE_LINE_ITEMS = th.PropertiesList(
+    th.Property("id", th.StringType, required=True),
+    th.Property("object", th.StringType, required=True),
+    th.Property("invoice", th.StringType, required=True),
+    th.Property("amount", th.IntegerType, required=True),
+    th.Property("amount_excluding_tax", th.IntegerType),
+    th.Property("currency", th.StringType, required=True),
+    th.Property("description", th.StringType),
+    th.Property("discountable", th.BooleanType),
+    th.Property("discounts", th.ArrayType(th.StringType)),
+    th.Property("livemode", th.BooleanType, required=True),
+    th.Property("metadata", th.ObjectType(additional_properties=True)),
+    th.Property(
+        "period",
+        th.ObjectType(
+            th.Property("end", th.IntegerType),
+            th.Property("start", th.IntegerType),
+        ),
+    ),
+    th.Property("price", th.ObjectType(additional_properties=True)),
+    th.Property("proration", th.BooleanType),
+    th.Property("quantity", th.IntegerType),
+    th.Property("subscription", th.StringType),
+    th.Property("subscription_item", th.StringType),
+    th.Property("type", th.StringType),
+    additional_properties=True,
+).to_dict()
+
+# Same as the items embedded in subscriptions.
+SUBSCRIPTION_ITEMS = SUBSCRIPTIONS["properties"]["items"]["properties"]["data"]["items"]
+
+#: Schema of each JSON file.
+SCHEMAS = {
+    "balance_transactions.json": BALANCE_TRANSACTIONS,
+    "connected_accounts.json": CONNECTED_ACCOUNTS,
+    "customers.json": CUSTOMERS,
+    "events.json": EVENTS,
+    "expanded_object.json": EXPANDED_OBJECT,
+    "invoice_line_items.json": INVOICE_LINE_ITEMS,
+    "invoices.json": INVOICES,
+    "products.json": PRODUCTS,
+    "subscription_items.json": SUBSCRIPTION_ITEMS,
+    "subscriptions.json": SUBSCRIPTIONS,
+}
+
+
+def dumps(schema: dict) -> str:
+    """Serialize a schema as in its JSON file.
+
+    Args:
+        schema: A JSON schema.
+
+    Returns:
+        The indented JSON, with a trailing newline.
+    """
+    return json.dumps(schema, indent=2) + "\n"
+
+
+def main() -> None:
+    """Write the JSON file of every schema next to this module."""
+    directory = Path(__file__).parent
+    for filename, schema in SCHEMAS.items():
+        (directory / filename).write_text(dumps(schema), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Catalog field selection, applied to records before conformance."""
+
+from __future__ import annotations
+
+import typing as t
+
+if t.TYPE_CHECKING:
+    from singer_sdk._singerlib import SelectionMask
+
+#: Selected property names, mapped to the mask of their own properties, or to
+#: ``None`` when the property is selected as a whole.
+FieldMask = t.Dict[str, t.Optional["FieldMask"]]
+
+
+def build_field_mask(
+    schema: dict,
+    mask: SelectionMask,
+    breadcrumb: tuple[str, ...] = (),
+) -> FieldMask | None:
+    """Return the properties of ``schema`` selected in ``mask``.
+
+    Args:
+        schema: An object schema.
+        mask: The stream's selection mask.
+        breadcrumb: The breadcrumb of ``schema`` within the stream schema.
+
+    Returns:
+        The field mask, or ``None`` when every property is selected.
+    """
+    properties = schema.get("properties")
+    if not properties:
+        return None
+
+    field_mask: FieldMask = {}
+    pruned = False
+    for name, property_schema in properties.items():
+        property_breadcrumb = (*breadcrumb, "properties", name)
+        if not mask[property_breadcrumb]:
+            pruned = True
+            continue
+        nested = build_field_mask(property_schema, mask, property_breadcrumb)
+        pruned = pruned or nested is not None
+        field_mask[name] = nested
+    return field_mask if pruned else None
+
+
+def prune_record(record: dict, field_mask: FieldMask) -> dict:
+    """Return a copy of ``record`` with only the fields in ``field_mask``.
+
+    Only selected fields are visited, so the cost follows the width of the
+    selection rather than the width of the record.
+
+    Args:
+        record: A record, or a nested object of one.
+        field_mask: The selected fields, see :func:`build_field_mask`.
+
+    Returns:
+        The pruned record.
+    """
+    pruned = {}
+    for name, nested in field_mask.items():
+        if name in record:
+            value = record[name]
+            if nested is not None and isinstance(value, dict):
+                value = prune_record(value, nested)
+            pruned[name] = value
+    return pruned
@@ -0,0 +1,93 @@
+"""Incremental parsing of Stripe list pages, without decoding whole bodies.
+
+Requires the ``streaming`` extra (``ijson``).
+"""
+
+from __future__ import annotations
+
+import typing as t
+
+if t.TYPE_CHECKING:
+    import requests
+
+_ITEM = "data.item"
+_PAGE_KEYS = frozenset(("has_more", "next_page", "object", "url"))
+_START_EVENTS = frozenset(("start_map", "start_array"))
+_END_EVENTS = frozenset(("end_map", "end_array"))
+_CHUNK_SIZE = 64 * 1024
+
+
+def require_ijson() -> None:
+    """Check that the streaming parser is available.
+
+    Raises:
+        ImportError: If the ``streaming`` extra is not installed.
+    """
+    try:
+        import ijson  # noqa: F401
+    except ImportError as ex:
+        msg = (
+            "Streaming page parsing requires ijson. Install tap-stripe with the "
+            "`streaming` extra: pip install 'keragon-tap-stripe[streaming]'"
+        )
+        raise ImportError(msg) from ex
+
+
+def iter_page_records(response: requests.Response) -> t.Iterator[dict]:
+    """Yield the ``data`` items of a list page while its body is downloaded.
+
+    The body is tokenized once: items are built from the parser's events, and
+    the page's own keys are read from the same events. Only the items parsed
+    from one chunk of the body are held in memory. Once the body has been read,
+    a summary of the page (``has_more``, ``next_page`` and the last item) is
+    memoized where :func:`tap_stripe.client.get_page` looks for the decoded
+    page, so paginators work unchanged.
+
+    Responses whose body has already been read are decoded as usual.
+
+    Args:
+        response: A response sent with ``stream=True``.
+
+    Yields:
+        Each item of the page, in order.
+    """
+    from tap_stripe.client import get_page
+
+    if response.raw is None or response._content is not False:  # noqa: SLF001
+        yield from get_page(response)["data"]
+        return
+
+    import ijson
+
+    summary: dict[str, t.Any] = {"data": [], "has_more": False}
+    events: list[tuple] = ijson.sendable_list()
+    parser = ijson.parse_coro(events, use_float=True)
+    builder: ijson.ObjectBuilder | None = None
+    # Let urllib3 undo the gzip transfer encoding while ijson reads.
+    response.raw.decode_content = True
+    try:
+        while chunk := response.raw.read(_CHUNK_SIZE):
+            parser.send(chunk)
+            items = []
+            for prefix, event, value in events:
+                if builder is not None:
+                    builder.event(event, value)
+                    if prefix == _ITEM and event in _END_EVENTS:
+                        items.append(builder.value)
+                        builder = None
+                elif prefix == _ITEM:
+                    if event in _START_EVENTS:
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                    else:
+                        items.append(value)
+                elif prefix in _PAGE_KEYS:
+                    summary[prefix] = value
+            del events[:]
+            if items:
+                summary["data"] = [items[-1]]
+                yield from items
+        parser.close()
+    finally:
+        response.close()
+    response._stripe_page = summary  # noqa: SLF001
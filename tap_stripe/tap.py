@@ -2,11 +2,43 @@
 
 from __future__ import annotations
 
+import threading
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+import requests
+from requests.adapters import HTTPAdapter
 from singer_sdk import Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
+from singer_sdk._singerlib import Message, StateMessage
 
 # TODO: Import your custom stream types here:
 from tap_stripe import streams
+from tap_stripe.ratelimit import RequestScheduler
+
+if t.TYPE_CHECKING:
+    from tap_stripe.aio import AsyncEngine
+    from tap_stripe.dedup import DedupIndex
+    from tap_stripe.telemetry import Telemetry
+
+#: The streams of the catalog, parents before their children.
+STREAM_TYPES: tuple[type[streams.StripeStream], ...] = (
+    streams.CustomersStream,
+    streams.SubscriptionsStream,
+    streams.ProductsStream,
+    streams.EventsStream,
+    streams.InvoicesStream,
+    streams.BalanceTransactionsStream,
+    streams.InvoiceCustomersStream,
+    streams.InvoiceChargesStream,
+    streams.InvoicePaymentIntentsStream,
+    streams.InvoiceSubscriptionsStream,
+    streams.SubscriptionLatestInvoicesStream,
+    streams.SubscriptionDefaultPaymentMethodsStream,
+    streams.SubscriptionItemsStream,
+    streams.InvoiceLineItemsStream,
+)
 
 
 class TapStripe(Tap):
@@ -24,27 +56,488 @@ class TapStripe(Tap):
         ),
         th.Property(
             "account_id",
-            th.StringType,
-            required=True,
+            th.OneOf(th.StringType, th.ArrayType(th.StringType)),
             secret=True,
-            description="Stripe account ID",
+            description=(
+                "Stripe account ID, sent as the `Stripe-Account` header. A list "
+                "of connected account IDs syncs each account as a separate "
+                "partition, with its own bookmarks"
+            ),
+        ),
+        th.Property(
+            "discover_accounts",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Sync every account connected to the platform, listed from "
+                "`/accounts`, instead of `account_id`"
+            ),
+        ),
+        th.Property(
+            "max_concurrent_accounts",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Maximum number of accounts synced at the same time, per stream. "
+                "All accounts share the request budget"
+            ),
+        ),
+        th.Property(
+            "api_url",
+            th.StringType,
+            description=(
+                "Base URL of the Stripe API, defaults to https://api.stripe.com/v1. "
+                "Only needed to point the tap at a proxy or a local stand-in"
+            ),
         ),
         th.Property(
             "start_date",
             th.DateTimeType,
             description="The earliest record date to sync",
-        )
+        ),
+        th.Property(
+            "backfill_window_days",
+            th.NumberType,
+            description=(
+                "Split each sync into `created` windows of this many days that "
+                "are fetched concurrently. Disabled when unset"
+            ),
+        ),
+        th.Property(
+            "backfill_window_target_records",
+            th.IntegerType,
+            description=(
+                "Resize backfill windows from observed record density so that "
+                "each holds roughly this many records"
+            ),
+        ),
+        th.Property(
+            "backfill_max_workers",
+            th.IntegerType,
+            default=4,
+            description="Maximum number of backfill windows fetched concurrently",
+        ),
+        th.Property(
+            "max_requests_per_second",
+            th.NumberType,
+            description=(
+                "Request budget shared by all streams. Defaults to Stripe's read "
+                "limit for the key's mode: 100/s in live mode, 25/s in test mode"
+            ),
+        ),
+        th.Property(
+            "async_engine",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Fetch backfill windows with the asyncio/HTTP2 engine instead of "
+                "a thread pool. Requires the `async` extra"
+            ),
+        ),
+        th.Property(
+            "async_max_concurrency",
+            th.IntegerType,
+            default=100,
+            description="Maximum number of requests in flight on the async engine",
+        ),
+        th.Property(
+            "async_max_connections",
+            th.IntegerType,
+            default=10,
+            description="Maximum number of HTTP/2 connections of the async engine",
+        ),
+        th.Property(
+            "events_incremental_sync",
+            th.BooleanType,
+            default=False,
+            description=(
+                "After a first full sync, update customers, subscriptions, "
+                "products and invoices from the changes listed in `/events` "
+                "instead of listing them again. Events are kept for 30 days, so "
+                "syncs must run at least that often"
+            ),
+        ),
+        th.Property(
+            "search_streams",
+            th.ArrayType(th.StringType),
+            description=(
+                "Streams read from the Search API instead of list endpoints. "
+                "Supported by customers, invoices and subscriptions; streams fall "
+                "back to list endpoints when search is unavailable"
+            ),
+        ),
+        th.Property(
+            "search_overlap_seconds",
+            th.IntegerType,
+            default=300,
+            description=(
+                "How far back before the bookmark search queries start, so "
+                "objects indexed late by Stripe search are not missed"
+            ),
+        ),
+        th.Property(
+            "search_indexing_lag_seconds",
+            th.IntegerType,
+            default=60,
+            description=(
+                "How long before the sync starts search queries end. Objects "
+                "created since are read by the next sync, once Stripe search has "
+                "indexed them"
+            ),
+        ),
+        th.Property(
+            "report_streams",
+            th.ArrayType(th.StringType),
+            description=(
+                "Streams whose history is read from Stripe report runs, then from "
+                "list endpoints from the end of the reported data. Supported by "
+                "balance_transactions; worth it for ranges of a week or more"
+            ),
+        ),
+        th.Property(
+            "report_poll_seconds",
+            th.NumberType,
+            default=5,
+            description=(
+                "Seconds before the status of a report run is first checked, "
+                "doubled at every check up to a minute"
+            ),
+        ),
+        th.Property(
+            "expand",
+            th.ObjectType(additional_properties=th.ArrayType(th.StringType)),
+            description=(
+                "Fields to expand into the objects they reference, per stream, "
+                'e.g. {"invoices": ["customer", "charge"]}. Expanded fields hold '
+                "either the id or the object"
+            ),
+        ),
+        th.Property(
+            "expand_child_streams",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Emit expanded objects as records of child streams, such as "
+                "`invoice_customers`, and keep only their ids in the parent record"
+            ),
+        ),
+        th.Property(
+            "checkpoint_interval_pages",
+            th.IntegerType,
+            default=10,
+            description=(
+                "Save the position of list syncs in state every this many pages, "
+                "so that an interrupted sync resumes from there instead of from "
+                "the first page. 0 disables checkpoints"
+            ),
+        ),
+        th.Property(
+            "streaming_parse",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Parse list pages while they are downloaded, holding one record "
+                "at a time instead of whole pages. Requires the `streaming` extra"
+            ),
+        ),
+        th.Property(
+            "batch_max_bytes",
+            th.IntegerType,
+            description=(
+                "With `batch_config`, also complete batch files once they hold this "
+                "many bytes of uncompressed JSON. `batch_config.batch_size` bounds "
+                "their number of records"
+            ),
+        ),
+        th.Property(
+            "cassette_path",
+            th.StringType,
+            description=(
+                "JSON Lines file where API responses are recorded, or replayed "
+                "from, depending on `cassette_mode`. Not used by the async engine"
+            ),
+        ),
+        th.Property(
+            "cassette_mode",
+            th.StringType,
+            default="replay",
+            allowed_values=["record", "replay"],
+            description=(
+                "`record` to call the API and save its responses to "
+                "`cassette_path`, `replay` to answer requests from it offline"
+            ),
+        ),
+        th.Property(
+            "dedup_index_path",
+            th.StringType,
+            description=(
+                "SQLite file indexing a hash of the last version emitted of every "
+                "object. Records identical to it are not emitted again, e.g. from "
+                "overlapping windows or replayed events. Delete the file to emit "
+                "every record again; shrink it with `tap-stripe-dedup compact`"
+            ),
+        ),
+        th.Property(
+            "telemetry",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Measure request latencies, response sizes, retries, page "
+                "decoding and record emitting per stream, and log them "
+                "periodically as METRIC lines"
+            ),
+        ),
+        th.Property(
+            "telemetry_interval_seconds",
+            th.NumberType,
+            default=60,
+            description="Seconds between two telemetry reports",
+        ),
+        th.Property(
+            "telemetry_openmetrics_path",
+            th.StringType,
+            description=(
+                "With `telemetry`, also write the measures to this file in the "
+                "OpenMetrics text format at each report"
+            ),
+        ),
+        th.Property(
+            "telemetry_port",
+            th.IntegerType,
+            description=(
+                "With `telemetry`, also serve the measures in the OpenMetrics "
+                "text format on this port of localhost while syncing"
+            ),
+        ),
+        th.Property(
+            "max_concurrent_streams",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Maximum number of streams synced at the same time. Streams are "
+                "synced one after another when set to 1"
+            ),
+        ),
     ).to_dict()
 
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
+        """Initialize the tap.
+
+        Args:
+            *args: Positional arguments for the base tap.
+            **kwargs: Keyword arguments for the base tap.
+        """
+        # Serializes Singer messages and the state mutations they capture, so
+        # streams synced on worker threads never interleave output or emit
+        # STATE from a half-updated bookmark.
+        self.message_lock = threading.RLock()
+        super().__init__(*args, **kwargs)
+        self.request_scheduler = RequestScheduler.for_api_key(
+            self.config.get("api_key", ""),
+            self.config.get("max_requests_per_second"),
+        )
+        self.requests_session = self._build_requests_session()
+        self._async_engine: AsyncEngine | None = None
+        self.dedup_index: DedupIndex | None = None
+        if self.config.get("dedup_index_path"):
+            from tap_stripe.dedup import DedupIndex
+
+            self.dedup_index = DedupIndex(self.config["dedup_index_path"])
+        self.telemetry: Telemetry | None = None
+        if self.config.get("telemetry"):
+            from tap_stripe.telemetry import Telemetry
+
+            self.telemetry = Telemetry(
+                interval=self.config.get("telemetry_interval_seconds") or 60,
+                openmetrics_path=self.config.get("telemetry_openmetrics_path"),
+                port=self.config.get("telemetry_port"),
+            )
+        reported = {s.name for s in STREAM_TYPES if issubclass(s, streams.ReportStream)}
+        for name in sorted(set(self.config.get("report_streams") or []) - reported):
+            self.logger.warning(
+                "No Stripe report lists the objects of '%s', listing instead.", name
+            )
+
+    @property
+    def async_engine(self) -> AsyncEngine | None:
+        """The asyncio/HTTP2 engine, when enabled with `async_engine`.
+
+        Returns:
+            The tap's async engine, created on first use, or ``None``.
+        """
+        if not self.config.get("async_engine"):
+            return None
+        with self.message_lock:
+            if self._async_engine is None:
+                from tap_stripe.aio import AsyncEngine
+
+                self._async_engine = AsyncEngine(
+                    max_concurrency=self.config.get("async_max_concurrency") or 100,
+                    max_connections=self.config.get("async_max_connections") or 10,
+                    verify=self.requests_session.verify,
+                )
+        return self._async_engine
+
+    @cached_property
+    def account_ids(self) -> list[str] | None:
+        """The accounts synced as separate partitions.
+
+        Returns:
+            The configured or discovered account IDs, or ``None`` when a single
+            account is synced.
+        """
+        if self.config.get("discover_accounts"):
+            account_ids = streams.ConnectedAccountsStream(self).list_account_ids()
+            self.logger.info("Discovered %d connected accounts.", len(account_ids))
+            return account_ids
+        account_id = self.config.get("account_id")
+        return list(account_id) if isinstance(account_id, list) else None
+
+    @property
+    def max_concurrent_requests(self) -> int:
+        """Upper bound on requests in flight at once, from the concurrency settings.
+
+        Returns:
+            The number of requests the tap may have in flight.
+        """
+        max_streams = self.config.get("max_concurrent_streams") or 1
+        max_streams *= self.config.get("max_concurrent_accounts") or 1
+        if self.config.get("backfill_window_days"):
+            return max_streams * (self.config.get("backfill_max_workers") or 4)
+        return max_streams
+
+    def _build_requests_session(self) -> requests.Session:
+        session = requests.Session()
+        # One pooled keep-alive connection per concurrent request, so worker
+        # threads never discard connections (and redo TLS handshakes) because
+        # the pool is full.
+        pool_size = max(self.max_concurrent_requests, 10)
+        if self.config.get("cassette_path"):
+            from tap_stripe.cassette import REPLAY, CassetteAdapter
+
+            adapter = CassetteAdapter(
+                self.config["cassette_path"],
+                self.config.get("cassette_mode") or REPLAY,
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+            )
+        else:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = "gzip"
+        session.headers["Connection"] = "keep-alive"
+        return session
+
+    def write_message(self, message: Message) -> None:
+        """Write a message to stdout, one message at a time.
+
+        Args:
+            message: The message to write.
+        """
+        with self.message_lock:
+            super().write_message(message)
+
     def discover_streams(self) -> list[streams.StripeStream]:
+        """Return the streams of the catalog.
+
+        With an input catalog, only its selected streams are constructed, with
+        the parents they are read through: the schemas of the other streams are
+        never loaded. Like unselected streams, streams absent from the catalog
+        are not synced.
+
+        Returns:
+            A list of streams.
+        """
+        stream_types = STREAM_TYPES
+        if self._input_catalog is not None:
+            wanted: set[type[streams.StripeStream]] = set()
+            for stream_type in STREAM_TYPES:
+                entry = self._input_catalog.get_stream(stream_type.name)
+                if entry is None or not entry.metadata.resolve_selection().get(
+                    (), False
+                ):
+                    continue
+                ancestor: type[streams.StripeStream] | None = stream_type
+                while ancestor is not None:
+                    wanted.add(ancestor)
+                    ancestor = ancestor.parent_stream_type
+            stream_types = tuple(s for s in STREAM_TYPES if s in wanted)
+        return [stream_type(self) for stream_type in stream_types]
+
+    def sync_all(self) -> None:
+        """Sync all streams.
+
+        Streams are synced concurrently when `max_concurrent_streams` > 1, and
+        the accounts of each stream when `max_concurrent_accounts` > 1.
+        """
+        max_streams = self.config.get("max_concurrent_streams") or 1
+        max_accounts = self.config.get("max_concurrent_accounts") or 1
+        if self.account_ids is None:
+            max_accounts = 1
+        if self.telemetry is not None:
+            self.telemetry.start()
+        try:
+            if max_streams <= 1 and max_accounts <= 1:
+                super().sync_all()
+            else:
+                self._sync_all_concurrently(max_streams, max_accounts)
+        finally:
+            if self._async_engine is not None:
+                self._async_engine.close()
+                self._async_engine = None
+            if self.telemetry is not None:
+                self.telemetry.stop()
+            if self.dedup_index is not None:
+                self.dedup_index.close()
+        self.logger.info("Request scheduler: %s", self.request_scheduler.stats)
+
+    def _sync_all_concurrently(self, max_streams: int, max_accounts: int) -> None:
+        self._reset_state_progress_markers()
+        self._set_compatible_replication_methods()
+        self.write_message(StateMessage(value=self.state))
+
+        to_sync = []
+        for stream in self.streams.values():
+            if not stream.selected and not stream.has_selected_descendents:
+                self.logger.info("Skipping deselected stream '%s'.", stream.name)
+                continue
+            if stream.parent_stream_type:
+                continue
+            # Create every bookmark entry up front so worker threads only ever
+            # update existing entries.
+            stream.get_context_state(None)
+            for context in stream.partitions or []:
+                stream.get_context_state(context)
+            to_sync.append(stream)
+
+        with ThreadPoolExecutor(
+            max_workers=max_streams,
+            thread_name_prefix="stripe-stream",
+        ) as executor:
+            futures = [
+                executor.submit(self._sync_stream, s, max_accounts) for s in to_sync
+            ]
+            for future in futures:
+                future.result()
+
+        for stream in self.streams.values():
+            stream.log_sync_costs()
 
-        return [
-            streams.CustomersStream(self),
-            streams.SubscriptionsStream(self),
-            streams.ProductsStream(self),
-            streams.EventsStream(self),
-            streams.InvoicesStream(self),
-        ]
+    @staticmethod
+    def _sync_stream(stream: streams.StripeStream, max_accounts: int) -> None:
+        partitions = stream.partitions
+        if not partitions or max_accounts <= 1:
+            stream.sync()
+        else:
+            with ThreadPoolExecutor(
+                max_workers=max_accounts,
+                thread_name_prefix=f"stripe-{stream.name}",
+            ) as executor:
+                futures = [executor.submit(stream.sync, p) for p in partitions]
+                for future in futures:
+                    future.result()
+        stream.finalize_state_progress_markers()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,410 @@
+"""Performance telemetry: where the time of a sync goes, per stream.
+
+Streams report request latencies, response sizes, retries and throttled
+responses, the time spent decoding pages, records per page, and the time
+spent conforming and emitting records. Measures are logged periodically as
+``METRIC`` lines, like the SDK's own metrics, and can also be exposed in the
+OpenMetrics text format, as a file and on a local HTTP endpoint.
+
+When telemetry is disabled, streams hold no recorder and skip every
+measurement.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from singer_sdk import metrics
+
+from tap_stripe.ratelimit import is_throttled
+
+if t.TYPE_CHECKING:
+    import logging
+
+    import requests
+
+OPENMETRICS_CONTENT_TYPE = (
+    "application/openmetrics-text; version=1.0.0; charset=utf-8"
+)
+
+#: Quantiles reported for distributions.
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Distribution of non-negative values in logarithmic buckets.
+
+    Buckets are about 19% wide, so quantiles are estimated within that
+    precision whatever the range of values, in constant memory.
+    """
+
+    _RATIO = 2**0.25
+    _LOG_RATIO = math.log(_RATIO)
+
+    def __init__(self) -> None:
+        """Create an empty histogram."""
+        self.buckets: dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add a value.
+
+        Args:
+            value: The measured value.
+        """
+        if value > 0:
+            index = math.ceil(math.log(value) / self._LOG_RATIO)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        else:
+            self.zeros += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile.
+
+        Args:
+            q: The quantile, between 0 and 1.
+
+        Returns:
+            The upper bound of the bucket holding the quantile, or 0 when empty.
+        """
+        rank = q * self.count
+        seen = self.zeros
+        if seen >= rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self._RATIO**index, self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """Return the count, sum and quantiles of the values."""
+        summary = {"count": self.count, "sum": round(self.sum, 6)}
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = round(self.quantile(q), 6)
+        return summary
+
+
+class StreamTelemetry:
+    """Measures of one stream, updated from any thread."""
+
+    def __init__(self, stream_name: str) -> None:
+        """Create empty measures.
+
+        Args:
+            stream_name: The stream name.
+        """
+        self.stream_name = stream_name
+        self.request_seconds = Histogram()
+        self.records_per_page = Histogram()
+        self.response_bytes = 0
+        self.throttled = 0
+        self.retries = 0
+        self.decode_seconds = 0.0
+        self.conform_seconds = 0.0
+        self.emit_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def observe_request(self, response: requests.Response, elapsed: float) -> None:
+        """Record a response.
+
+        Args:
+            response: The HTTP response.
+            elapsed: Seconds from sending the request to receiving the headers.
+        """
+        throttled = is_throttled(response)
+        with self._lock:
+            self.request_seconds.observe(elapsed)
+            self.throttled += throttled
+
+    def observe_retry(self) -> None:
+        """Record a request about to be retried."""
+        with self._lock:
+            self.retries += 1
+
+    def observe_page(
+        self,
+        response: requests.Response,
+        records: t.Iterator[dict],
+    ) -> t.Iterator[dict]:
+        """Time the decoding of a page while its records are consumed.
+
+        Only the time spent producing records counts, not the time the
+        consumer spends on them. With streaming parsing, it includes waiting
+        for the body.
+
+        Args:
+            response: The page response.
+            records: The page's records, decoded as they are iterated.
+
+        Yields:
+            Each record of the page.
+        """
+        decode_seconds = 0.0
+        count = 0
+        clock = time.perf_counter
+        while True:
+            started = clock()
+            record = next(records, None)
+            decode_seconds += clock() - started
+            if record is None:
+                break
+            count += 1
+            yield record
+        size = _response_size(response)
+        with self._lock:
+            self.decode_seconds += decode_seconds
+            self.records_per_page.observe(count)
+            self.response_bytes += size
+
+    def observe_record(self, conform_seconds: float, emit_seconds: float) -> None:
+        """Record the time spent writing out one record.
+
+        Args:
+            conform_seconds: Seconds spent conforming the record to the schema.
+            emit_seconds: Seconds spent serializing and writing the message,
+                including waits for other streams and for stdout.
+        """
+        with self._lock:
+            self.conform_seconds += conform_seconds
+            self.emit_seconds += emit_seconds
+
+    def points(self) -> list[dict]:
+        """Return the measures as ``METRIC`` points.
+
+        Returns:
+            Dicts with the ``type``, ``metric``, ``value`` and ``tags`` of each
+            measure.
+        """
+        tags = {metrics.Tag.STREAM.value: self.stream_name}
+        with self._lock:
+            values = [
+                ("histogram", "http_request_latency", self.request_seconds.summary()),
+                ("counter", "http_response_bytes", self.response_bytes),
+                ("counter", "http_request_retries", self.retries),
+                ("counter", "http_throttled_responses", self.throttled),
+                ("timer", "page_decode_duration", round(self.decode_seconds, 6)),
+                ("histogram", "records_per_page", self.records_per_page.summary()),
+                ("timer", "record_conform_duration", round(self.conform_seconds, 6)),
+                ("timer", "record_emit_duration", round(self.emit_seconds, 6)),
+            ]
+        return [
+            {"type": kind, "metric": metric, "value": value, "tags": tags}
+            for kind, metric, value in values
+        ]
+
+    def openmetrics_samples(self) -> dict[str, list[str]]:
+        """Return the measures as OpenMetrics samples, per metric family.
+
+        Returns:
+            Sample lines keyed by metric family name.
+        """
+        label = f'stream="{self.stream_name}"'
+        samples: dict[str, list[str]] = {}
+        with self._lock:
+            for family, histogram in (
+                ("http_request_duration_seconds", self.request_seconds),
+                ("records_per_page", self.records_per_page),
+            ):
+                samples[family] = [
+                    f'tap_stripe_{family}{{{label},quantile="{q}"}} '
+                    f"{histogram.quantile(q):.6g}"
+                    for q in QUANTILES
+                ] + [
+                    f"tap_stripe_{family}_sum{{{label}}} {histogram.sum:.6g}",
+                    f"tap_stripe_{family}_count{{{label}}} {histogram.count}",
+                ]
+            for family, value in (
+                ("http_response_bytes", self.response_bytes),
+                ("http_request_retries", self.retries),
+                ("http_throttled_responses", self.throttled),
+                ("page_decode_seconds", self.decode_seconds),
+                ("record_conform_seconds", self.conform_seconds),
+                ("record_emit_seconds", self.emit_seconds),
+            ):
+                samples[family] = [f"tap_stripe_{family}_total{{{label}}} {value:.6g}"]
+        return samples
+
+
+# Type and unit of each OpenMetrics family.
+_FAMILIES = {
+    "http_request_duration_seconds": ("summary", "seconds"),
+    "records_per_page": ("summary", None),
+    "http_response_bytes": ("counter", "bytes"),
+    "http_request_retries": ("counter", None),
+    "http_throttled_responses": ("counter", None),
+    "page_decode_seconds": ("counter", "seconds"),
+    "record_conform_seconds": ("counter", "seconds"),
+    "record_emit_seconds": ("counter", "seconds"),
+}
+
+
+class Telemetry:
+    """Measures of every stream of a tap, and their periodic reports."""
+
+    def __init__(
+        self,
+        *,
+        interval: float = 60,
+        openmetrics_path: str | None = None,
+        port: int | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        """Create a telemetry registry. Reports start with :meth:`start`.
+
+        Args:
+            interval: Seconds between two reports.
+            openmetrics_path: File rewritten with the measures at each report.
+            port: Port of a local endpoint serving the measures, if any.
+            logger: Where ``METRIC`` lines are logged, the SDK's metrics logger
+                by default.
+        """
+        self.interval = interval
+        self.openmetrics_path = Path(openmetrics_path) if openmetrics_path else None
+        self.port = port
+        self.logger = logger or metrics.get_metrics_logger()
+        self._streams: dict[str, StreamTelemetry] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._reporter: threading.Thread | None = None
+        self._server: ThreadingHTTPServer | None = None
+
+    def stream(self, stream_name: str) -> StreamTelemetry:
+        """Return the measures of a stream.
+
+        Args:
+            stream_name: The stream name.
+
+        Returns:
+            The stream's measures, created on first use.
+        """
+        with self._lock:
+            if stream_name not in self._streams:
+                self._streams[stream_name] = StreamTelemetry(stream_name)
+            return self._streams[stream_name]
+
+    def start(self) -> None:
+        """Start the periodic reports and the local endpoint."""
+        if self._reporter is not None:
+            return
+        self._stopped.clear()
+        if self.port is not None:
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), _handler(self))
+            self._server.daemon_threads = True
+            threading.Thread(
+                target=self._server.serve_forever,
+                name="stripe-telemetry-http",
+                daemon=True,
+            ).start()
+        self._reporter = threading.Thread(
+            target=self._report_periodically,
+            name="stripe-telemetry",
+            daemon=True,
+        )
+        self._reporter.start()
+
+    def stop(self) -> None:
+        """Stop the reports, after a final one, and the local endpoint."""
+        if self._reporter is not None:
+            self._stopped.set()
+            self._reporter.join()
+            self._reporter = None
+        self.report()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def report(self) -> None:
+        """Log the measures of every active stream, and write the file."""
+        for stream in self._active_streams():
+            for point in stream.points():
+                self.logger.info("METRIC: %s", json.dumps(point))
+        if self.openmetrics_path is not None:
+            _write_atomically(self.openmetrics_path, self.openmetrics())
+
+    def openmetrics(self) -> str:
+        """Return the measures in the OpenMetrics text format.
+
+        Returns:
+            The exposition, ending with ``# EOF``.
+        """
+        families: dict[str, list[str]] = {family: [] for family in _FAMILIES}
+        for stream in self._active_streams():
+            for family, samples in stream.openmetrics_samples().items():
+                families[family] += samples
+        lines = []
+        for family, samples in families.items():
+            kind, unit = _FAMILIES[family]
+            lines.append(f"# TYPE tap_stripe_{family} {kind}")
+            if unit:
+                lines.append(f"# UNIT tap_stripe_{family} {unit}")
+            lines += samples
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _active_streams(self) -> list[StreamTelemetry]:
+        with self._lock:
+            streams = list(self._streams.values())
+        return [
+            stream
+            for stream in streams
+            if stream.request_seconds.count or stream.records_per_page.count
+        ]
+
+    def _report_periodically(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.report()
+
+
+def _response_size(response: requests.Response) -> int:
+    # Bytes read from the connection, compressed, when the body was read from
+    # it; the size of the decoded body otherwise, e.g. for async responses.
+    raw = response.raw
+    if raw is not None:
+        try:
+            size = raw.tell()
+        except (AttributeError, OSError):
+            size = 0
+        if size:
+            return size
+    content = response._content  # noqa: SLF001
+    return len(content) if isinstance(content, bytes) else 0
+
+
+def _write_atomically(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        file.write(text)
+    Path(tmp).replace(path)
+
+
+def _handler(telemetry: Telemetry) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            body = telemetry.openmetrics().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: t.Any) -> None:  # noqa: ARG002
+            return
+
+    return Handler
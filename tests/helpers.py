@@ -0,0 +1,79 @@
+"""Shared helpers for tap-stripe tests."""
+
+from __future__ import annotations
+
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from tap_stripe.tap import TapStripe
+
+
+def make_response(body: dict, status_code: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode()
+    response.encoding = "utf-8"
+    return response
+
+
+def make_tap(
+    state: dict | None = None, catalog: dict | None = None, **config
+) -> TapStripe:
+    return TapStripe(
+        config={"api_key": "sk_test_123", "account_id": "acct_123", **config},
+        catalog=catalog,
+        state=state,
+        parse_env_config=False,
+    )
+
+
+def select_streams(*names: str, **config) -> dict:
+    """Return the catalog of a tap, also selecting streams not selected by default."""
+    catalog = make_tap(**config).catalog_dict
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"] and entry["tap_stream_id"] in names:
+                metadata["metadata"]["selected"] = True
+    return json.loads(json.dumps(catalog))
+
+
+class FakeListEndpoint:
+    """Serve ``objects`` like a Stripe list endpoint, newest first.
+
+    Use as the ``side_effect`` of a patched ``StripeStream._request`` or
+    ``requests.Session.send``.
+    """
+
+    def __init__(self, objects: list[dict]) -> None:
+        self.objects = sorted(objects, key=lambda o: o["created"], reverse=True)
+        self.requests: list[dict[str, str]] = []
+        self._lock = threading.Lock()
+
+    def __call__(
+        self, prepared_request: requests.PreparedRequest, *_, **__
+    ) -> requests.Response:
+        query = parse_qs(urlparse(prepared_request.url).query)
+        params = {key: values[0] for key, values in query.items()}
+        with self._lock:
+            self.requests.append(params)
+
+        matches = [
+            o
+            for o in self.objects
+            if o["created"] >= int(params.get("created[gte]", 0))
+            and o["created"] < int(params.get("created[lt]", 2**63))
+        ]
+        if "starting_after" in params:
+            ids = [o["id"] for o in matches]
+            matches = matches[ids.index(params["starting_after"]) + 1 :]
+        limit = int(params.get("limit", 10))
+        return make_response(
+            {
+                "object": "list",
+                "data": matches[:limit],
+                "has_more": len(matches) > limit,
+            }
+        )
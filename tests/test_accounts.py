@@ -0,0 +1,101 @@
+"""Tests for syncing several connected accounts in one tap."""
+
+from __future__ import annotations
+
+import json
+from unittest import mock
+
+import pytest
+
+from tests.helpers import FakeListEndpoint, make_response, make_tap
+
+
+class AccountEndpoints:
+    """Serve different objects for each ``Stripe-Account``."""
+
+    def __init__(self, name: str, accounts: list[str]) -> None:
+        self.endpoints = {
+            account: FakeListEndpoint(
+                [
+                    {"id": f"{name}_{account}_{i}", "created": 1700000000 + i}
+                    for i in range(3)
+                ]
+            )
+            for account in accounts
+        }
+        self.accounts: list[str] = []
+
+    def __call__(self, prepared_request, *args, **kwargs):
+        account = prepared_request.headers["Stripe-Account"]
+        self.accounts.append(account)
+        return self.endpoints[account](prepared_request, *args, **kwargs)
+
+
+def run_sync(tap, accounts: list[str], capsys) -> tuple[list[dict], dict]:
+    patches = [
+        mock.patch.object(
+            stream,
+            "_request",
+            side_effect=AccountEndpoints(name, accounts),
+        )
+        for name, stream in tap.streams.items()
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        tap.sync_all()
+    finally:
+        for patch in patches:
+            patch.stop()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m for m in messages if m["type"] == "RECORD"]
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+    return records, state
+
+
+@pytest.mark.parametrize("max_concurrent_accounts", [1, 3])
+def test_accounts_are_synced_as_partitions(capsys, max_concurrent_accounts):
+    accounts = ["acct_a", "acct_b", "acct_c"]
+    tap = make_tap(account_id=accounts, max_concurrent_accounts=max_concurrent_accounts)
+
+    records, state = run_sync(tap, accounts, capsys)
+
+    customers = [r["record"] for r in records if r["stream"] == "customers"]
+    assert len(customers) == 9
+    assert all(c["id"].startswith(f"customers_{c['account_id']}_") for c in customers)
+    partitions = state["bookmarks"]["customers"]["partitions"]
+    assert sorted(p["context"]["account_id"] for p in partitions) == accounts
+    assert all(p["replication_key_value"] == 1700000002 for p in partitions)
+
+
+def test_single_account_sends_header_without_partitions(capsys):
+    tap = make_tap(account_id="acct_one")
+
+    records, state = run_sync(tap, ["acct_one"], capsys)
+
+    assert {r["record"]["account_id"] for r in records} == {"acct_one"}
+    assert state["bookmarks"]["customers"]["replication_key_value"] == 1700000002
+
+
+def test_accounts_are_discovered():
+    tap = make_tap(discover_accounts=True)
+    pages = iter(
+        [
+            make_response({"data": [{"id": "acct_1"}, {"id": "acct_2"}], "has_more": True}),
+            make_response({"data": [{"id": "acct_3"}], "has_more": False}),
+        ]
+    )
+    with mock.patch.object(
+        tap.requests_session, "send", side_effect=lambda *_, **__: next(pages)
+    ) as send:
+        assert tap.account_ids == ["acct_1", "acct_2", "acct_3"]
+
+    request = send.call_args_list[1].args[0]
+    assert request.path_url == "/v1/accounts?limit=100&starting_after=acct_2"
+    assert "Stripe-Account" not in request.headers
+    assert "connected_accounts" not in tap.state.get("bookmarks", {})
+    assert tap.streams["customers"].partitions == [
+        {"account_id": "acct_1"},
+        {"account_id": "acct_2"},
+        {"account_id": "acct_3"},
+    ]
@@ -0,0 +1,218 @@
+"""Tests for BATCH message output."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from unittest import mock
+from urllib.parse import unquote, urlparse
+
+import pytest
+
+from tap_stripe.batch import BatchWriter, require_batch_dependencies
+from tests.helpers import FakeListEndpoint, make_tap, select_streams
+
+DAY = 24 * 60 * 60
+
+
+def batch_config(tmp_path, **config) -> dict:
+    return {
+        "encoding": {"format": "jsonl", "compression": "gzip"},
+        "storage": {"root": f"file://{tmp_path}"},
+        **config,
+    }
+
+
+def read_batch(url: str) -> list[dict]:
+    with gzip.open(unquote(urlparse(url).path)) as file:
+        return [json.loads(line) for line in file]
+
+
+def run_sync(tap, objects: dict[str, list[dict]], capsys) -> list[dict]:
+    patches = [
+        mock.patch.object(
+            stream, "_request", side_effect=FakeListEndpoint(objects.get(name, []))
+        )
+        for name, stream in tap.streams.items()
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        tap.sync_all()
+    finally:
+        for patch in patches:
+            patch.stop()
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+CUSTOMERS = [
+    {"id": f"cus_{i:02d}", "created": 1700000000 + i, "email": f"{i}@example.com"}
+    for i in range(25)
+]
+
+
+def test_records_are_written_to_bounded_files(tmp_path, capsys):
+    tap = make_tap(batch_config=batch_config(tmp_path, batch_size=10))
+
+    messages = run_sync(tap, {"customers": CUSTOMERS}, capsys)
+
+    assert not [m for m in messages if m["type"] == "RECORD"]
+    batches = [m for m in messages if m["type"] == "BATCH"]
+    assert [len(read_batch(b["manifest"][0])) for b in batches] == [10, 10, 5]
+    records = [r for b in batches for r in read_batch(b["manifest"][0])]
+    assert sorted(r["id"] for r in records) == [c["id"] for c in CUSTOMERS]
+    assert records[0] == {**CUSTOMERS[-1], "account_id": "acct_123"}
+    assert batches[0]["encoding"] == {"format": "jsonl", "compression": "gzip"}
+
+
+@pytest.mark.parametrize("windowed", [False, True])
+def test_state_never_covers_unannounced_records(tmp_path, capsys, windowed):
+    start = int(time.time()) - 7 * DAY
+    config = {"batch_config": batch_config(tmp_path, batch_size=7)}
+    if windowed:
+        config.update(
+            start_date=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start)),
+            backfill_window_days=1,
+        )
+    tap = make_tap(**config)
+    customers = [
+        {**c, "created": start + DAY // 4 * i} for i, c in enumerate(CUSTOMERS)
+    ]
+
+    messages = run_sync(tap, {"customers": customers}, capsys)
+
+    announced: set[int] = set()
+    for message in messages:
+        if message["type"] == "BATCH":
+            announced |= {r["created"] for r in read_batch(message["manifest"][0])}
+        elif message["type"] == "STATE":
+            bookmark = message["value"].get("bookmarks", {}).get("customers", {})
+            value = bookmark.get("replication_key_value")
+            if value is not None:
+                assert {c["created"] for c in customers if c["created"] <= value} <= (
+                    announced
+                )
+    final = messages[-1]["value"]["bookmarks"]["customers"]
+    assert final["replication_key_value"] >= customers[-1]["created"]
+    assert "progress_markers" not in final
+
+
+def test_size_bound(tmp_path, capsys):
+    tap = make_tap(
+        batch_config=batch_config(tmp_path, batch_size=1000),
+        batch_max_bytes=400,
+    )
+
+    messages = run_sync(tap, {"customers": CUSTOMERS}, capsys)
+
+    sizes = [
+        len(read_batch(m["manifest"][0])) for m in messages if m["type"] == "BATCH"
+    ]
+    assert sum(sizes) == 25
+    assert len(sizes) > 1
+
+
+def test_child_files_span_parent_pages(tmp_path, capsys):
+    invoices = [
+        {
+            "id": f"in_{i:03d}",
+            "created": 1700000000 + i,
+            "lines": {
+                "object": "list",
+                "data": [{"id": f"il_{i:03d}", "amount": i}],
+                "has_more": False,
+            },
+        }
+        for i in range(250)
+    ]
+    tap = make_tap(
+        catalog=select_streams("invoice_line_items"),
+        batch_config=batch_config(tmp_path, batch_size=1000),
+    )
+
+    messages = run_sync(tap, {"invoices": invoices}, capsys)
+
+    batches = [
+        (m["stream"], len(read_batch(m["manifest"][0])))
+        for m in messages
+        if m["type"] == "BATCH" and m["stream"].startswith("invoice")
+    ]
+    # One file each, although the 250 invoices came in three pages, and the
+    # line items are announced before the invoices that reference them.
+    assert batches == [("invoice_line_items", 250), ("invoices", 250)]
+
+
+def test_writer_encodes_with_fallback_encoder(tmp_path):
+    config = make_tap(batch_config=batch_config(tmp_path)).streams[
+        "customers"
+    ].get_batch_config(
+        {"batch_config": batch_config(tmp_path, batch_size=2)}
+    )
+    with mock.patch("tap_stripe.batch.orjson", None):
+        writer = BatchWriter(config, tap_name="tap-stripe", stream_name="customers")
+        assert writer.write({"id": "cus_1", "name": "Zoë"}) is None
+        url = writer.write({"id": "cus_2", "name": None})
+
+    assert read_batch(url) == [
+        {"id": "cus_1", "name": "Zoë"},
+        {"id": "cus_2", "name": None},
+    ]
+    assert writer.close() is None
+
+
+def test_parquet_files(tmp_path, capsys):
+    pq = pytest.importorskip("pyarrow.parquet")
+    config = batch_config(tmp_path, batch_size=10)
+    config["encoding"] = {"format": "parquet", "compression": "gzip"}
+    tap = make_tap(batch_config=config)
+
+    messages = run_sync(tap, {"customers": CUSTOMERS}, capsys)
+
+    urls = [m["manifest"][0] for m in messages if m["type"] == "BATCH"]
+    rows = [
+        row
+        for url in urls
+        for row in pq.read_table(unquote(urlparse(url).path)).to_pylist()
+    ]
+    assert sorted(row["id"] for row in rows) == [c["id"] for c in CUSTOMERS]
+
+
+def test_missing_extras_are_reported(tmp_path):
+    stream = make_tap().streams["customers"]
+    try:
+        import fs_s3fs  # noqa: F401
+    except ImportError:
+        config = stream.get_batch_config(
+            {"batch_config": {**batch_config(tmp_path), "storage": {"root": "s3://b"}}}
+        )
+        with pytest.raises(ImportError, match=r"\[s3\]"):
+            require_batch_dependencies(config)
+
+
+@pytest.mark.parametrize("windowed", [False, True])
+def test_next_sync_resumes_after_the_last_file(tmp_path, capsys, windowed):
+    start = int(time.time()) - 7 * DAY
+    # The index skips the newest customer, read again from an inclusive bookmark.
+    config = {
+        "batch_config": batch_config(tmp_path, batch_size=60),
+        "dedup_index_path": str(tmp_path / "dedup.sqlite"),
+    }
+    if windowed:
+        config.update(
+            start_date=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start)),
+            backfill_window_days=1,
+        )
+    # Several pages of 100 objects.
+    customers = [
+        {"id": f"cus_{i:03d}", "created": start + 2000 * i} for i in range(250)
+    ]
+
+    first = run_sync(make_tap(**config), {"customers": customers}, capsys)
+    state = [m for m in first if m["type"] == "STATE"][-1]["value"]
+    second = run_sync(make_tap(state=state, **config), {"customers": customers}, capsys)
+
+    bookmark = state["bookmarks"]["customers"]
+    assert bookmark["replication_key_value"] >= customers[-1]["created"]
+    assert "progress_markers" not in bookmark
+    assert not [m for m in second if m["type"] == "BATCH"]
@@ -0,0 +1,75 @@
+"""Tests for recording and replaying API responses."""
+
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from benchmarks.fake_stripe import FakeStripeServer, make_objects
+from tap_stripe.cassette import CassetteMissError
+from tests.helpers import make_tap
+
+DAY = 24 * 60 * 60
+START = int(time.time()) - 10 * DAY
+START_DATE = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(START))
+
+
+def sync_ids(**config) -> list[str]:
+    tap = make_tap(start_date=START_DATE, max_requests_per_second=10_000, **config)
+    stream = tap.streams["customers"]
+    stream._write_starting_replication_value(None)
+    try:
+        return [record["id"] for record in stream.request_records(None)]
+    finally:
+        tap.requests_session.close()
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    objects = {"/v1/customers": make_objects("cus", 250, start=START)}
+    with FakeStripeServer(objects) as server:
+        recorded = sync_ids(
+            api_url=server.url, cassette_path=str(path), cassette_mode="record"
+        )
+    return path, recorded
+
+
+@pytest.mark.parametrize("streaming_parse", [False, True])
+def test_replay_matches_recording(cassette, streaming_parse):
+    if streaming_parse:
+        pytest.importorskip("ijson")
+    path, recorded = cassette
+
+    # The server is gone: every response comes from the cassette.
+    replayed = sync_ids(
+        api_url="http://127.0.0.1:9/v1",
+        cassette_path=str(path),
+        streaming_parse=streaming_parse,
+    )
+
+    assert len(recorded) == 250
+    assert replayed == recorded
+
+
+def test_cassette_holds_no_credentials(cassette):
+    path, _ = cassette
+    interactions = [json.loads(line) for line in path.read_text().splitlines()]
+
+    assert len(interactions) == 3
+    assert all(i["key"].endswith("acct_123") for i in interactions)
+    assert "sk_test_123" not in path.read_text()
+    assert all("Content-Encoding" not in i["headers"] for i in interactions)
+
+
+def test_unrecorded_request_fails(cassette):
+    path, _ = cassette
+
+    with pytest.raises(CassetteMissError, match="/v1/customers"):
+        sync_ids(
+            api_url="http://127.0.0.1:9/v1",
+            cassette_path=str(path),
+            account_id="acct_other",
+        )
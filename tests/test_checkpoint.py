@@ -0,0 +1,130 @@
+"""Tests for resuming interrupted syncs from page checkpoints."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import time
+from unittest import mock
+
+import pytest
+
+from tests.helpers import FakeListEndpoint, make_tap
+
+DAY = 24 * 60 * 60
+START = int(time.time()) - 7 * DAY
+START_DATE = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(START))
+
+
+class Interrupted(Exception):
+    """Stands for the tap process being killed."""
+
+
+def make_customers(step: int) -> list[dict]:
+    # Groups of 7 customers share a `created` second, so the last second of a
+    # page continues on the next one.
+    return [
+        {"id": f"cus_{i:04d}", "created": START + i // 7 * step} for i in range(450)
+    ]
+
+
+@contextlib.contextmanager
+def patch_requests(tap, customers_request):
+    with contextlib.ExitStack() as stack:
+        for name, stream in tap.streams.items():
+            side_effect = (
+                customers_request if name == "customers" else FakeListEndpoint([])
+            )
+            stack.enter_context(
+                mock.patch.object(stream, "_request", side_effect=side_effect)
+            )
+        yield
+
+
+def run_sync(tap, endpoint, capsys, *, fail_at_request: int | None = None):
+    calls = 0
+
+    def request(prepared_request, *args):
+        nonlocal calls
+        calls += 1
+        if calls == fail_at_request:
+            raise Interrupted
+        return endpoint(prepared_request, *args)
+
+    with patch_requests(tap, request):
+        try:
+            tap.sync_all()
+        except Interrupted:
+            pass
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m["record"]["id"] for m in messages if m["type"] == "RECORD"]
+    states = [m["value"] for m in messages if m["type"] == "STATE"]
+    return records, states[-1]
+
+
+@pytest.mark.parametrize("windowed", [False, True])
+def test_interrupted_sync_resumes_from_checkpoint(capsys, windowed):
+    config = {"start_date": START_DATE, "checkpoint_interval_pages": 1}
+    if windowed:
+        config.update(backfill_window_days=1, backfill_max_workers=1)
+    customers = make_customers(DAY // 20 if windowed else 60)
+    endpoint = FakeListEndpoint(customers)
+
+    first, state = run_sync(make_tap(**config), endpoint, capsys, fail_at_request=4)
+    checkpoint = state["bookmarks"]["customers"]["checkpoint"]
+    endpoint.requests.clear()
+    second, final_state = run_sync(make_tap(state=state, **config), endpoint, capsys)
+
+    assert 0 < len(first) < len(customers)
+    assert checkpoint["last_ids"]
+    # Resumed at the checkpoint: the first request stops at its last second,
+    # and the customers of that second emitted before are skipped.
+    assert int(endpoint.requests[0]["created[lt]"]) == checkpoint["last_created"] + 1
+    assert not set(first) & set(second)
+    assert sorted(first + second) == sorted(c["id"] for c in customers)
+    bookmark = final_state["bookmarks"]["customers"]
+    assert "checkpoint" not in bookmark
+    assert bookmark["replication_key_value"] >= customers[-1]["created"]
+
+
+def test_checkpoints_are_saved_every_n_pages(capsys):
+    endpoint = FakeListEndpoint(make_customers(60))
+    tap = make_tap(start_date=START_DATE, checkpoint_interval_pages=2)
+
+    with patch_requests(tap, endpoint):
+        tap.sync_all()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    checkpoints = [
+        m["value"]["bookmarks"]["customers"].get("checkpoint")
+        for m in messages
+        if m["type"] == "STATE" and "customers" in m["value"].get("bookmarks", {})
+    ]
+
+    assert [c["pages"] for c in checkpoints if c] == [2, 4]
+    assert checkpoints[-1] is None
+
+
+def test_mismatched_checkpoint_is_ignored(capsys):
+    customers = make_customers(60)
+    endpoint = FakeListEndpoint(customers)
+    state = {
+        "bookmarks": {
+            "customers": {
+                "checkpoint": {
+                    "created_gte": START - DAY,
+                    "created_lt": None,
+                    "last_created": START + 60,
+                    "last_ids": ["cus_0007"],
+                    "max_created": START + 3600,
+                    "pages": 3,
+                }
+            }
+        }
+    }
+
+    records, _ = run_sync(
+        make_tap(state=state, start_date=START_DATE), endpoint, capsys
+    )
+
+    assert len(records) == len(customers)
+    assert "created[lt]" not in endpoint.requests[0]
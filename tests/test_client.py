@@ -0,0 +1,101 @@
+"""Tests for the StripeStream base class and its helpers."""
+
+from __future__ import annotations
+
+import itertools
+from unittest import mock
+
+import pytest
+
+from tap_stripe.client import StripePaginator, get_page, to_epoch
+from tests.helpers import make_response, make_tap
+
+
+def test_page_is_decoded_once():
+    response = make_response(
+        {"object": "list", "data": [{"id": "cus_1"}, {"id": "cus_2"}], "has_more": True}
+    )
+    paginator = StripePaginator(start_value=0, page_size=100)
+
+    with mock.patch.object(response, "json", wraps=response.json) as decode:
+        assert paginator.has_more(response) is True
+        assert paginator.get_next(response) == "cus_2"
+        assert [r["id"] for r in get_page(response)["data"]] == ["cus_1", "cus_2"]
+
+    assert decode.call_count == 1
+
+
+def make_state(stream: str, value) -> dict:
+    return {
+        "bookmarks": {
+            stream: {"replication_key": "created", "replication_key_value": value}
+        }
+    }
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (1700000000, 1700000000),
+        ("1700000000", 1700000000),
+        ("2023-11-14T22:13:20Z", 1700000000),
+        ("2023-11-14T22:13:20+00:00", 1700000000),
+        ("2023-11-14T23:13:20+01:00", 1700000000),
+        ("2023-11-14T22:13:20", 1700000000),
+        ("2023-11-14", 1699920000),
+        (None, None),
+        ("", None),
+        ("  ", None),
+    ],
+)
+def test_to_epoch(value, expected):
+    assert to_epoch(value) == expected
+
+
+@pytest.mark.parametrize(
+    ("state", "config", "expected"),
+    [
+        (None, {}, None),
+        (None, {"start_date": "2023-11-14T22:13:20Z"}, 1700000000),
+        (make_state("customers", 1700000500), {}, 1700000500),
+        (make_state("customers", "2023-11-14T22:13:20Z"), {}, 1700000000),
+        (
+            make_state("customers", 1600000000),
+            {"start_date": "2023-11-14T22:13:20Z"},
+            1700000000,
+        ),
+        (
+            make_state("customers", 1700000500),
+            {"start_date": "2023-11-14T22:13:20Z"},
+            1700000500,
+        ),
+    ],
+)
+def test_created_lower_bound(state, config, expected):
+    stream = make_tap(state, **config).streams["customers"]
+    stream._write_starting_replication_value(None)
+
+    params = stream.get_url_params(None, None)
+
+    assert params.get("created[gte]") == expected
+
+
+def test_bookmark_advances_per_page():
+    pages = [
+        {"data": [{"id": "cus_3", "created": 30}, {"id": "cus_2", "created": 20}],
+         "has_more": True},
+        {"data": [{"id": "cus_1", "created": 10}], "has_more": False},
+    ]
+    stream = make_tap().streams["customers"]
+    responses = iter(make_response(page) for page in pages)
+
+    with mock.patch.object(stream, "_request", side_effect=lambda *_: next(responses)):
+        records = stream.request_records(None)
+        for record in itertools.islice(records, 2):
+            stream._increment_stream_state(record)
+            assert "progress_markers" not in stream.stream_state
+
+        for record in records:
+            stream._increment_stream_state(record)
+
+    assert stream.stream_state["progress_markers"]["replication_key_value"] == 30
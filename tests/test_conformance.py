@@ -0,0 +1,125 @@
+"""Tests for record conformance compiled from stream schemas."""
+
+from __future__ import annotations
+
+import copy
+import logging
+from unittest import mock
+
+import pytest
+from singer_sdk.helpers._typing import TypeConformanceLevel, conform_record_data_types
+
+from benchmarks.fake_stripe import make_record
+from tap_stripe import conformance
+from tap_stripe.conformance import SchemaConformer
+from tests.helpers import make_tap
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "string"},
+        "paid": {"type": ["boolean", "null"]},
+        "metadata": {"type": "object", "properties": {}, "additionalProperties": True},
+        "transitions": {
+            "type": ["object", "null"],
+            "properties": {
+                "paid_at": {"type": "integer"},
+                "voided": {"type": "boolean"},
+            },
+        },
+        "lines": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string"},
+                    "proration": {"type": "boolean"},
+                },
+            },
+        },
+        "flags": {"type": "array", "items": {"type": "boolean"}},
+    },
+}
+
+RECORD = {
+    "id": "in_1",
+    "paid": 1,
+    "metadata": {"anything": "goes"},
+    "transitions": {"paid_at": 1700000000, "voided": 0, "unknown": "x"},
+    "lines": [{"id": "il_1", "proration": 0, "unknown": 1}, "il_2"],
+    "flags": [1, 0, None, True],
+    "unknown": {"nested": True},
+}
+
+
+def sdk_conform(record: dict, schema: dict, level: TypeConformanceLevel) -> dict:
+    return conform_record_data_types(
+        "stream", copy.deepcopy(record), schema, level, logging.getLogger("sdk")
+    )
+
+
+@pytest.mark.parametrize(
+    "level", [TypeConformanceLevel.RECURSIVE, TypeConformanceLevel.ROOT_ONLY]
+)
+def test_matches_sdk_conformance(level):
+    conformer = SchemaConformer(
+        SCHEMA, stream_name="stream", logger=logging.getLogger("test"), level=level
+    )
+
+    assert conformer(copy.deepcopy(RECORD)) == sdk_conform(RECORD, SCHEMA, level)
+
+
+def test_matches_sdk_conformance_for_stream_schemas():
+    tap = make_tap()
+    for stream in tap.streams.values():
+        record = make_record(stream.schema, 3)
+        record["unexpected"] = 1
+        conformer = SchemaConformer(
+            stream.schema, stream_name=stream.name, logger=stream.logger
+        )
+
+        expected = sdk_conform(record, stream.schema, TypeConformanceLevel.RECURSIVE)
+        assert conformer(copy.deepcopy(record)) == expected, stream.name
+
+
+def test_unmapped_properties_are_reported_once():
+    logger = mock.Mock()
+    conformer = SchemaConformer(SCHEMA, stream_name="invoices", logger=logger)
+
+    conformer(copy.deepcopy(RECORD))
+    conformer(copy.deepcopy(RECORD))
+
+    assert [call.args[1] for call in logger.warning.call_args_list] == [
+        ("unknown",),
+        ("transitions.unknown",),
+        ("lines.unknown",),
+    ]
+
+
+def test_untyped_properties_are_left_as_they_are():
+    schema = {"type": "object", "properties": {"anything": {}}}
+    conformer = SchemaConformer(schema, stream_name="a", logger=logging.getLogger())
+
+    assert conformer({"anything": [1, {"a": 0}]}) == {"anything": [1, {"a": 0}]}
+
+
+def test_compiled_code_is_shared_by_identical_schemas(monkeypatch):
+    monkeypatch.setattr(conformance, "_code_cache", {})
+    logger = logging.getLogger("test")
+    first = SchemaConformer(SCHEMA, stream_name="a", logger=logger)
+
+    with mock.patch.object(conformance._Compiler, "compile") as compile_schema:
+        second = SchemaConformer(copy.deepcopy(SCHEMA), stream_name="b", logger=logger)
+
+    compile_schema.assert_not_called()
+    assert second(copy.deepcopy(RECORD)) == first(copy.deepcopy(RECORD))
+
+
+def test_schema_changes_change_the_key():
+    other = copy.deepcopy(SCHEMA)
+    other["properties"]["total"] = {"type": "integer"}
+    level = TypeConformanceLevel.RECURSIVE
+
+    assert conformance.schema_hash(SCHEMA, level) != conformance.schema_hash(
+        other, level
+    )
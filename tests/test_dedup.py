@@ -0,0 +1,99 @@
+"""Tests for dropping records identical to the last version emitted."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import sqlite3
+from unittest import mock
+
+from tap_stripe.dedup import DedupIndex, compact, main
+from tests.helpers import FakeListEndpoint, make_tap
+
+
+def make_customers() -> list[dict]:
+    return [
+        {"id": f"cus_{i:04d}", "created": 1700000000 + i, "name": f"name {i}"}
+        for i in range(250)
+    ]
+
+
+def run_sync(customers, capsys, **config) -> list[str]:
+    tap = make_tap(**config)
+    with contextlib.ExitStack() as stack:
+        for name, stream in tap.streams.items():
+            endpoint = FakeListEndpoint(customers if name == "customers" else [])
+            stack.enter_context(
+                mock.patch.object(stream, "_request", side_effect=endpoint)
+            )
+        tap.sync_all()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return [m["record"]["id"] for m in messages if m["type"] == "RECORD"]
+
+
+def test_unchanged_records_are_not_emitted_again(tmp_path, capsys):
+    path = str(tmp_path / "index.sqlite")
+    customers = make_customers()
+
+    first = run_sync(customers, capsys, dedup_index_path=path)
+    second = run_sync(customers, capsys, dedup_index_path=path)
+    customers[10] = {**customers[10], "name": "renamed"}
+    third = run_sync(customers, capsys, dedup_index_path=path)
+
+    assert len(first) == 250
+    assert second == []
+    assert third == ["cus_0010"]
+
+
+def test_index_only_saves_committed_records(tmp_path):
+    path = tmp_path / "index.sqlite"
+    record = {"id": "cus_1", "name": "a"}
+    index = DedupIndex(path)
+
+    assert index.observe("customers", record)
+    # Staged, e.g. a duplicate within a page.
+    assert not index.observe("customers", record)
+    entries = index.take_staged()
+    index.close()
+
+    # Not saved: a new sync emits the record again.
+    index = DedupIndex(path)
+    assert index.observe("customers", record)
+    index.take_staged()
+    index.save(entries)
+    assert not index.observe("customers", dict(reversed(record.items())))
+    assert index.observe("customers", {**record, "name": "b"})
+    assert index.observe("products", record)
+    index.close()
+
+
+def test_compact_drops_old_entries(tmp_path, capsys):
+    path = tmp_path / "index.sqlite"
+    index = DedupIndex(path)
+    for i in range(100):
+        index.observe("customers", {"id": f"cus_{i}"})
+        index.observe("products", {"id": f"prod_{i}"})
+    index.save(index.take_staged())
+    index.close()
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE objects SET day = day - 60 WHERE key % 2 = 0")
+    connection.close()
+
+    removed, kept = compact(path, max_age_days=30)
+    assert removed + kept == 200
+    assert 0 < removed < 200
+
+    with sqlite3.connect(path) as connection:
+        (products,) = connection.execute(
+            "SELECT COUNT(*) FROM objects JOIN streams ON stream = streams.id "
+            "WHERE name = 'products'"
+        ).fetchone()
+    connection.close()
+    main(["compact", str(path), "--stream", "products"])
+
+    assert capsys.readouterr().out.startswith(
+        f"Dropped {products} entries, kept {kept - products};"
+    )
+    index = DedupIndex(path)
+    assert index.observe("products", {"id": "prod_1"})
+    index.close()
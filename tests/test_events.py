@@ -0,0 +1,104 @@
+"""Tests for events-driven incremental sync."""
+
+from __future__ import annotations
+
+import time
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from tests.helpers import FakeListEndpoint, make_tap
+
+
+def make_event(number: int, event_type: str, obj: dict, created: int) -> dict:
+    return {
+        "id": f"evt_{number:03d}",
+        "object": "event",
+        "type": event_type,
+        "created": created,
+        "data": {"object": obj},
+    }
+
+
+class Router:
+    """Dispatch requests to a fake endpoint per API path."""
+
+    def __init__(self, **endpoints: FakeListEndpoint) -> None:
+        self.endpoints = endpoints
+        self.urls: list[str] = []
+
+    def __call__(self, prepared_request, *args, **kwargs):
+        self.urls.append(prepared_request.url)
+        path = urlparse(prepared_request.url).path.rsplit("/", 1)[-1]
+        return self.endpoints[path](prepared_request, *args, **kwargs)
+
+
+def sync(stream, router: Router) -> list[dict]:
+    stream._write_starting_replication_value(None)
+    with mock.patch.object(stream, "_request", side_effect=router):
+        return list(stream.request_records(None))
+
+
+def test_first_sync_takes_snapshot_and_starts_events_cursor():
+    customers = [{"id": f"cus_{i}", "created": 1700000000 + i} for i in range(3)]
+    router = Router(customers=FakeListEndpoint(customers), events=FakeListEndpoint([]))
+    stream = make_tap(events_incremental_sync=True).streams["customers"]
+
+    before = int(time.time())
+    records = sync(stream, router)
+
+    assert sorted(r["id"] for r in records) == ["cus_0", "cus_1", "cus_2"]
+    assert not router.endpoints["events"].requests
+    cursor = stream.stream_state["events_cursor"]
+    assert before <= cursor["created"] <= time.time()
+    assert "events_snapshot_started" not in stream.stream_state
+
+
+def test_events_sync_emits_latest_state_per_object():
+    now = int(time.time())
+    old = {"id": "cus_1", "created": 1600000000, "email": "old@example.com"}
+    new = {**old, "email": "new@example.com"}
+    other = {"id": "cus_2", "created": 1600000100, "email": "other@example.com"}
+    events = [
+        make_event(1, "customer.updated", old, now - 30),
+        make_event(2, "customer.updated", other, now - 20),
+        make_event(3, "customer.updated", new, now - 10),
+    ]
+    router = Router(
+        customers=FakeListEndpoint([old, other]),
+        events=FakeListEndpoint(events),
+    )
+    state = {"bookmarks": {"customers": {"events_cursor": {"created": now - 60}}}}
+    stream = make_tap(state, events_incremental_sync=True).streams["customers"]
+
+    records = sync(stream, router)
+
+    assert records == [new, other]
+    assert not router.endpoints["customers"].requests
+    query = parse_qs(urlparse(router.urls[0]).query)
+    assert query["types[]"] == list(stream.event_types)
+    assert query["created[gte]"] == [str(now - 60)]
+    assert stream.stream_state["events_cursor"] == {
+        "created": now - 10,
+        "id": "evt_003",
+    }
+
+
+def test_expired_events_cursor_takes_new_snapshot():
+    customers = [{"id": f"cus_{i}", "created": 1700000000 + i} for i in range(3)]
+    router = Router(customers=FakeListEndpoint(customers), events=FakeListEndpoint([]))
+    state = {
+        "bookmarks": {
+            "customers": {
+                "replication_key": "created",
+                "replication_key_value": 1700000002,
+                "events_cursor": {"created": 1700000000, "id": "evt_1"},
+            }
+        }
+    }
+    stream = make_tap(state, events_incremental_sync=True).streams["customers"]
+
+    records = sync(stream, router)
+
+    assert len(records) == 3
+    assert "created[gte]" not in router.endpoints["customers"].requests[0]
+    assert stream.stream_state["events_cursor"]["created"] > 1700000000
@@ -0,0 +1,58 @@
+"""Tests for server-side expansion of related objects."""
+
+from __future__ import annotations
+
+import json
+from unittest import mock
+
+from tests.helpers import FakeListEndpoint, make_tap, select_streams
+
+
+def test_expand_adds_params_and_widens_schema():
+    tap = make_tap(expand={"invoices": ["customer", "charge", "lines"]})
+    stream = tap.streams["invoices"]
+
+    params = stream.get_url_params(None, None)
+
+    assert params["expand[]"] == ["data.customer", "data.charge"]
+    customer = stream.schema["properties"]["customer"]
+    assert {"type": "object", "additionalProperties": True} in customer["anyOf"]
+    assert "anyOf" not in stream.schema["properties"]["subscription"]
+    assert "expand[]" not in tap.streams["customers"].get_url_params(None, None)
+
+
+def test_expanded_objects_flatten_into_child_streams(capsys):
+    customers = [{"id": "cus_1", "object": "customer"}, {"id": "cus_2", "object": "customer"}]
+    invoices = [
+        {"id": f"in_{i}", "created": 1700000000 + i, "customer": customers[i % 2]}
+        for i in range(4)
+    ]
+    config = {"expand": {"invoices": ["customer"]}, "expand_child_streams": True}
+    tap = make_tap(catalog=select_streams("invoice_customers", **config), **config)
+    patches = [
+        mock.patch.object(
+            stream,
+            "_request",
+            side_effect=FakeListEndpoint(invoices if name == "invoices" else []),
+        )
+        for name, stream in tap.streams.items()
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        tap.sync_all()
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m for m in messages if m["type"] == "RECORD"]
+    assert sorted(
+        r["record"]["id"] for r in records if r["stream"] == "invoice_customers"
+    ) == ["cus_1", "cus_2"]
+    assert sorted(
+        (r["record"]["id"], r["record"]["customer"])
+        for r in records
+        if r["stream"] == "invoices"
+    ) == [("in_0", "cus_1"), ("in_1", "cus_2"), ("in_2", "cus_1"), ("in_3", "cus_2")]
+    assert "anyOf" not in tap.streams["invoices"].schema["properties"]["customer"]
@@ -0,0 +1,75 @@
+"""Tests for the fake Stripe server used by the benchmarks."""
+
+from __future__ import annotations
+
+import time
+
+import requests
+
+from benchmarks.fake_stripe import FakeStripeServer, make_dataset
+
+COUNTS = {
+    "customers": 30,
+    "subscriptions": 20,
+    "products": 10,
+    "invoices": 20,
+    "balance_transactions": 10,
+    "events": 40,
+}
+
+
+def test_dataset_is_deterministic():
+    dataset = make_dataset(COUNTS)
+
+    assert dataset == make_dataset(COUNTS)
+    assert {path: len(objects) for path, objects in dataset.items()} == {
+        f"/v1/{name}": count for name, count in COUNTS.items()
+    }
+    invoice = dataset["/v1/invoices"][0]
+    assert invoice["id"] == "in_0000000019"
+    assert invoice["lines"]["has_more"] is False
+    assert {line["invoice"] for line in invoice["lines"]["data"]} == {invoice["id"]}
+
+
+def test_pages_follow_starting_after():
+    with FakeStripeServer(make_dataset(COUNTS)) as server:
+        ids, params = [], {"limit": 7}
+        while True:
+            page = requests.get(f"{server.url}/customers", params=params).json()
+            ids += [obj["id"] for obj in page["data"]]
+            if not page["has_more"]:
+                break
+            params["starting_after"] = ids[-1]
+
+    assert ids == [f"cus_{idx:010d}" for idx in range(29, -1, -1)]
+
+
+def test_events_filtered_by_type():
+    with FakeStripeServer(make_dataset(COUNTS)) as server:
+        url = f"{server.url}/events"
+        every = requests.get(url, params={"limit": 100, "type": "*"}).json()
+        invoices = requests.get(
+            url, params={"limit": 100, "types[]": ["invoice.updated"]}
+        ).json()
+
+    assert len(every["data"]) == 40
+    assert len(invoices["data"]) == 10
+    assert {e["data"]["object"]["object"] for e in invoices["data"]} == {"invoice"}
+
+
+def test_latency_and_rate_limit():
+    with FakeStripeServer(
+        make_dataset(COUNTS), latency=0.05, rate_limit_every=3
+    ) as server:
+        started = time.perf_counter()
+        statuses = [
+            requests.get(f"{server.url}/products").status_code for _ in range(6)
+        ]
+        elapsed = time.perf_counter() - started
+        throttled = requests.get(f"{server.url}/products")
+
+    assert statuses == [200, 200, 429, 200, 200, 429]
+    assert elapsed >= 0.3
+    assert throttled.status_code == 200
+    assert server.requests == 7
+    assert server.throttled == 2
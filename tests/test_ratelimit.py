@@ -0,0 +1,98 @@
+"""Tests for the request scheduler."""
+
+from __future__ import annotations
+
+import time
+from unittest import mock
+
+import pytest
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+
+from tap_stripe.ratelimit import (
+    LIVE_MODE_RATE,
+    TEST_MODE_RATE,
+    RequestScheduler,
+    TokenBucket,
+)
+from tests.helpers import FakeListEndpoint, make_response, make_tap
+
+
+def throttled_response(retry_after: str | None = None, code: str = "rate_limit"):
+    response = make_response({"error": {"code": code}}, status_code=429)
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return response
+
+
+def test_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.perf_counter()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.perf_counter() - start >= 0.18
+
+
+def test_scheduler_sized_by_mode():
+    assert RequestScheduler.for_api_key("sk_live_abc").max_rate == LIVE_MODE_RATE
+    assert RequestScheduler.for_api_key("rk_live_abc").max_rate == LIVE_MODE_RATE
+    assert RequestScheduler.for_api_key("sk_test_abc").max_rate == TEST_MODE_RATE
+    assert RequestScheduler.for_api_key("sk_live_abc", 7).max_rate == 7
+
+
+def test_scheduler_backs_off_and_recovers():
+    scheduler = RequestScheduler(20, recovery_steps=4)
+
+    scheduler.record_response(throttled_response(code="lock_timeout"), 0.1)
+    assert scheduler.rate == 10
+    assert scheduler.stats["throttled_responses"] == 1
+
+    for _ in range(4):
+        scheduler.record_response(make_response({}), 0.1)
+    assert scheduler.rate == 20
+    assert scheduler.stats["request_seconds"] == pytest.approx(0.5)
+
+
+def test_scheduler_honours_retry_after():
+    scheduler = RequestScheduler(1000)
+    scheduler.record_response(throttled_response(retry_after="0.2"), 0.01)
+
+    start = time.perf_counter()
+    scheduler.acquire()
+
+    assert time.perf_counter() - start >= 0.19
+    assert scheduler.stats["throttled_seconds"] >= 0.19
+
+
+@pytest.mark.parametrize(
+    ("status", "header", "error"),
+    [
+        (429, None, RetriableAPIError),
+        (409, "true", RetriableAPIError),
+        (400, None, FatalAPIError),
+        (500, "false", FatalAPIError),
+        (503, None, RetriableAPIError),
+    ],
+)
+def test_validate_response_follows_stripe_hints(status, header, error):
+    stream = make_tap().streams["customers"]
+    response = make_response({"error": {"code": "x"}}, status_code=status)
+    response.url = "https://api.stripe.com/v1/customers"
+    if header is not None:
+        response.headers["Stripe-Should-Retry"] = header
+
+    with pytest.raises(error):
+        stream.validate_response(response)
+
+
+def test_streams_share_scheduler():
+    tap = make_tap(max_requests_per_second=500)
+    customers, products = tap.streams["customers"], tap.streams["products"]
+    assert customers.scheduler is products.scheduler
+
+    endpoint = FakeListEndpoint([{"id": "cus_1", "created": 1}])
+    with mock.patch.object(
+        customers.requests_session, "send", side_effect=endpoint
+    ):
+        list(customers.request_records(None))
+
+    assert tap.request_scheduler.stats["requests"] == 1
@@ -0,0 +1,173 @@
+"""Tests for reading stream history from Stripe report runs."""
+
+from __future__ import annotations
+
+import json
+import time
+from unittest import mock
+
+import pytest
+
+from benchmarks.fake_stripe import FakeStripeServer, make_dataset
+from tap_stripe.reporting import parse_report_time, to_minor_units
+from tests.helpers import make_tap, select_streams
+
+HOUR = 60 * 60
+START = int(time.time()) // HOUR * HOUR - 150 * 24 * HOUR
+START_DATE = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(START))
+COUNT = 2500
+# Reporting data ends before the newest 500 balance transactions.
+REPORT_END = START + 2000 * HOUR
+REPORT_FIELDS = (
+    "amount",
+    "available_on",
+    "created",
+    "currency",
+    "description",
+    "fee",
+    "net",
+    "reporting_category",
+    "source",
+)
+
+
+class Interrupted(Exception):
+    """Stands for the tap process being killed."""
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    counts = dict.fromkeys(
+        ("customers", "subscriptions", "products", "invoices", "events"), 0
+    )
+    return make_dataset({**counts, "balance_transactions": COUNT}, start=START)
+
+
+def run_sync(server, capsys, *, state=None, fail_after=None, **config):
+    config = {
+        "api_url": server.url,
+        "start_date": START_DATE,
+        "max_requests_per_second": 10_000,
+        "report_streams": ["balance_transactions"],
+        "report_poll_seconds": 0,
+        **config,
+    }
+    catalog = select_streams("balance_transactions", **config)
+    tap = make_tap(state=state, catalog=catalog, **config)
+    stream = tap.streams["balance_transactions"]
+    write_record_message = stream._write_record_message
+    written = 0
+
+    def write_record(record):
+        nonlocal written
+        if written == fail_after:
+            raise Interrupted
+        written += 1
+        write_record_message(record)
+
+    with mock.patch.object(stream, "_write_record_message", side_effect=write_record):
+        try:
+            stream.sync()
+        except Interrupted:
+            pass
+    tap.requests_session.close()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m["record"] for m in messages if m["type"] == "RECORD"]
+    states = [m["value"] for m in messages if m["type"] == "STATE"]
+    return records, states[-1]
+
+
+@pytest.mark.parametrize(
+    ("amount", "currency", "expected"),
+    [
+        ("12.34", "usd", 1234),
+        ("-0.50", "EUR", -50),
+        ("1234", "jpy", 1234),
+        ("1.234", "kwd", 1234),
+        ("", "usd", None),
+    ],
+)
+def test_amounts_are_converted_to_minor_units(amount, currency, expected):
+    assert to_minor_units(amount, currency) == expected
+
+
+def test_report_times_are_utc():
+    assert parse_report_time("2024-01-02 03:04:05") == 1704164645
+    assert parse_report_time("") is None
+
+
+def test_history_is_read_from_report_then_list(dataset, capsys):
+    objects = {obj["id"]: obj for obj in dataset["/v1/balance_transactions"]}
+
+    with FakeStripeServer(dataset, report_data_end=REPORT_END) as server:
+        records, state = run_sync(server, capsys)
+
+    (run,) = server.report_runs.values()
+    assert run["parameters"]["interval_start"] == START
+    assert run["parameters"]["interval_end"] == REPORT_END
+    # Every object once: reported ones, then the newer ones from the list.
+    assert sorted(r["id"] for r in records) == sorted(objects)
+    reported = [r for r in records if r["created"] < REPORT_END]
+    assert [r["id"] for r in reported] == [r["id"] for r in records[:2000]]
+    for record in reported:
+        obj = objects[record["id"]]
+        assert {f: record[f] for f in REPORT_FIELDS} == {
+            f: obj[f] for f in REPORT_FIELDS
+        }
+    bookmark = state["bookmarks"]["balance_transactions"]
+    assert bookmark["replication_key_value"] == max(r["created"] for r in records)
+    assert "report_run" not in bookmark
+
+
+def test_objects_at_the_report_boundary_are_read_once(dataset, capsys):
+    # Report runs exclude their interval end; the list endpoint includes its start.
+    transactions = [dict(obj) for obj in dataset["/v1/balance_transactions"]]
+    for txn in transactions:
+        if txn["created"] == REPORT_END - HOUR:
+            txn["created"] = REPORT_END - 1
+
+    with FakeStripeServer(
+        {**dataset, "/v1/balance_transactions": transactions},
+        report_data_end=REPORT_END,
+    ) as server:
+        records, _ = run_sync(server, capsys)
+
+    ids = [r["id"] for r in records]
+    assert len(ids) == len(set(ids)) == COUNT
+
+
+def test_interrupted_report_resumes_after_saved_rows(dataset, capsys):
+    config = {"checkpoint_interval_pages": 1}
+
+    with FakeStripeServer(dataset, report_data_end=REPORT_END) as server:
+        first, state = run_sync(server, capsys, fail_after=1500, **config)
+        saved = {**state["bookmarks"]["balance_transactions"]["report_run"]}
+        second, _ = run_sync(server, capsys, state=state, **config)
+
+    assert len(first) == 1500
+    assert saved["rows"] == 1000
+    # The same run is downloaded again, from its 1001st row.
+    assert list(server.report_runs) == [saved["id"]]
+    assert [r["id"] for r in second[:1000]] == [
+        f"txn_{i:010d}" for i in range(1000, 2000)
+    ]
+    assert len(second) == COUNT - 1000
+
+
+def test_report_is_skipped_for_short_ranges(dataset, capsys):
+    start = REPORT_END - 3 * 24 * HOUR
+    start_date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start))
+
+    with FakeStripeServer(dataset, report_data_end=REPORT_END) as server:
+        records, _ = run_sync(server, capsys, start_date=start_date)
+
+    assert not server.report_runs
+    assert len(records) == (START + COUNT * HOUR - start) // HOUR
+
+
+def test_unavailable_reports_fall_back_to_list(dataset, capsys):
+    with FakeStripeServer(dataset, reporting=False) as server:
+        records, state = run_sync(server, capsys)
+
+    assert len(records) == COUNT
+    assert "report_run" not in state["bookmarks"]["balance_transactions"]
@@ -0,0 +1,71 @@
+"""Tests for the packaged stream schemas, and constructing selected streams."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+
+from tap_stripe.client import SCHEMAS_DIR
+from tap_stripe.schemas.definitions import SCHEMAS, dumps
+from tests.helpers import FakeListEndpoint, make_tap
+
+
+def make_catalog(*selected: str) -> dict:
+    """Select whole streams and deselect every other stream."""
+    catalog = make_tap().catalog_dict
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] in selected
+    return json.loads(json.dumps(catalog))
+
+
+@pytest.mark.parametrize("filename", sorted(SCHEMAS))
+def test_schema_files_are_generated_from_definitions(filename):
+    # Regenerate with `python -m tap_stripe.schemas.definitions`.
+    path = SCHEMAS_DIR / filename
+    assert path.read_text(encoding="utf-8") == dumps(SCHEMAS[filename])
+
+
+def test_importing_the_tap_does_not_build_schemas():
+    code = (
+        "import sys, tap_stripe.tap; "
+        "print('tap_stripe.schemas.definitions' in sys.modules)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout
+    assert output.strip() == "False"
+
+
+def test_only_selected_streams_and_their_parents_are_constructed(capsys):
+    invoice = {
+        "id": "in_1",
+        "created": 1700000000,
+        "lines": {"object": "list", "data": [{"id": "il_1", "amount": 1000}]},
+    }
+    tap = make_tap(catalog=make_catalog("invoice_line_items"))
+
+    assert sorted(tap.streams) == ["invoice_line_items", "invoices"]
+
+    endpoint = FakeListEndpoint([invoice])
+    with mock.patch.object(tap.streams["invoices"], "_request", side_effect=endpoint):
+        tap.sync_all()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m for m in messages if m["type"] == "RECORD"]
+    assert [(m["stream"], m["record"]["id"]) for m in records] == [
+        ("invoice_line_items", "il_1")
+    ]
+
+
+def test_streams_missing_from_the_catalog_are_not_constructed():
+    catalog = make_catalog("customers", "products")
+    catalog["streams"] = [
+        entry for entry in catalog["streams"] if entry["tap_stream_id"] != "products"
+    ]
+
+    assert sorted(make_tap(catalog=catalog).streams) == ["customers"]
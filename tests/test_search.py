@@ -0,0 +1,88 @@
+"""Tests for Search API mode."""
+
+from __future__ import annotations
+
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from tests.helpers import FakeListEndpoint, make_response, make_tap
+
+
+def make_state(stream: str, value: int) -> dict:
+    return {
+        "bookmarks": {
+            stream: {"replication_key": "created", "replication_key_value": value}
+        }
+    }
+
+
+def query_params(prepared_request) -> dict[str, str]:
+    query = parse_qs(urlparse(prepared_request.url).query)
+    return {key: values[0] for key, values in query.items()}
+
+
+def test_search_follows_next_page_with_overlap():
+    pages = {
+        None: {"data": [{"id": "cus_2", "created": 1700000200}], "has_more": True,
+               "next_page": "page_2"},
+        "page_2": {"data": [{"id": "cus_1", "created": 1700000100}], "has_more": False,
+                   "next_page": None},
+    }
+    requests = []
+
+    def search(prepared_request, *_):
+        params = query_params(prepared_request)
+        requests.append((urlparse(prepared_request.url).path, params))
+        return make_response(pages[params.get("page")])
+
+    tap = make_tap(
+        make_state("customers", 1700000000),
+        search_streams=["customers"],
+        search_overlap_seconds=60,
+    )
+    stream = tap.streams["customers"]
+    stream._write_starting_replication_value(None)
+    with mock.patch.object(
+        stream, "_request", side_effect=search
+    ), mock.patch("tap_stripe.client.time.time", return_value=1700001000):
+        records = list(stream.request_records(None))
+
+    assert [r["id"] for r in records] == ["cus_2", "cus_1"]
+    assert [path for path, _ in requests] == ["/v1/customers/search"] * 2
+    # Queries end `search_indexing_lag_seconds` before the sync started.
+    assert requests[0][1] == {
+        "limit": "100",
+        "query": "created>=1699999940 AND created<1700000940",
+    }
+    assert requests[1][1]["page"] == "page_2"
+    assert requests[1][1]["query"] == requests[0][1]["query"]
+    # Not the newest object found: objects not indexed yet are read next time.
+    state = stream.get_context_state(None)
+    assert state["replication_key_value"] == 1700000939
+
+
+def test_search_falls_back_to_list_when_unavailable():
+    endpoint = FakeListEndpoint([{"id": "in_1", "created": 1700000000}])
+
+    def request(prepared_request, *args):
+        if urlparse(prepared_request.url).path.endswith("/search"):
+            response = make_response({"error": {"message": "unavailable"}}, 400)
+            response.request = prepared_request
+            stream.validate_response(response)
+        return endpoint(prepared_request, *args)
+
+    stream = make_tap(search_streams=["invoices"]).streams["invoices"]
+    stream._write_starting_replication_value(None)
+    with mock.patch.object(
+        stream, "_request", side_effect=request
+    ), mock.patch.object(stream.logger, "warning") as warning:
+        records = list(stream.request_records(None))
+
+    assert [r["id"] for r in records] == ["in_1"]
+    assert warning.call_args.args[0].startswith("Search is unavailable")
+
+
+def test_products_are_not_searchable():
+    stream = make_tap(search_streams=["products"]).streams["products"]
+
+    assert stream.search_enabled is False
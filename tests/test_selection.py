@@ -0,0 +1,137 @@
+"""Tests for pruning unselected fields from the catalog."""
+
+from __future__ import annotations
+
+import json
+from unittest import mock
+
+from tests.helpers import FakeListEndpoint, make_tap
+
+
+def make_catalog(selection: dict[str, list[str]], **config) -> dict:
+    """Select the listed fields of each stream and deselect everything else."""
+    catalog = make_tap(**config).catalog_dict
+    for entry in catalog["streams"]:
+        fields = selection.get(entry["tap_stream_id"])
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = fields is not None
+            elif fields is not None:
+                metadata["metadata"]["selected"] = metadata["breadcrumb"][1] in fields
+    return json.loads(json.dumps(catalog))
+
+
+INVOICE = {
+    "id": "in_1",
+    "created": 1700000000,
+    "amount_due": 1000,
+    "currency": "usd",
+    "description": "Not selected",
+    "status_transitions": {"paid_at": 1700000100, "voided_at": None},
+    "lines": {"object": "list", "data": [{"id": "il_1", "amount": 1000}]},
+}
+
+
+def test_post_process_keeps_selected_fields():
+    catalog = make_catalog({"invoices": ["amount_due", "status_transitions"]})
+    # Generated catalogs only list top-level fields; nested ones may be added.
+    invoices = next(s for s in catalog["streams"] if s["tap_stream_id"] == "invoices")
+    invoices["metadata"] += [
+        {
+            "breadcrumb": ["properties", "status_transitions", "properties", name],
+            "metadata": {"inclusion": "available", "selected": name == "paid_at"},
+        }
+        for name in ("finalized_at", "marked_uncollectible_at", "paid_at", "voided_at")
+    ]
+    stream = make_tap(catalog=catalog).streams["invoices"]
+
+    record = stream.post_process(json.loads(json.dumps(INVOICE)), None)
+
+    assert record == {
+        "id": "in_1",
+        "created": 1700000000,
+        "amount_due": 1000,
+        "status_transitions": {"paid_at": 1700000100},
+    }
+
+
+def test_every_field_selected_skips_pruning():
+    stream = make_tap().streams["invoices"]
+
+    assert stream.field_mask is None
+    assert stream.post_process(dict(INVOICE), None) == {
+        **INVOICE,
+        "account_id": "acct_123",
+    }
+
+
+def sync_invoice(catalog: dict, capsys) -> dict[str, dict]:
+    """Sync INVOICE, and return the last record of each stream."""
+    tap = make_tap(catalog=catalog)
+    patches = [
+        mock.patch.object(
+            stream,
+            "_request",
+            side_effect=FakeListEndpoint([INVOICE] if name == "invoices" else []),
+        )
+        for name, stream in tap.streams.items()
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        tap.sync_all()
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return {m["stream"]: m["record"] for m in messages if m["type"] == "RECORD"}
+
+
+def test_fields_read_by_selected_child_streams_are_kept(capsys):
+    catalog = make_catalog(
+        {"invoices": ["amount_due"], "invoice_line_items": ["amount"]}
+    )
+
+    records = sync_invoice(catalog, capsys)
+
+    assert records["invoices"] == {
+        "id": "in_1",
+        "created": 1700000000,
+        "amount_due": 1000,
+    }
+    assert records["invoice_line_items"] == {"id": "il_1", "amount": 1000}
+
+
+def test_child_streams_of_unselected_parents_are_synced(capsys):
+    # The parent is read for its children only, and keeps the id they need.
+    catalog = make_catalog({"invoice_line_items": ["amount"]})
+
+    records = sync_invoice(catalog, capsys)
+
+    assert records == {"invoice_line_items": {"id": "il_1", "amount": 1000}}
+
+
+def test_unselected_expansions_are_not_requested():
+    expand = {"invoices": ["customer", "charge"]}
+    catalog = make_catalog({"invoices": ["customer"]}, expand=expand)
+    stream = make_tap(catalog=catalog, expand=expand).streams["invoices"]
+
+    params = stream.get_url_params(None, None)
+
+    assert params["expand[]"] == ["data.customer"]
+
+
+def test_unselected_expanded_streams_are_not_requested():
+    config = {
+        "expand": {"invoices": ["customer", "charge"]},
+        "expand_child_streams": True,
+    }
+    catalog = make_catalog(
+        {"invoices": ["amount_due"], "invoice_charges": ["amount"]}, **config
+    )
+    stream = make_tap(catalog=catalog, **config).streams["invoices"]
+
+    params = stream.get_url_params(None, None)
+
+    assert params["expand[]"] == ["data.charge"]
@@ -0,0 +1,90 @@
+"""Tests for streaming page parsing."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import time
+
+import pytest
+import requests
+from urllib3 import HTTPResponse
+
+from benchmarks.fake_stripe import FakeStripeServer, make_objects
+from tap_stripe.client import StripePaginator
+from tap_stripe.streaming import iter_page_records
+from tests.helpers import make_tap
+
+pytest.importorskip("ijson")
+
+DAY = 24 * 60 * 60
+START = int(time.time()) - 10 * DAY
+
+
+def streamed_response(body: dict, *, compress: bool = False) -> requests.Response:
+    content = json.dumps(body).encode()
+    headers = {"Content-Type": "application/json"}
+    if compress:
+        content = gzip.compress(content)
+        headers["Content-Encoding"] = "gzip"
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(headers)
+    response.raw = HTTPResponse(
+        body=io.BytesIO(content),
+        headers=headers,
+        status=200,
+        preload_content=False,
+        decode_content=False,
+    )
+    return response
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_page_is_parsed_incrementally(compress):
+    objects = make_objects("cus", 5)
+    for obj in objects:
+        obj["amount"] = 1.5
+    response = streamed_response(
+        {"object": "list", "data": objects, "has_more": True, "url": "/v1/customers"},
+        compress=compress,
+    )
+    paginator = StripePaginator(start_value=0, page_size=100)
+
+    records = list(iter_page_records(response))
+
+    assert records == objects
+    assert response._content is False
+    assert response._stripe_page["data"] == [objects[-1]]
+    assert paginator.has_more(response) is True
+    assert paginator.get_next(response) == objects[-1]["id"]
+
+
+@pytest.fixture
+def server():
+    objects = {"/v1/customers": make_objects("cus", 450, start=START)}
+    with FakeStripeServer(objects) as fake:
+        yield fake
+
+
+@pytest.mark.parametrize("windowed", [False, True])
+def test_streaming_sync_matches_buffered(server, windowed):
+    def sync(**config):
+        if windowed:
+            config["backfill_window_days"] = 2
+        tap = make_tap(
+            api_url=server.url,
+            start_date=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(START)),
+            max_requests_per_second=10_000,
+            **config,
+        )
+        stream = tap.streams["customers"]
+        stream._write_starting_replication_value(None)
+        return [record["id"] for record in stream.request_records(None)]
+
+    buffered = sync()
+    streamed = sync(streaming_parse=True)
+
+    assert len(buffered) == 450
+    assert sorted(streamed) == sorted(buffered)
@@ -0,0 +1,149 @@
+"""Tests for child streams of lists embedded in parent records."""
+
+from __future__ import annotations
+
+import json
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from benchmarks.fake_stripe import FakeStripeServer
+from tests.helpers import FakeListEndpoint, make_response, make_tap, select_streams
+
+
+def make_items(subscription: str, count: int) -> list[dict]:
+    return [
+        {"id": f"si_{subscription}_{i}", "object": "subscription_item", "created": i}
+        for i in range(count)
+    ]
+
+
+def sublist(items: list[dict], embedded: int) -> dict:
+    return {
+        "object": "list",
+        "data": items[:embedded],
+        "has_more": len(items) > embedded,
+        "total_count": len(items),
+    }
+
+
+def run_sync(tap, endpoints: dict, capsys) -> list[dict]:
+    patches = [
+        mock.patch.object(
+            stream,
+            "_request",
+            side_effect=endpoints.get(name, FakeListEndpoint([])),
+        )
+        for name, stream in tap.streams.items()
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        tap.sync_all()
+    finally:
+        for patch in patches:
+            patch.stop()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return [m for m in messages if m["type"] == "RECORD"]
+
+
+def test_truncated_sublists_fetch_remaining_pages(capsys):
+    complete = make_items("sub_1", 3)
+    truncated = make_items("sub_2", 25)
+    subscriptions = [
+        {"id": "sub_1", "created": 1700000001, "items": sublist(complete, 10)},
+        {"id": "sub_2", "created": 1700000002, "items": sublist(truncated, 10)},
+    ]
+    item_requests = []
+
+    def subscription_items(prepared_request, *_, **__):
+        params = {k: v[0] for k, v in parse_qs(urlparse(prepared_request.url).query).items()}
+        item_requests.append(params)
+        items = truncated if params["subscription"] == "sub_2" else complete
+        ids = [item["id"] for item in items]
+        rest = items[ids.index(params["starting_after"]) + 1 :]
+        limit = int(params["limit"])
+        return make_response({"data": rest[:limit], "has_more": len(rest) > limit})
+
+    records = run_sync(
+        make_tap(catalog=select_streams("subscription_items")),
+        {
+            "subscriptions": FakeListEndpoint(subscriptions),
+            "subscription_items": subscription_items,
+        },
+        capsys,
+    )
+
+    items = [r["record"] for r in records if r["stream"] == "subscription_items"]
+    assert sorted(item["id"] for item in items) == sorted(
+        item["id"] for item in complete + truncated
+    )
+    assert {item["subscription"] for item in items} == {"sub_1", "sub_2"}
+    assert item_requests == [
+        {"limit": "100", "starting_after": "si_sub_2_9", "subscription": "sub_2"}
+    ]
+
+
+def test_invoice_lines_are_requested_by_invoice_path():
+    catalog = select_streams("invoice_line_items")
+    stream = make_tap(catalog=catalog).streams["invoice_line_items"]
+    lines = [{"id": f"il_{i}", "object": "line_item"} for i in range(3)]
+    context = {
+        "parents": [
+            {"id": "in_1", "lines": {"data": lines[:1], "has_more": True}},
+        ],
+    }
+    urls = []
+
+    def request(prepared_request, *_):
+        urls.append(prepared_request.url)
+        return make_response({"data": lines[1:], "has_more": False})
+
+    with mock.patch.object(stream, "_request", side_effect=request):
+        records = list(stream.get_records(context))
+
+    assert [r["id"] for r in records] == ["il_0", "il_1", "il_2"]
+    assert all(r["invoice"] == "in_1" for r in records)
+    assert urlparse(urls[0]).path == "/v1/invoices/in_1/lines"
+
+
+def test_async_engine_requests_truncated_lists_concurrently():
+    pytest.importorskip("httpx")
+    lines = {
+        invoice: [
+            {"id": f"il_{invoice}_{i}", "object": "line_item", "created": 0}
+            for i in range(count)
+        ]
+        for invoice, count in (("in_1", 250), ("in_2", 120), ("in_3", 5))
+    }
+    context = {
+        "parents": [
+            {"id": invoice, "lines": sublist(items, 10)}
+            for invoice, items in lines.items()
+        ],
+    }
+
+    with FakeStripeServer(
+        {f"/v1/invoices/{invoice}/lines": items for invoice, items in lines.items()}
+    ) as server:
+        tap = make_tap(
+            catalog=select_streams("invoice_line_items"),
+            api_url=server.url,
+            async_engine=True,
+        )
+        engine = tap.async_engine
+        try:
+            with mock.patch.object(
+                engine, "get_many", side_effect=engine.get_many
+            ) as get_many:
+                records = list(tap.streams["invoice_line_items"].get_records(context))
+        finally:
+            engine.close()
+
+    for invoice, items in lines.items():
+        assert [r["id"] for r in records if r["invoice"] == invoice] == [
+            item["id"] for item in items
+        ]
+    # in_1 has three more pages and in_2 two, requested a page of each at once.
+    assert [len(call.args[1]) for call in get_many.call_args_list] == [2, 2, 1]
@@ -0,0 +1,113 @@
+"""Tests for performance telemetry."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import logging
+import time
+from unittest import mock
+
+import backoff
+import pytest
+import requests
+
+from benchmarks.fake_stripe import FakeStripeServer, make_objects
+from tap_stripe.client import StripeStream
+from tap_stripe.telemetry import Histogram
+from tests.helpers import make_tap
+
+DAY = 24 * 60 * 60
+START = int(time.time()) - 10 * DAY
+
+
+def test_histogram_quantiles():
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.observe(value / 1000)
+    histogram.observe(0)
+
+    assert histogram.count == 1001
+    assert histogram.quantile(0) == 0
+    for q in (0.5, 0.95, 0.99):
+        assert q <= histogram.quantile(q) <= q * 2**0.25
+    assert histogram.quantile(1) == 1
+
+
+def test_disabled_by_default():
+    tap = make_tap()
+
+    assert tap.telemetry is None
+    assert tap.streams["customers"].telemetry is None
+
+
+@pytest.fixture
+def synced(tmp_path, caplog):
+    objects = {"/v1/customers": make_objects("cus", 250, start=START)}
+    path = tmp_path / "metrics.txt"
+    with FakeStripeServer(objects, rate_limit_every=2) as server, mock.patch.object(
+        StripeStream, "backoff_wait_generator", lambda _: backoff.constant(0)
+    ), mock.patch.object(StripeStream, "backoff_jitter", lambda _, value: value):
+        tap = make_tap(
+            api_url=server.url,
+            start_date=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(START)),
+            max_requests_per_second=10_000,
+            telemetry=True,
+            telemetry_openmetrics_path=str(path),
+            telemetry_port=0,
+        )
+        # The SDK's loggers do not propagate to the root logger.
+        tap.telemetry.logger.addHandler(caplog.handler)
+        tap.telemetry.start()
+        port = tap.telemetry._server.server_address[1]
+        with contextlib.redirect_stdout(io.StringIO()), caplog.at_level(logging.INFO):
+            tap.streams["customers"].sync()
+            served = requests.get(f"http://127.0.0.1:{port}/metrics")
+            tap.telemetry.stop()
+        tap.telemetry.logger.removeHandler(caplog.handler)
+    return tap.telemetry.stream("customers"), path.read_text(), served, caplog
+
+
+def test_sync_is_measured(synced):
+    telemetry, _, _, _ = synced
+
+    assert telemetry.request_seconds.count == 5
+    assert telemetry.throttled == 2
+    assert telemetry.retries == 2
+    assert telemetry.records_per_page.count == 3
+    assert telemetry.records_per_page.max == 100
+    assert telemetry.records_per_page.sum == 250
+    # Gzipped on the wire.
+    assert 0 < telemetry.response_bytes < 250 * 200
+    assert telemetry.decode_seconds > 0
+    assert telemetry.conform_seconds > 0
+    assert telemetry.emit_seconds > 0
+
+
+def test_metric_lines_are_logged(synced):
+    _, _, _, caplog = synced
+    points = [
+        json.loads(record.getMessage()[len("METRIC: ") :])
+        for record in caplog.get_records("setup")
+        if record.name == "singer_sdk.metrics"
+    ]
+    latency = next(p for p in points if p["metric"] == "http_request_latency")
+
+    assert latency["tags"] == {"stream": "customers"}
+    assert latency["value"]["count"] == 5
+    assert set(latency["value"]) >= {"p50", "p95", "p99"}
+
+
+def test_openmetrics_exposition(synced):
+    _, text, served, _ = synced
+
+    assert text.endswith("# EOF\n")
+    assert "# TYPE tap_stripe_http_request_duration_seconds summary" in text
+    assert (
+        'tap_stripe_http_request_duration_seconds_count{stream="customers"} 5' in text
+    )
+    assert 'tap_stripe_http_request_retries_total{stream="customers"} 2' in text
+    assert 'tap_stripe_records_per_page_sum{stream="customers"} 250' in text
+    assert served.headers["Content-Type"].startswith("application/openmetrics-text")
+    assert "tap_stripe_http_response_bytes_total" in served.text